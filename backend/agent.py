@@ -0,0 +1,175 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List
+import google.generativeai as genai
+
+# Import tools
+from tools import (
+    get_market_price, 
+    get_government_schemes, 
+    get_weather_forecast, 
+    recommend_crop, 
+    diagnose_crop_disease
+)
+
+# ===============================
+# Gemini Model Config (Agentic)
+# ===============================
+MODEL_NAME = "gemini-2.5-flash-lite"
+
+# Define the list of tools
+tools_list = [
+    get_market_price, 
+    get_government_schemes, 
+    get_weather_forecast, 
+    recommend_crop, 
+    diagnose_crop_disease
+]
+TOOLS_BY_NAME = {fn.__name__: fn for fn in tools_list}
+
+# Upper bound on model <-> tool round-trips for a single question; the last
+# round's results go back with function calling off, so the reply is text
+MAX_TOOL_ROUNDS = 5
+NO_TOOL_CALLS = {"function_calling_config": {"mode": "none"}}
+
+# Reply when the model still produced no text (never cached)
+AGENT_NO_ANSWER_TEXT = "Maaf karein, is sawaal ka jawab abhi nahi ban paya. Kripya dobara poochhein. (Sorry, I couldn't put an answer together. Please ask again.)"
+
+# Tools run on their own bounded pool, each with a timeout (seconds)
+TOOL_WORKERS = int(os.getenv("AGENT_TOOL_WORKERS", "16"))
+TOOL_TIMEOUT = float(os.getenv("AGENT_TOOL_TIMEOUT", "10"))
+TOOL_TIMEOUTS = {
+    "get_weather_forecast": 8.0,
+    "get_market_price": 8.0,
+}
+
+# System Instruction for the Persona
+SYSTEM_INSTRUCTION = """
+You are 'Krishi Sathi', an expert AI agricultural advisor for Indian farmers.
+Your mission is to help farmers increase their yield and income.
+
+CORE BEHAVIORS:
+1. **Multilingual**: Always detect the language of the user's query and respond in the SAME language (English, Hindi, Marathi, etc.).
+2. **Empathetic**: Use respectful and encouraging language (e.g., "Namaste", "Kisan Bhai").
+3. **Data-Driven**: NEVER make up market prices or schemes. ALWAYS use your TOOLS to fetch real data.
+   - If asked about prices -> usage `get_market_price`
+   - If asked about rain/weather -> use `get_weather_forecast`
+   - If asked about schemes -> use `get_government_schemes`
+4. **Actionable**: Give clear, step-by-step advice.
+
+If a tool fails or returns no data, apologize and provide general advice, but admit you don't have the live data.
+"""
+
+generation_config = {
+    "temperature": 0.4, # Lower temperature for more factual agentic responses
+    "top_p": 0.95,
+    "top_k": 64,
+    "max_output_tokens": 8192,
+    "response_mime_type": "text/plain",
+}
+
+_tool_pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="agent-tool")
+
+
+def build_agent_model():
+    # Initialize model WITH tools and system instruction
+    return genai.GenerativeModel(
+        model_name=MODEL_NAME,
+        generation_config=generation_config,
+        tools=tools_list,
+        system_instruction=SYSTEM_INSTRUCTION
+    )
+
+
+# ===============================
+# Agent Loop (parallel tool dispatch)
+# ===============================
+# Automatic function calling executes a turn's function calls one by one.
+# Here every function call of a model turn is run concurrently, and all
+# results go back to the model together in a single follow-up turn.
+async def call_tool(name: str, args: dict):
+    """Runs one tool on the tool pool; failures come back as {"error": ...}."""
+    fn = TOOLS_BY_NAME.get(name)
+    try:
+        if fn is None:
+            raise ValueError(f"Unknown tool: {name}")
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(_tool_pool, lambda: fn(**args)),
+            timeout=TOOL_TIMEOUTS.get(name, TOOL_TIMEOUT),
+        )
+    except asyncio.TimeoutError:
+        print(f"Tool Timeout ({name})")
+        return {"error": f"{name} timed out"}
+    except Exception as e:
+        print(f"Tool Error ({name}):", e)
+        return {"error": str(e)}
+
+
+async def run_tool_call(function_call):
+    """Executes one Gemini function call and wraps the result for the model."""
+    result = await call_tool(function_call.name, dict(function_call.args))
+    return genai.protos.Part(
+        function_response=genai.protos.FunctionResponse(
+            name=function_call.name,
+            response={"result": result}
+        )
+    )
+
+
+async def run_tool_calls(function_calls) -> List:
+    return list(await asyncio.gather(*(run_tool_call(fc) for fc in function_calls)))
+
+
+def _function_calls(parts) -> List:
+    return [part.function_call for part in parts if part.function_call]
+
+
+async def run_agent(model, message: str) -> str:
+    """Answers `message`, resolving tool calls until the model replies in text."""
+    chat_session = model.start_chat(history=[])
+    response = await chat_session.send_message_async(message)
+
+    for round_no in range(MAX_TOOL_ROUNDS):
+        function_calls = _function_calls(response.parts)
+        if not function_calls:
+            break
+        tool_config = NO_TOOL_CALLS if round_no == MAX_TOOL_ROUNDS - 1 else None
+        response = await chat_session.send_message_async(
+            await run_tool_calls(function_calls), tool_config=tool_config
+        )
+
+    text = "".join(part.text for part in response.parts if part.text)
+    return text or AGENT_NO_ANSWER_TEXT
+
+
+async def stream_agent(model, message: str) -> AsyncIterator[str]:
+    """
+    Streaming twin of run_agent, yielding text deltas. Gemini does not allow
+    streaming together with automatic function calling, so function calls
+    found in a streamed turn are executed here and their results sent back
+    in the next (also streamed) turn.
+    """
+    chat_session = model.start_chat(history=[])
+    content = message
+    replied = False
+
+    for round_no in range(MAX_TOOL_ROUNDS + 1):
+        tool_config = NO_TOOL_CALLS if round_no == MAX_TOOL_ROUNDS else None
+        response = await chat_session.send_message_async(content, stream=True, tool_config=tool_config)
+        function_calls = []
+        async for chunk in response:
+            for part in chunk.parts:
+                if part.function_call:
+                    function_calls.append(part.function_call)
+                elif part.text:
+                    replied = True
+                    yield part.text
+
+        if not function_calls:
+            break
+        content = await run_tool_calls(function_calls)
+
+    if not replied:
+        yield AGENT_NO_ANSWER_TEXT
@@ -0,0 +1,171 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from cache import register_cache
+from mandi_store import CROP_ALIASES
+from scheme_index import tokenize
+
+# ===============================
+# Repeated-question answer cache
+# ===============================
+# Caches LLM answers to stand-alone questions (no image, no location, no
+# prior turns) under a normalised signature of the prompt: crop names and a
+# few bilingual concepts are mapped to one token, filler and particles are
+# dropped and romanised spelling is folded, so "gehu ka bhav", "gehun ka bhaav" and
+# "gehu ka daam" share one entry. Everything that can change the answer is
+# kept exact: word order ("rice after wheat" vs "wheat after rice"),
+# numbers, vowels ("pest" vs "past"), negations, question words and modal
+# verbs. Entries are scoped by namespace (which model/endpoint) and
+# language, expire after a TTL and are LRU-bounded.
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", str(10 * 60)))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "5000"))
+
+# Words that mean the same thing in a farmer's question
+PROMPT_CONCEPTS = {
+    "price": ["price", "prices", "rate", "rates", "bhav", "bhaav", "daam", "mandi", "भाव", "दाम", "कीमत", "मंडी"],
+    "weather": ["weather", "mausam", "rain", "barish", "baarish", "मौसम", "बारिश"],
+    "when": ["when", "kab", "कब"],
+    "installment": ["installment", "instalment", "kist", "kisht", "किस्त"],
+    "come": ["come", "coming", "aayega", "ayega", "aayegi", "ayegi", "aaega", "आएगा", "आएगी", "आयेगा"],
+    # "leaves not turning green" is a different question
+    "not": ["not", "no", "nahi", "nahin", "nhi", "mat", "without", "bina", "नहीं", "नही", "न", "मत", "बिना"],
+}
+_CONCEPT_BY_WORD = {w: c for c, words in PROMPT_CONCEPTS.items() for w in words}
+_CROPS = set(CROP_ALIASES.values())
+
+# Politeness, scaffolding and particles that never change the answer.
+# Question words and modal verbs (how, can, should, will, kab...) are not
+# here: "can I sow wheat now" and "how do I sow wheat" are different questions.
+FILLER_WORDS = {
+    "please", "pls", "plz", "sir", "madam", "hello", "hi", "namaste", "namaskar", "bhai", "ji",
+    "this", "that", "these", "those", "about", "tell", "give", "know", "it", "its", "there",
+    "also", "just", "very", "bhi", "toh", "wala", "wali", "wale", "bahut",
+    "mera", "meri", "mere", "mujhe", "batao", "bataiye", "bataye",
+    "नमस्ते", "भाई", "जी", "बताइए", "बताओ", "मेरा", "मेरी", "मेरे", "मुझे", "भी", "तो", "ही", "बहुत",
+}
+
+# Romanised Hindi that marks a Latin-script question as Hinglish
+HINGLISH_MARKERS = {
+    "ka", "ki", "ke", "ko", "hai", "hain", "kya", "kab", "kaise", "kitna", "kitne",
+    "mein", "aur", "bhai", "ji", "batao", "bataiye", "chahiye", "kaun", "kyun",
+    "bhav", "bhaav", "daam", "mausam", "barish", "baarish", "kist", "kisht",
+    "aayega", "ayega", "aayegi", "ayegi", "aaega",
+} | {word for word in CROP_ALIASES if word.isascii()}
+
+
+def detect_language(text: str) -> str:
+    """'hi' for Devanagari, 'hinglish' for romanised Hindi, else 'en'."""
+    if any("\u0900" <= ch <= "\u097f" for ch in text):
+        return "hi"
+    words = set(text.casefold().split())
+    return "hinglish" if words & HINGLISH_MARKERS else "en"
+
+
+def spelling_key(token: str) -> str:
+    """
+    Folds plurals and the long vowels of romanised Hindi ("bhaav" / "bhav",
+    "kisaan" / "kisan"). Other letters stay as typed: collapsing "ee" or
+    "oo" would merge English pairs like feed / fed or loose / lose.
+    """
+    if not token.isascii():
+        return token
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        token = token[:-1]
+    return re.sub(r"([aiu])\1+", r"\1", token)
+
+
+def canonical_tokens(text: str) -> Tuple[str, ...]:
+    """The prompt's signature, in word order."""
+    tokens = []
+    for token in tokenize(text):
+        if token in FILLER_WORDS:
+            continue
+        if token.isdigit():
+            tokens.append(f"n:{int(token)}")  # exact: "20" != "200"
+        elif token in CROP_ALIASES or token in _CROPS:
+            tokens.append(f"crop:{CROP_ALIASES.get(token, token)}")
+        elif token in _CONCEPT_BY_WORD:
+            tokens.append(f"c:{_CONCEPT_BY_WORD[token]}")
+        else:
+            tokens.append(spelling_key(token))
+    return tuple(tokens)
+
+
+class _Entry:
+    __slots__ = ("answer", "expires_at")
+
+    def __init__(self, answer, expires_at):
+        self.answer = answer
+        self.expires_at = expires_at
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = ANSWER_CACHE_SIZE,
+        ttl: float = ANSWER_CACHE_TTL,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[Hashable, Tuple[str, ...]], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        register_cache(name, self)
+
+    def _key(self, namespace: Hashable, text: str):
+        tokens = canonical_tokens(text)
+        return ((namespace, detect_language(text)), tokens) if tokens else None
+
+    def get(self, namespace: Hashable, text: str) -> Optional[str]:
+        key = self._key(namespace, text)
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.answer
+            self.misses += 1
+            return None
+
+    def set(self, namespace: Hashable, text: str, answer: str):
+        key = self._key(namespace, text)
+        if key is None or not answer:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = _Entry(answer, time.monotonic() + self.ttl)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+answer_cache = AnswerCache("llm.answers")
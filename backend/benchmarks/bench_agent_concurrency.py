@@ -0,0 +1,124 @@
+"""
+Load test for the agentic POST /chat endpoint.
+
+Run from the backend folder.
+
+In-process, against a simulated Gemini with fixed latency (no API key or
+network needed). It compares a blocking SDK call inside the async handler
+(the old behaviour) with the async send path:
+    python benchmarks/bench_agent_concurrency.py
+
+Against a running server:
+    python benchmarks/bench_agent_concurrency.py --url http://localhost:8000
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakePart:
+    def __init__(self, text):
+        self.text = text
+        self.function_call = None
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.parts = [FakePart(text)]
+
+
+class FakeChat:
+    def __init__(self, latency, blocking):
+        self.latency = latency
+        self.blocking = blocking
+
+    async def send_message_async(self, message, stream=False, tool_config=None):
+        if self.blocking:
+            time.sleep(self.latency)  # what a sync SDK call does to the loop
+        else:
+            await asyncio.sleep(self.latency)
+        return FakeResponse("ok")
+
+
+class FakeModel:
+    def __init__(self, latency, blocking):
+        self.latency = latency
+        self.blocking = blocking
+
+    def start_chat(self, **kwargs):
+        return FakeChat(self.latency, self.blocking)
+
+
+async def run_load(client, total, concurrency):
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            i = queue.get_nowait()
+            start = time.perf_counter()
+            # No quick-reply intent and a distinct number each time, so every
+            # request reaches the agent instead of a cache
+            res = await client.post("/chat", json={"message": f"gehu mein sinchai kab karein? ({i})"})
+            res.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "req_s": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def report(label, result):
+    print(
+        f"{label:<28} {result['req_s']:>8.1f} req/s"
+        f"   p50 {result['p50_ms']:>7.1f} ms   p95 {result['p95_ms']:>7.1f} ms"
+    )
+
+
+async def in_process(args):
+    import main
+
+    main.api_key = main.api_key or "benchmark"
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for blocking in (True, False):
+            main.agent_model = FakeModel(args.latency, blocking)
+            main.answer_cache.clear()
+            result = await run_load(client, args.requests, args.concurrency)
+            report("blocking send (before)" if blocking else "async send (after)", result)
+
+
+async def against_server(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        result = await run_load(client, args.requests, args.concurrency)
+        report(args.url, result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Benchmark a running server instead of in-process")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated model latency (s)")
+    args = parser.parse_args()
+    asyncio.run(against_server(args) if args.url else in_process(args))
+
+
+if __name__ == "__main__":
+    main()
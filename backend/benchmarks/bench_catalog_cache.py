@@ -0,0 +1,178 @@
+"""
+Load test for the cached women-empowerment catalog lists (GET /women/shgs).
+
+Run from the backend folder.
+
+In-process, against a simulated MongoDB collection with a fixed round-trip
+latency (no database needed). It compares every request querying the
+collection (cache disabled), the read-through page cache, and clients
+revalidating with If-None-Match (304 without a body):
+    python benchmarks/bench_catalog_cache.py
+
+Against a running server (plain GETs vs. ETag revalidation):
+    python benchmarks/bench_catalog_cache.py --url http://localhost:8000
+"""
+import os
+import sys
+import copy
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+import httpx
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DISTRICTS = ["Bokaro", "Patna", "Bhagalpur", "Gaya", "Ranchi", "Ahmedabad", "Pune", "Nashik"]
+FOCUS = ["Organic Farming", "Dairy", "Handicrafts", "Food Processing", "Poultry"]
+
+
+class FakeCursor:
+    def __init__(self, collection, query, projection):
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self.n = 0
+
+    def collation(self, collation):
+        return self
+
+    def sort(self, sort):
+        return self
+
+    def limit(self, n):
+        self.n = n
+        return self
+
+    async def to_list(self, length):
+        await asyncio.sleep(self.collection.latency)  # network + query time
+        self.collection.queries += 1
+        after = self.query.get("_id", {}).get("$gt")
+        district = self.query.get("district", "")
+        rows = []
+        # Walks the matching district only, like the district_id index would
+        for doc in self.collection.by_district.get(district.casefold(), self.collection.docs):
+            if after is not None and doc["_id"] <= after:
+                continue
+            rows.append({k: v for k, v in doc.items() if k == "_id" or k in self.projection})
+            if len(rows) == self.n:
+                break
+        return copy.deepcopy(rows)  # BSON decoding cost
+
+
+class FakeCollection:
+    name = "shgs"
+
+    def __init__(self, n, latency):
+        rng = random.Random(3)
+        self.latency = latency
+        self.queries = 0
+        self.docs = [
+            {
+                "_id": ObjectId(),
+                "name": f"Mahila SHG {i}",
+                "location": "",
+                "state": "Bihar",
+                "city": district,
+                "district": district,
+                "members_count": rng.randint(10, 40),
+                "focus_area": rng.choice(FOCUS),
+                "contact_person": "Sunita Devi",
+                "contact_number": "+91 9000000000",
+                "category": "SHG",
+            }
+            for i in range(n)
+            for district in [rng.choice(DISTRICTS)]
+        ]
+        self.by_district = {}
+        for doc in self.docs:
+            self.by_district.setdefault(doc["district"].casefold(), []).append(doc)
+
+    def find(self, query, projection):
+        return FakeCursor(self, query, projection)
+
+
+async def run_load(client, total, concurrency, revalidate=False):
+    latencies = []
+    etags = {}
+    queue = asyncio.Queue()
+    rng = random.Random(11)
+    for _ in range(total):
+        queue.put_nowait(rng.choice(DISTRICTS))
+
+    async def worker():
+        while not queue.empty():
+            district = queue.get_nowait()
+            headers = {"If-None-Match": etags[district]} if revalidate and district in etags else {}
+            start = time.perf_counter()
+            res = await client.get("/women/shgs", params={"district": district, "limit": 50}, headers=headers)
+            if res.status_code not in (200, 304):
+                res.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+            if "etag" in res.headers:
+                etags[district] = res.headers["etag"]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "req_s": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def report(label, result, queries=None):
+    extra = f"   {queries:>5} queries" if queries is not None else ""
+    print(
+        f"{label:<28} {result['req_s']:>8.1f} req/s"
+        f"   p50 {result['p50_ms']:>7.2f} ms   p95 {result['p95_ms']:>7.2f} ms{extra}"
+    )
+
+
+async def in_process(args):
+    import main
+    import catalog
+    from database import database
+
+    collection = FakeCollection(args.docs, args.latency)
+    database.shgs = collection
+    ttl = catalog.CATALOG_CACHE_TTL or 300.0
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for label, cache_ttl, revalidate in (
+            ("uncached (before)", 0.0, False),
+            ("read-through cache", ttl, False),
+            ("cache + If-None-Match", ttl, True),
+        ):
+            catalog.CATALOG_CACHE_TTL = cache_ttl
+            catalog.catalog_cache.clear()
+            collection.queries = 0
+            result = await run_load(client, args.requests, args.concurrency, revalidate)
+            report(label, result, collection.queries)
+
+
+async def against_server(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        report("plain GET", await run_load(client, args.requests, args.concurrency))
+        report("If-None-Match", await run_load(client, args.requests, args.concurrency, revalidate=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Benchmark a running server instead of in-process")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--docs", type=int, default=20_000, help="Simulated SHG directory size")
+    parser.add_argument("--latency", type=float, default=0.008, help="Simulated MongoDB round trip (s)")
+    args = parser.parse_args()
+    asyncio.run(against_server(args) if args.url else in_process(args))
+
+
+if __name__ == "__main__":
+    main()
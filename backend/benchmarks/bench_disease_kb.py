@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: TF-IDF diagnosis over a synthetic 10k-entry knowledge
+base. Compares a plain Python cosine loop over every entry with the
+vectorised search, called per report and with whole batches.
+
+Run from the backend folder:
+    python benchmarks/bench_disease_kb.py
+
+Entries are generated by recombining symptom phrases from the bundled
+knowledge base with synthetic crop names, so vocabulary overlap between
+entries (and posting-list lengths) stays realistic.
+"""
+import os
+import sys
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from disease_kb import DiseaseKB, DISEASE_KB_PATH  # noqa: E402
+
+KB_SIZE = 10_000
+BATCH_SIZES = (1, 100, 1_000)
+
+
+def synthetic_entries(n: int, seed: int = 11):
+    rng = random.Random(seed)
+    with open(DISEASE_KB_PATH, encoding="utf-8") as f:
+        base = json.load(f)
+    phrases = [p for e in base for p in e["symptoms"]]
+    words = sorted({w for p in phrases for w in p.split()})
+    entries = []
+    for i in range(n):
+        src = base[i % len(base)]
+        extra = " ".join(rng.sample(words, 4)) + f" variant{i % 500}"
+        entries.append({
+            "id": f"syn-{i}",
+            "crop": f"crop{i % 60}",
+            "disease": f"{src['disease']} #{i}",
+            "symptoms": rng.sample(phrases, 3) + [extra],
+            "remedy": src["remedy"],
+        })
+    return entries, phrases
+
+
+def python_loop(kb, report):
+    """Reference: dict-of-terms cosine against every entry, no NumPy."""
+    cols, qv = kb.vectorize(report)
+    query = dict(zip(cols.tolist(), qv.tolist()))
+    best = []
+    for row in range(len(kb.entries)):
+        vec = kb.entry_vectors[row]
+        best.append((sum(w * vec.get(c, 0.0) for c, w in query.items()), row))
+    return sorted(best, reverse=True)[:3]
+
+
+def main():
+    entries, phrases = synthetic_entries(KB_SIZE)
+    start = time.perf_counter()
+    kb = DiseaseKB(entries)
+    print(f"built {len(kb)} entries / {len(kb.vocab)} terms in {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    # Row-wise dict vectors, only for the reference loop
+    kb.entry_vectors = [{} for _ in range(len(kb))]
+    for col in range(len(kb.vocab)):
+        lo, hi = kb.term_ptr[col], kb.term_ptr[col + 1]
+        for row, val in zip(kb.term_rows[lo:hi].tolist(), kb.term_vals[lo:hi].tolist()):
+            kb.entry_vectors[row][col] = val
+
+    rng = random.Random(3)
+    sample = [" ".join(rng.sample(phrases, 2)) for _ in range(20)]
+    start = time.perf_counter()
+    for r in sample:
+        python_loop(kb, r)
+    print(f"python loop: {(time.perf_counter() - start) / len(sample) * 1e3:.1f} ms/report")
+
+    print(f"{'reports':>8} {'one-by-one ms':>14} {'batch ms':>9} {'µs/report':>10}")
+    for size in BATCH_SIZES:
+        reports = [" ".join(rng.sample(phrases, 2)) for _ in range(size)]
+
+        start = time.perf_counter()
+        for r in reports:
+            kb.search_batch([r])
+        single = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        kb.search_batch(reports)
+        batch = (time.perf_counter() - start) * 1e3
+        print(f"{size:>8} {single:>14.1f} {batch:>9.1f} {batch / size * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark: keyword automaton vs. one whole-word regex scan per keyword.
+
+Run from the backend folder:
+    python benchmarks/bench_intent_router.py
+
+Keyword sets are grown synthetically (real keywords plus numbered variants)
+to show how each approach scales with vocabulary size and language mix.
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import KeywordAutomaton, INTENT_KEYWORDS  # noqa: E402
+
+MESSAGES = {
+    "english": [
+        "what is the price of onion in pune mandi today",
+        "will it rain tomorrow, should i harvest my wheat",
+        "my tomato leaves have brown spots, what disease is this",
+        "please draw a picture of a healthy paddy field",
+    ],
+    "hindi": [
+        "आज पुणे मंडी में प्याज का भाव क्या है",
+        "कल बारिश होगी क्या, गेहूं की कटाई करूं",
+        "टमाटर की पत्तियों पर भूरे धब्बे हैं, कौन सा रोग है",
+        "धान के खेत की एक तस्वीर बनाओ",
+    ],
+}
+MESSAGES["mixed"] = MESSAGES["english"] + MESSAGES["hindi"]
+
+
+def grow_keywords(factor: int):
+    grown = {}
+    for intent, words in INTENT_KEYWORDS.items():
+        grown[intent] = list(words) + [
+            f"{word} {i}" for i in range(factor) for word in words
+        ]
+    return grown
+
+
+def whole_word_patterns(keywords):
+    """One regex per keyword, whole-word for Latin ones like the automaton."""
+    return {
+        intent: [re.compile(rf"(?<!\w){re.escape(w)}(?!\w)" if w.isascii() else re.escape(w)) for w in words]
+        for intent, words in keywords.items()
+    }
+
+
+def linear_scan(patterns, text):
+    lower = text.casefold()
+    return {intent for intent, regexes in patterns.items() if any(r.search(lower) for r in regexes)}
+
+
+def bench(fn, messages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for msg in messages:
+            fn(msg)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(messages)) * 1e6  # µs per message
+
+
+def main():
+    rounds = 200
+    print(f"{'keywords':>9} {'language':>9} {'scan µs':>10} {'automaton µs':>13} {'speedup':>8}")
+    for factor in (0, 4, 16, 64):
+        keywords = grow_keywords(factor)
+        patterns = whole_word_patterns(keywords)
+        automaton = KeywordAutomaton(keywords).build()
+        total = sum(len(w) for w in keywords.values())
+        for language, messages in MESSAGES.items():
+            # Same answers from both approaches before timing them
+            for msg in messages:
+                assert linear_scan(patterns, msg) == automaton.labels(msg), msg
+            scan = bench(lambda m: linear_scan(patterns, m), messages, rounds)
+            ac = bench(automaton.labels, messages, rounds)
+            print(f"{total:>9} {language:>9} {scan:>10.1f} {ac:>13.1f} {scan / ac:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: Kisan Seva Kendra lookups as the directory grows.
+
+Run from the backend folder:
+    python benchmarks/bench_kendra_directory.py
+
+Synthetic centres are scattered over India's bounding box with invented
+place names; "nearest" compares the KD-tree with a haversine scan over every
+centre, "fuzzy" looks up misspelt place names through the trigram index.
+"""
+import os
+import sys
+import time
+import random
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kendra_directory import KendraDirectory  # noqa: E402
+
+SYLLABLES = "pur ganj bad nagar garh pat na ra ma li ko ta sa bha gal dar bhan mu zaf fa ri".split()
+
+
+def place_name(rng: random.Random) -> str:
+    return "".join(rng.sample(SYLLABLES, 3)).title()
+
+
+def misspell(rng: random.Random, name: str) -> str:
+    i = rng.randrange(1, len(name) - 1)
+    return name[:i] + name[i + 1:] if rng.random() < 0.5 else name[:i] + name[i] + name[i:]
+
+
+def synthetic_rows(n: int, seed: int = 5):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        city = place_name(rng)
+        rows.append({
+            "name": f"Krishi Vigyan Kendra {i}",
+            "city": city,
+            "district": city,
+            "state": "Bench",
+            "address": city,
+            "contact": "",
+            "services": "Soil Testing",
+            "latitude": str(rng.uniform(8.0, 35.0)),
+            "longitude": str(rng.uniform(68.0, 97.0)),
+        })
+    return rows
+
+
+def haversine_scan(lats, lons, lat, lon, k):
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    d = 2 * 6371.0088 * np.arcsin(np.sqrt(a))
+    top = np.argpartition(d, k - 1)[:k]
+    return top[np.argsort(d[top])]
+
+
+def main():
+    rng = random.Random(9)
+    rounds = 500
+    print(f"{'centres':>8} {'build ms':>9} {'kd-tree µs':>11} {'scan µs':>8} {'fuzzy µs':>9}")
+    for n in (1_000, 5_000, 20_000):
+        rows = synthetic_rows(n)
+        start = time.perf_counter()
+        directory = KendraDirectory(rows)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        lats = np.array([k["latitude"] for k in directory.kendras])
+        lons = np.array([k["longitude"] for k in directory.kendras])
+        points = [(rng.uniform(8.0, 35.0), rng.uniform(68.0, 97.0)) for _ in range(rounds)]
+
+        start = time.perf_counter()
+        for lat, lon in points:
+            directory.nearest(lat, lon, 5)
+        tree_us = (time.perf_counter() - start) / rounds * 1e6
+
+        start = time.perf_counter()
+        for lat, lon in points:
+            haversine_scan(lats, lons, lat, lon, 5)
+        scan_us = (time.perf_counter() - start) / rounds * 1e6
+
+        typos = [misspell(rng, rng.choice(rows)["city"]) for _ in range(rounds)]
+        start = time.perf_counter()
+        for name in typos:
+            directory.find(name, limit=1)
+        fuzzy_us = (time.perf_counter() - start) / rounds * 1e6
+
+        print(f"{n:>8} {build_ms:>9.1f} {tree_us:>11.1f} {scan_us:>8.1f} {fuzzy_us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
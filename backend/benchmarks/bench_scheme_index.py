@@ -0,0 +1,68 @@
+"""
+Micro-benchmark: BM25 scheme index query latency as the catalogue grows.
+
+Run from the backend folder:
+    python benchmarks/bench_scheme_index.py
+
+Synthetic schemes are generated from a small bilingual vocabulary so the
+index sees realistic posting-list overlap in both scripts.
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheme_index import SchemeIndex  # noqa: E402
+
+WORDS = (
+    "loan credit insurance organic farming women mahila kisan yojana subsidy "
+    "irrigation drip solar pump seed fertilizer training dairy goat poultry "
+    "fisheries pension maternity housing awas tractor storage warehouse market "
+    "ऋण बीमा जैविक महिला किसान योजना सिंचाई बीज खाद प्रशिक्षण पेंशन आवास"
+).split()
+
+QUERIES = [
+    "loan for women farmers",
+    "mahila kisan yojna",
+    "फसल बीमा योजना",
+    "organic khad subsidy",
+    "solar pump sinchai",
+    "karj for dairy",
+]
+
+
+def build(n: int, seed: int = 7) -> SchemeIndex:
+    rng = random.Random(seed)
+    index = SchemeIndex()
+    for i in range(n):
+        title = " ".join(rng.sample(WORDS, 4))
+        body = " ".join(rng.choices(WORDS, k=40))
+        index.add(("bench", i), title, [body], {"source": "bench", "id": str(i), "name": title})
+    return index
+
+
+def main():
+    rounds = 200
+    print(f"{'schemes':>8} {'build ms':>9} {'compile ms':>11} {'query µs':>9}")
+    for n in (100, 1_000, 5_000):
+        start = time.perf_counter()
+        index = build(n)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        # First search after a change recompiles the posting arrays
+        start = time.perf_counter()
+        index.search(QUERIES[0])
+        compile_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for q in QUERIES:
+                index.search(q, limit=5)
+        query_us = (time.perf_counter() - start) / (rounds * len(QUERIES)) * 1e6
+        print(f"{n:>8} {build_ms:>9.1f} {compile_ms:>11.1f} {query_us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
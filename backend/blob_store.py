@@ -0,0 +1,109 @@
+import os
+import re
+import asyncio
+import base64
+import hashlib
+import tempfile
+from typing import Optional
+
+# ===============================
+# Content-addressed blob store
+# ===============================
+# Image bytes live on disk under their SHA-256 digest instead of inline in
+# MongoDB documents. Identical uploads map to the same file, and a digest
+# never changes content, so blobs can be cached by clients forever.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BLOB_DIR = os.getenv("BLOB_STORE_DIR", os.path.join(BASE_DIR, "blob_store"))
+
+# Public path the blobs are served under (see routers/chat_service.py)
+BLOB_URL_PREFIX = "/chat/blobs/"
+BLOB_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_MAGIC_TYPES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+def sniff_content_type(head: bytes) -> str:
+    for magic, content_type in _MAGIC_TYPES:
+        if head.startswith(magic):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def is_valid_digest(digest: str) -> bool:
+    return bool(_DIGEST_RE.match(digest))
+
+
+def blob_path(digest: str) -> str:
+    # Two-level fan-out keeps directories small
+    return os.path.join(BLOB_DIR, digest[:2], digest)
+
+
+def write_atomic(path: str, data: bytes):
+    """Writes to a temp file and renames it so readers never see partial files."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_blob(data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(digest)
+    if not os.path.exists(path):  # identical content is stored once
+        write_atomic(path, data)
+    return digest
+
+
+async def put_blob(data: bytes) -> str:
+    """Stores `data` and returns its blob URL path (e.g. /chat/blobs/<sha256>)."""
+    digest = await asyncio.to_thread(_write_blob, data)
+    return BLOB_URL_PREFIX + digest
+
+
+def decode_b64_image(b64: str) -> bytes:
+    """Strict base64 -> image bytes; ValueError unless it decodes to a known image type."""
+    if "," in b64 and b64.startswith("data:"):
+        b64 = b64.split(",", 1)[1]
+    try:
+        data = base64.b64decode(b64, validate=True)
+    except ValueError:
+        raise ValueError("image is not valid base64")
+    if sniff_content_type(data[:16]) == "application/octet-stream":
+        raise ValueError("image must be JPEG, PNG, GIF or WebP")
+    return data
+
+
+async def put_b64_blob(b64: str) -> str:
+    return await put_blob(decode_b64_image(b64))
+
+
+def is_blob_ref(url: Optional[str]) -> bool:
+    return bool(url) and url.startswith(BLOB_URL_PREFIX)
+
+
+def find_blob(digest: str) -> Optional[str]:
+    """Returns the on-disk path for `digest`, or None if unknown."""
+    if not is_valid_digest(digest):
+        return None
+    path = blob_path(digest)
+    return path if os.path.isfile(path) else None
+
+
+def read_blob_head(path: str, size: int = 16) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(size)
@@ -0,0 +1,86 @@
+import os
+import asyncio
+from typing import AsyncIterator, Dict, List, Tuple
+
+from agent import call_tool
+from mandi_store import normalize_crop
+from tool_cache import normalize_text, normalize_location
+
+# ===============================
+# Bulk advisories
+# ===============================
+# Runs the advisory tools for a whole member list (SMS / IVR campaigns).
+# Farmers in the same district share one weather lookup, farmers growing the
+# same crop there share one price lookup, and so on: every distinct tool call
+# runs exactly once, concurrently, and each farmer's advisory is emitted as
+# soon as all of its lookups have finished.
+BULK_MAX_PROFILES = int(os.getenv("BULK_MAX_PROFILES", "50000"))
+# In-flight tool calls; matches the agent tool pool so queued calls don't
+# burn their timeout while waiting for a worker thread
+BULK_MAX_PARALLEL = int(os.getenv("AGENT_TOOL_WORKERS", "16"))
+
+LookupKey = Tuple[str, tuple]
+
+
+def profile_lookups(profile: dict) -> Dict[str, Tuple[LookupKey, dict]]:
+    """section -> ((tool, normalised key), tool kwargs) for one farmer."""
+    district = profile.get("district") or ""
+    crop = profile.get("crop") or ""
+    where = normalize_location(district)
+    lookups = {
+        "weather": (("get_weather_forecast", (where,)), {"location": district}),
+    }
+    if crop:
+        lookups["market_price"] = (
+            ("get_market_price", (normalize_crop(crop), where)),
+            {"crop_name": crop, "location": district},
+        )
+    if profile.get("soil") and profile.get("season"):
+        soil, season = profile["soil"], profile["season"]
+        lookups["crop_recommendation"] = (
+            ("recommend_crop", (normalize_text(soil), normalize_text(season), where)),
+            {"soil_type": soil, "season": season, "location": district},
+        )
+    if profile.get("symptoms"):
+        symptoms = profile["symptoms"]
+        lookups["diagnosis"] = (
+            ("diagnose_crop_disease", (normalize_text(symptoms), normalize_crop(crop))),
+            {"symptoms": symptoms, "crop": crop},
+        )
+    return lookups
+
+
+async def stream_advisories(profiles: List[dict]) -> AsyncIterator[dict]:
+    """Yields {"index", "id", <section>: result, ...} per farmer, in completion order."""
+    slots = asyncio.Semaphore(BULK_MAX_PARALLEL)
+    calls: Dict[LookupKey, asyncio.Task] = {}
+
+    async def run(name: str, kwargs: dict):
+        async with slots:
+            return await call_tool(name, kwargs)
+
+    plans = []
+    for profile in profiles:
+        lookups = profile_lookups(profile)
+        for key, kwargs in lookups.values():
+            if key not in calls:
+                calls[key] = asyncio.ensure_future(run(key[0], kwargs))
+        plans.append({section: key for section, (key, _) in lookups.items()})
+    print(f"📦 Bulk advisory: {len(profiles)} farmers, {len(calls)} distinct lookups")
+
+    async def advisory(index: int, profile: dict, plan: Dict[str, LookupKey]) -> dict:
+        sections = list(plan)
+        results = await asyncio.gather(*(calls[plan[s]] for s in sections))
+        return {"index": index, "id": profile.get("id"), **dict(zip(sections, results))}
+
+    farmers = [
+        asyncio.ensure_future(advisory(i, p, plan))
+        for i, (p, plan) in enumerate(zip(profiles, plans))
+    ]
+    try:
+        for done in asyncio.as_completed(farmers):
+            yield await done
+    finally:
+        # Client went away (or we finished): drop whatever is still pending
+        for task in farmers + list(calls.values()):
+            task.cancel()
@@ -0,0 +1,141 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# ===============================
+# In-process caches
+# ===============================
+# Every cache registers itself by name so its counters can be read from
+# GET /cache/stats (see main.py) when tuning sizes and TTLs.
+_registry: Dict[str, "TTLCache"] = {}
+
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters."""
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _registry[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class AsyncTTLCache(TTLCache):
+    """
+    TTLCache with single-flight loading: concurrent misses for the same key
+    share one upstream call instead of each issuing their own.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        super().__init__(name, maxsize, ttl)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Returns the cached value for `key`, or awaits `loader()` to fill it.
+        A loader result of None is treated as a failure and is not cached.
+        """
+        value = self.get(key, MISSING)
+        if value is not MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._load(key, loader, ttl))
+            task.add_done_callback(_consume_exception)
+            self._inflight[key] = task
+        # Shield so one cancelled caller does not abort the load for the rest
+        return await asyncio.shield(task)
+
+    async def _load(self, key, loader, ttl):
+        try:
+            value = await loader()
+            if value is not None:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        data = super().stats()
+        data["coalesced"] = self.coalesced
+        data["inflight"] = len(self._inflight)
+        return data
+
+
+def _consume_exception(task: asyncio.Task):
+    # Avoid "exception was never retrieved" when every waiter went away
+    if not task.cancelled():
+        task.exception()
+
+
+def register_cache(name: str, cache):
+    """Lists a cache with its own storage (anything with stats()) in cache_stats()."""
+    _registry[name] = cache
+
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in sorted(_registry.items())}
@@ -0,0 +1,158 @@
+import os
+import json
+import hashlib
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from cache import AsyncTTLCache
+from database import CATALOG_COLLATION
+from pagination import NEXT_CURSOR_HEADER, after_filter, cursor_for, decode_cursor
+
+# ===============================
+# Women-empowerment catalog queries
+# ===============================
+# The catalog collections (schemes, training, financial_aid, shgs,
+# health_safety) are listed with optional equality filters, keyset pages on
+# _id and a field projection. Filters are case-insensitive through the
+# collation shared with the (filter, _id) indexes in database.INDEXES, so
+# "bokaro" and "Bokaro" use the same index seek.
+CATALOG_PAGE_SIZE = 100
+CATALOG_PAGE_MAX = 500
+CATALOG_SORT = [("_id", 1)]
+
+
+class CatalogPage:
+    """Paging / projection query parameters shared by the catalog lists."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description=f"{NEXT_CURSOR_HEADER} header of the previous page"),
+        limit: int = Query(CATALOG_PAGE_SIZE, ge=1, le=CATALOG_PAGE_MAX),
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. name,district"),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else []
+
+
+def catalog_query(filters: dict, page: CatalogPage) -> dict:
+    query = {field: value for field, value in filters.items() if value}
+    if page.cursor:
+        query.update(after_filter(CATALOG_SORT, decode_cursor(page.cursor, len(CATALOG_SORT))))
+    return query
+
+
+def catalog_projection(model: Type[BaseModel], page: CatalogPage) -> dict:
+    known = model.model_fields
+    unknown = [f for f in page.fields if f not in known]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return {field: 1 for field in (page.fields or known)}
+
+
+async def list_catalog(
+    collection,
+    model: Type[BaseModel],
+    filters: dict,
+    page: CatalogPage,
+) -> Tuple[List[dict], Optional[str]]:
+    """Returns (documents without _id, cursor of the next page or None)."""
+    docs = await (
+        collection.find(catalog_query(filters, page), catalog_projection(model, page))
+        .collation(CATALOG_COLLATION)
+        .sort(CATALOG_SORT)
+        .limit(page.limit + 1)
+        .to_list(page.limit + 1)
+    )
+    next_cursor = None
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        next_cursor = cursor_for(docs[-1], CATALOG_SORT)
+    for doc in docs:
+        doc.pop("_id", None)
+    return docs, next_cursor
+
+
+# ===============================
+# Read-through page cache + ETags
+# ===============================
+# Catalog collections only change through the POST endpoints, but are read on
+# every page load. Pages are cached under the collection's version number,
+# which the POST handlers bump after inserting: older pages simply stop being
+# looked up and age out of the LRU. Writes that bypass this process (other
+# workers, manual edits) are picked up when the TTL expires. Each page
+# carries a strong ETag of its body, so a client revalidating an unchanged
+# page gets 304 Not Modified without a body.
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))  # 0 disables caching
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "2000"))
+# Browsers may keep a copy but must revalidate it (cheap with the ETag)
+CATALOG_CACHE_CONTROL = "no-cache"
+
+catalog_cache = AsyncTTLCache("catalog.pages", maxsize=CATALOG_CACHE_SIZE, ttl=CATALOG_CACHE_TTL)
+_versions: Dict[str, int] = {}
+
+
+class CatalogPageResult(NamedTuple):
+    docs: List[dict]
+    next_cursor: Optional[str]
+    etag: str
+
+
+def bump_catalog_version(collection_name: str):
+    """Call after writing to a catalog collection; its cached pages become stale."""
+    _versions[collection_name] = _versions.get(collection_name, 0) + 1
+
+
+def page_etag(docs: List[dict], next_cursor: Optional[str]) -> str:
+    body = json.dumps(
+        [jsonable_encoder(docs), next_cursor], sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+async def cached_catalog(
+    collection,
+    model: Type[BaseModel],
+    filters: dict,
+    page: CatalogPage,
+) -> CatalogPageResult:
+    """list_catalog through the page cache; concurrent misses share one query."""
+    async def load():
+        docs, next_cursor = await list_catalog(collection, model, filters, page)
+        return CatalogPageResult(docs, next_cursor, page_etag(docs, next_cursor))
+
+    if CATALOG_CACHE_TTL <= 0:
+        return await load()
+    name = collection.name
+    key = (
+        name,
+        _versions.get(name, 0),
+        tuple(sorted((f, v.casefold()) for f, v in filters.items() if v)),
+        page.cursor,
+        page.limit,
+        tuple(page.fields),
+    )
+    return await catalog_cache.get_or_load(key, load)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(request: Request, result: CatalogPageResult) -> Optional[Response]:
+    """304 response when the client already holds this page, else None."""
+    if etag_matches(request, result.etag):
+        headers = {"ETag": result.etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+        if result.next_cursor:
+            headers[NEXT_CURSOR_HEADER] = result.next_cursor
+        return Response(status_code=304, headers=headers)
+    return None
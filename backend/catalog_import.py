@@ -0,0 +1,239 @@
+import io
+import csv
+import json
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from database import CATALOG_KEYS
+
+# ===============================
+# Bulk catalog import
+# ===============================
+# State registries arrive as spreadsheets with tens of thousands of rows.
+# The request body (NDJSON or CSV) is read as a stream, rows are validated
+# against the catalog model a batch at a time (one pydantic call per batch)
+# and written with unordered insert_many / bulk upserts, while the next batch
+# is being parsed. A bad row is reported with its line number and skipped;
+# it never aborts the rest of the load.
+IMPORT_BATCH = 1000
+IMPORT_MAX_ERRORS = 1000  # errors listed in the report; all are counted
+DUPLICATE_KEY = 11000     # MongoDB error code (unique import_key index)
+
+Row = Tuple[int, dict]  # (line number in the upload, raw fields)
+
+
+class ImportReport:
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def error(self, line: int, message: str):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda e: e["line"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+# --- Parsing ---
+async def read_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Splits a byte stream into text lines without holding the whole body."""
+    pending = b""
+    first = True
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            text = line.decode("utf-8-sig" if first else "utf-8", errors="replace")
+            first = False
+            yield text.rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig" if first else "utf-8", errors="replace").rstrip("\r")
+
+
+async def read_ndjson(chunks: AsyncIterator[bytes], report: ImportReport) -> AsyncIterator[Row]:
+    line_no = 0
+    async for line in read_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        report.received += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            report.error(line_no, f"invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            report.error(line_no, "expected a JSON object")
+            continue
+        yield line_no, row
+
+
+async def read_csv(chunks: AsyncIterator[bytes], report: ImportReport) -> AsyncIterator[Row]:
+    """
+    First record is the header. Quoted fields may span lines: a record is
+    complete once its quote count is even.
+    """
+    header = None
+    record: List[str] = []
+    quotes = 0
+    line_no = start = 0
+    async for line in read_lines(chunks):
+        line_no += 1
+        if not record:
+            start = line_no
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text, record, quotes = "\n".join(record), [], 0
+        if not text.strip():
+            continue
+        fields = next(csv.reader(io.StringIO(text)))
+        if header is None:
+            header = [h.strip() for h in fields]
+            continue
+        report.received += 1
+        if len(fields) > len(header):
+            report.error(start, f"expected {len(header)} columns, got {len(fields)}")
+            continue
+        # Empty cells fall back to the model defaults
+        yield start, {h: v.strip() for h, v in zip(header, fields) if h and v.strip()}
+    if record:
+        report.received += 1
+        report.error(start, "unterminated quoted field")
+
+
+async def batches(rows: AsyncIterator[Row], size: int) -> AsyncIterator[List[Row]]:
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- Validation ---
+def validate_batch(adapter: TypeAdapter, rows: List[Row], report: ImportReport) -> List[Row]:
+    """Validates the whole batch in one call; on failure re-runs it without the bad rows."""
+    try:
+        models = adapter.validate_python([raw for _, raw in rows])
+    except ValidationError as e:
+        problems: Dict[int, List[str]] = {}
+        for err in e.errors():
+            index, *field = err["loc"]
+            label = ".".join(str(part) for part in field) or "row"
+            problems.setdefault(index, []).append(f"{label}: {err['msg']}")
+        for index, messages in sorted(problems.items()):
+            report.error(rows[index][0], "; ".join(messages))
+        rows = [row for i, row in enumerate(rows) if i not in problems]
+        models = adapter.validate_python([raw for _, raw in rows])
+    return [(line, model.model_dump()) for (line, _), model in zip(rows, models)]
+
+
+# --- Writing ---
+async def write_batch(collection, docs: List[Row], keys: Optional[Tuple[str, ...]], report: ImportReport) -> List[dict]:
+    """
+    Inserts (keys=None) or upserts `docs` without stopping at the first
+    failure. Rows whose natural key is already taken fail on the unique
+    import_key index and are reported as duplicates. Returns the documents
+    that were written (inserted ones carry their new _id).
+    """
+    failed: Dict[int, str] = {}
+    try:
+        if keys is None:
+            result = await collection.insert_many([doc for _, doc in docs], ordered=False)
+            report.inserted += len(result.inserted_ids)
+        else:
+            result = await collection.bulk_write(
+                [ReplaceOne({k: doc.get(k) for k in keys}, doc, upsert=True) for _, doc in docs],
+                ordered=False,
+            )
+            report.inserted += result.upserted_count
+            report.updated += result.matched_count
+    except BulkWriteError as e:
+        details = e.details
+        report.inserted += details.get("nInserted", 0) + details.get("nUpserted", 0)
+        report.updated += details.get("nMatched", 0)
+        natural_key = ", ".join(CATALOG_KEYS.get(collection.name, ()))
+        for err in details.get("writeErrors", []):
+            if err.get("code") == DUPLICATE_KEY:
+                failed[err["index"]] = f"duplicate key: a row with the same ({natural_key}) already exists"
+            else:
+                failed[err["index"]] = err.get("errmsg", "write failed")
+    for index, message in failed.items():
+        report.error(docs[index][0], message)
+
+    return [doc for i, (_, doc) in enumerate(docs) if i not in failed]
+
+
+async def attach_ids(collection, docs: List[dict], keys: Tuple[str, ...]):
+    """Upserted documents that replaced an existing one keep its _id; look them up."""
+    found = await collection.find(
+        {"$or": [{k: doc.get(k) for k in keys} for doc in docs]},
+        {k: 1 for k in keys},
+    ).to_list(None)
+    id_by_key = {tuple(d.get(k) for k in keys): d["_id"] for d in found}
+    for doc in docs:
+        doc["_id"] = id_by_key.get(tuple(doc.get(k) for k in keys))
+
+
+async def import_catalog(
+    collection,
+    model: Type[BaseModel],
+    chunks: AsyncIterator[bytes],
+    fmt: str = "ndjson",
+    upsert: bool = False,
+    on_written: Optional[Callable[[List[dict]], None]] = None,
+) -> dict:
+    """
+    Streams `chunks` (request body) into `collection`. `on_written` gets each
+    written batch as documents with their _id (e.g. to update a search index).
+    One batch is written while the next one is parsed and validated.
+    """
+    report = ImportReport()
+    adapter = TypeAdapter(List[model])
+    keys = CATALOG_KEYS[collection.name] if upsert else None
+    reader = read_csv if fmt == "csv" else read_ndjson
+
+    async def write(docs):
+        written = await write_batch(collection, docs, keys, report)
+        if on_written and written:
+            if keys is not None:
+                await attach_ids(collection, written, keys)
+            on_written(written)
+
+    pending: Optional[asyncio.Task] = None
+    try:
+        async for batch in batches(reader(chunks, report), IMPORT_BATCH):
+            docs = validate_batch(adapter, batch, report)
+            if pending:
+                await pending
+            pending = asyncio.ensure_future(write(docs)) if docs else None
+        if pending:
+            await pending
+    finally:
+        if pending and not pending.done():
+            pending.cancel()
+    print(
+        f"📥 Imported into {collection.name}: {report.inserted} inserted, "
+        f"{report.updated} updated, {report.failed} failed"
+    )
+    return report.as_dict()
@@ -0,0 +1,98 @@
+import os
+import re
+from typing import List, Optional, Tuple
+
+# ===============================
+# Token-budgeted chat context
+# ===============================
+# The prompt gets the rolling summary of older turns plus as many recent
+# messages as fit in CONTEXT_TOKEN_BUDGET, newest first, with any single
+# message capped so one long answer cannot crowd out the rest. Token counts
+# are estimated (no tokenizer download): ~4 characters per token for Latin
+# text and ~2 for Devanagari, which is what Qwen/Gemini tokenizers average.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+MESSAGE_TOKEN_CAP = int(os.getenv("MESSAGE_TOKEN_CAP", "350"))
+
+# Rolling summary: keep this many latest messages verbatim, and fold older
+# ones into the summary once the unsummarised history exceeds the budget
+SUMMARY_KEEP_RECENT = int(os.getenv("SUMMARY_KEEP_RECENT", "6"))
+SUMMARY_TRIGGER_TOKENS = int(os.getenv("SUMMARY_TRIGGER_TOKENS", str(CONTEXT_TOKEN_BUDGET)))
+SUMMARY_MAX_TOKENS = 300
+
+_DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    devanagari = len(_DEVANAGARI.findall(text))
+    return (devanagari + 1) // 2 + (len(text) - devanagari + 3) // 4 + 4  # + per-message overhead
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts `text` at a word boundary so it fits roughly `max_tokens`."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:  # longest prefix that fits
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) + 1 <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text.rfind(" ", 0, lo)
+    return text[:cut if cut > lo // 2 else lo].rstrip() + " …"
+
+
+def select_history(
+    history: List[Tuple[str, str]],
+    budget: int = CONTEXT_TOKEN_BUDGET,
+    message_cap: int = MESSAGE_TOKEN_CAP,
+) -> List[Tuple[str, str]]:
+    """
+    Picks (role, content) pairs from the end of `history` until the budget
+    is spent; returns them in chronological order.
+    """
+    picked, used = [], 0
+    for role, content in reversed(history):
+        content = truncate_to_tokens(content or "", message_cap)
+        cost = estimate_tokens(content)
+        if used + cost > budget:
+            break
+        picked.append((role, content))
+        used += cost
+    picked.reverse()
+    return picked
+
+
+def summary_due(history: List[Tuple[str, str]]) -> bool:
+    """True when the not-yet-summarised messages no longer fit the budget."""
+    if len(history) <= SUMMARY_KEEP_RECENT:
+        return False
+    return sum(estimate_tokens(content) for _, content in history) > SUMMARY_TRIGGER_TOKENS
+
+
+def summary_prompt(previous_summary: str, messages: List[Tuple[str, str]]) -> List[dict]:
+    transcript = "\n".join(
+        f"{'Farmer' if role == 'user' else 'Assistant'}: {truncate_to_tokens(content, MESSAGE_TOKEN_CAP)}"
+        for role, content in messages
+    )
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You maintain a running summary of a conversation between a farmer and "
+                "Krishi Sathi, an agricultural assistant. Update the summary with the new "
+                "messages. Keep facts the assistant will need later: the farmer's crops, "
+                "location, land, problems, advice already given and open questions. "
+                f"Write at most {SUMMARY_MAX_TOKENS * 3 // 4} words, in English, as short notes."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Current summary:\n{previous_summary or '(none)'}\n\n"
+                f"New messages:\n{transcript}\n\nUpdated summary:"
+            ),
+        },
+    ]
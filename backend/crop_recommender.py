@@ -0,0 +1,165 @@
+import os
+import csv
+import json
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from intent_router import KeywordAutomaton
+from tool_cache import normalize_text, normalize_location
+
+# ===============================
+# Crop recommendation table
+# ===============================
+# data/crop_recommendations.csv holds rows of (soil, season, agro-climatic
+# zone) -> ranked crops + advice, where "*" matches anything. At load time the
+# rows are expanded into a dense int array table[soil, season, zone] -> row,
+# with more specific rows overriding wildcard ones, so a recommendation is a
+# single array read and a batch of plots is one fancy-indexing gather.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RECOMMENDATIONS_CSV = os.getenv(
+    "CROP_RECOMMENDATIONS_CSV", os.path.join(BASE_DIR, "data", "crop_recommendations.csv")
+)
+AGRO_ZONES_JSON = os.getenv(
+    "AGRO_ZONES_JSON", os.path.join(BASE_DIR, "data", "agro_zones.json")
+)
+
+WILDCARD = "*"
+# Which field decides when two rows both match: zone, then soil, then season
+_SPECIFICITY = {"zone": 4, "soil": 2, "season": 1}
+
+SOIL_TYPES = KeywordAutomaton({
+    "black": ["black", "regur", "काली"],
+    "red": ["red", "लाल"],
+    "alluvial": ["alluvial", "jalodh", "जलोढ़"],
+    "laterite": ["laterite", "lateritic", "लेटराइट"],
+    "sandy": ["sandy", "sand", "balui", "retili", "बलुई", "रेतीली"],
+    "loamy": ["loam", "loamy", "domat", "दोमट"],
+    "clay": ["clay", "clayey", "chikni", "चिकनी"],
+}).build()
+
+SEASONS = KeywordAutomaton({
+    "kharif": ["kharif", "monsoon", "rainy", "खरीफ", "बरसात"],
+    "rabi": ["rabi", "winter", "रबी", "सर्दी"],
+    "zaid": ["zaid", "zayed", "summer", "garmi", "जायद", "गर्मी"],
+}).build()
+
+
+def _first_label(automaton: KeywordAutomaton, text: str) -> Optional[str]:
+    for _, _, label in automaton.finditer(str(text)):
+        return label
+    return None
+
+
+class CropRecommender:
+    def __init__(self, rows: List[dict], zones: dict):
+        self.rows = [
+            {
+                "crops": [c.strip() for c in row["crops"].split(";") if c.strip()],
+                "advice": row["advice"].strip(),
+            }
+            for row in rows
+        ]
+        keys = [
+            {f: normalize_text(row[f]) or WILDCARD for f in ("soil", "season", "zone")}
+            for row in rows
+        ]
+
+        # Value -> axis position; the last slot of every axis means "unknown"
+        self.axes: Dict[str, Dict[str, int]] = {}
+        for field in ("soil", "season", "zone"):
+            values = sorted({k[field] for k in keys if k[field] != WILDCARD})
+            self.axes[field] = {value: i for i, value in enumerate(values)}
+        shape = tuple(len(self.axes[f]) + 1 for f in ("soil", "season", "zone"))
+
+        self.table = np.full(shape, -1, dtype=np.int32)
+        by_specificity = sorted(
+            range(len(keys)),
+            key=lambda i: sum(_SPECIFICITY[f] for f, v in keys[i].items() if v != WILDCARD),
+        )
+        for i in by_specificity:
+            index = tuple(
+                slice(None) if keys[i][f] == WILDCARD else self.axes[f][keys[i][f]]
+                for f in ("soil", "season", "zone")
+            )
+            self.table[index] = i
+
+        self.state_zones = {normalize_location(k): v for k, v in zones.get("states", {}).items()}
+        self.district_zones = {normalize_location(k): v for k, v in zones.get("districts", {}).items()}
+
+    def zone_of(self, location: str) -> Optional[str]:
+        """District match first, then state, over each comma-separated part."""
+        parts = [normalize_location(p) for p in str(location).split(",") if p.strip()]
+        for table in (self.district_zones, self.state_zones):
+            for part in parts:
+                if part in table:
+                    return table[part]
+        return None
+
+    def _codes(self, field: str, values: Sequence[Optional[str]]) -> np.ndarray:
+        axis = self.axes[field]
+        unknown = len(axis)
+        return np.fromiter(
+            (axis.get(v, unknown) if v else unknown for v in values), dtype=np.int64, count=len(values)
+        )
+
+    def recommend_many(self, plots: Sequence[dict]) -> List[dict]:
+        """
+        plots: dicts with soil_type, season and location. Free-text fields are
+        parsed once per distinct value; the table lookup is one gather.
+        """
+        parsed: Dict[tuple, Optional[str]] = {}
+
+        def parse(kind, value):
+            key = (kind, value)
+            if key not in parsed:
+                if kind == "soil":
+                    parsed[key] = _first_label(SOIL_TYPES, value)
+                elif kind == "season":
+                    parsed[key] = _first_label(SEASONS, value)
+                else:
+                    parsed[key] = self.zone_of(value)
+            return parsed[key]
+
+        soils = [parse("soil", p.get("soil_type", "")) for p in plots]
+        seasons = [parse("season", p.get("season", "")) for p in plots]
+        zones = [parse("zone", p.get("location", "")) for p in plots]
+
+        row_ids = self.table[
+            self._codes("soil", soils), self._codes("season", seasons), self._codes("zone", zones)
+        ]
+
+        results = []
+        for soil, season, zone, row_id in zip(soils, seasons, zones, row_ids.tolist()):
+            row = self.rows[row_id] if row_id >= 0 else {"crops": [], "advice": ""}
+            results.append({
+                "soil": soil,
+                "season": season,
+                "zone": zone,
+                "recommendations": row["crops"],
+                "advice": row["advice"],
+            })
+        return results
+
+
+_recommender: Optional[CropRecommender] = None
+_recommender_lock = threading.Lock()
+
+
+def load_recommender() -> CropRecommender:
+    with open(RECOMMENDATIONS_CSV, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    with open(AGRO_ZONES_JSON, encoding="utf-8") as f:
+        zones = json.load(f)
+    return CropRecommender(rows, zones)
+
+
+def get_recommender() -> CropRecommender:
+    global _recommender
+    if _recommender is None:
+        with _recommender_lock:
+            if _recommender is None:
+                _recommender = load_recommender()
+                print(f"🌱 Compiled crop recommendation table {_recommender.table.shape}")
+    return _recommender
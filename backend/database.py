@@ -1,4 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
 import certifi
 import os
 from dotenv import load_dotenv
@@ -22,3 +24,98 @@ database = client.krishi_mitra  # Database name
 
 def get_database():
     return database
+
+
+# ===============================
+# Indexes
+# ===============================
+# Every query the routers run has an index here; ensure_indexes() is called
+# from the app lifespan and is a no-op for indexes that already exist.
+
+# Case-insensitive matching for catalog filters; queries must use the same
+# collation to be served by the indexes below
+CATALOG_COLLATION = {"locale": "en", "strength": 2}
+
+# Natural key of each catalog collection (bulk import upserts match on it).
+# A workshop runs again at other places and dates, and a provider offers one
+# product in several states on different terms, so those count as new rows.
+CATALOG_KEYS = {
+    "schemes": ("title",),
+    "training": ("title", "organizer", "location", "duration"),
+    "financial_aid": ("title", "provider", "amount_range", "eligibility"),
+    "shgs": ("name", "district"),
+    "health_safety": ("title",),
+}
+
+INDEXES = {
+    "chat_sessions": [
+        # get_session / update_session_messages / summary refresh
+        IndexModel([("session_id", ASCENDING)], name="session_id", unique=True),
+        # Sidebar listing: equality on user, keyset on (last_updated, _id)
+        IndexModel(
+            [("user_id", ASCENDING), ("last_updated", DESCENDING), ("_id", DESCENDING)],
+            name="user_recent",
+        ),
+        # attach_generated_image: only messages still waiting on an image job
+        IndexModel(
+            [("messages.image_job_id", ASCENDING)],
+            name="pending_image_jobs",
+            partialFilterExpression={"messages.image_job_id": {"$type": "string"}},
+        ),
+    ],
+    # Women-empowerment catalog: (equality filters..., _id) indexes, so a
+    # query on exactly those filters is one seek already in _id keyset order
+    # (see catalog.py). Each filter has its own, plus the location drill-down
+    # and location + focus area; other mixes (e.g. state + district) use the
+    # most selective one and check the rest on the rows it returns.
+    "shgs": [
+        IndexModel(
+            [*((field, ASCENDING) for field in fields), ("_id", ASCENDING)],
+            name=f"{'_'.join(fields)}_id",
+            collation=CATALOG_COLLATION,
+        )
+        for fields in (
+            ("state",), ("district",), ("city",), ("focus_area",), ("category",),
+            ("state", "district", "city"),
+            ("state", "focus_area"),
+            ("district", "focus_area"),
+        )
+    ],
+    **{
+        collection: [
+            IndexModel([("category", ASCENDING), ("_id", ASCENDING)], name="category_id", collation=CATALOG_COLLATION),
+        ]
+        for collection in ("schemes", "training", "financial_aid", "health_safety")
+    },
+}
+
+# One document per natural key: bulk import upserts match on it, and a
+# re-imported row is reported as a duplicate (see catalog_import.py). On a
+# collection that already holds duplicates this index fails to build until
+# they are cleaned up; ensure_indexes logs that and carries on.
+for _collection, _keys in CATALOG_KEYS.items():
+    INDEXES[_collection].append(IndexModel([(k, ASCENDING) for k in _keys], name="import_key", unique=True))
+
+
+# An index of the same name with other keys or options (e.g. a natural key
+# that gained a field) is dropped and rebuilt
+INDEX_CONFLICT_CODES = (85, 86)  # IndexOptionsConflict, IndexKeySpecsConflict
+
+
+async def ensure_indexes():
+    """Creates missing indexes; one failing index (e.g. duplicates) doesn't block the rest."""
+    for collection, indexes in INDEXES.items():
+        for index in indexes:
+            name = index.document["name"]
+            try:
+                try:
+                    await database[collection].create_indexes([index])
+                except OperationFailure as e:
+                    if e.code not in INDEX_CONFLICT_CODES:
+                        raise
+                    print(f"🔁 Rebuilding index {collection}.{name} with its new definition")
+                    await database[collection].drop_index(name)
+                    await database[collection].create_indexes([index])
+            except Exception as e:
+                print(f"❌ Index {collection}.{name} failed: {e}")
+    print(f"🗂️ Ensured {sum(len(i) for i in INDEXES.values())} MongoDB indexes")
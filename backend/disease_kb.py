@@ -0,0 +1,179 @@
+import os
+import json
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scheme_index import tokenize, phonetic_key
+from mandi_store import normalize_crop
+
+# ===============================
+# Crop disease knowledge base
+# ===============================
+# Symptom descriptions (English, Hindi and Hinglish) from a JSON file are
+# turned into L2-normalised TF-IDF vectors once, stored column-wise
+# (term -> entries, like a CSC matrix). A query only touches the columns of
+# its own terms; a whole batch of reports is scored with a single
+# np.bincount into a (reports x entries) matrix and the top-k taken with
+# np.argpartition, so there is no Python loop over the knowledge base.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DISEASE_KB_PATH = os.getenv(
+    "DISEASE_KB_PATH", os.path.join(BASE_DIR, "data", "crop_diseases.json")
+)
+
+UNKNOWN_DIAGNOSIS = "Unknown Issue"
+DEFAULT_REMEDY = "Consult a local agricultural officer."
+
+MIN_SCORE = 0.12             # below this cosine similarity we don't guess
+OTHER_CROP_PENALTY = 0.5     # entries for a different crop than reported
+NO_CROP_PENALTY = 0.75       # crop-specific entries when no crop is reported
+PHONETIC_WEIGHT = 0.5        # spelling-tolerant terms count less than exact words
+BATCH_BLOCK = 32             # reports scored per bincount (bounds memory)
+
+
+def _terms(text: str) -> Counter:
+    terms = Counter()
+    for token in tokenize(text):
+        terms[f"w:{token}"] += 1.0
+        key = phonetic_key(token)
+        if len(key) > 2:
+            terms[f"p:{key}"] += PHONETIC_WEIGHT
+    return terms
+
+
+class DiseaseKB:
+    def __init__(self, entries: List[dict]):
+        self.entries = entries
+        # Crop of each entry as an int code; -1 means "any crop"
+        self.crop_codes: Dict[str, int] = {}
+        for e in entries:
+            crop = normalize_crop(e.get("crop", "any"))
+            if crop != "any":
+                self.crop_codes.setdefault(crop, len(self.crop_codes))
+        self.entry_crop_codes = np.array(
+            [self.crop_codes.get(normalize_crop(e.get("crop", "any")), -1) for e in entries], dtype=np.int64
+        )
+        self.crop_specific_mask = self.entry_crop_codes != -1
+        self.other_crop_masks = [
+            (self.entry_crop_codes != -1) & (self.entry_crop_codes != code)
+            for code in range(len(self.crop_codes))
+        ]
+        docs = [_terms(" ".join([e["disease"], *e["symptoms"]])) for e in entries]
+
+        self.vocab: Dict[str, int] = {}
+        for doc in docs:
+            for term in doc:
+                self.vocab.setdefault(term, len(self.vocab))
+
+        n = len(entries)
+        df = np.zeros(len(self.vocab), dtype=np.float64)
+        for doc in docs:
+            df[[self.vocab[t] for t in doc]] += 1
+        self.idf = np.log((1 + n) / (1 + df)) + 1.0
+
+        # Sparse entry vectors (sublinear tf * idf, L2-normalised), then
+        # regrouped by term so queries can read one contiguous slice per term
+        rows, cols, vals = [], [], []
+        for row, doc in enumerate(docs):
+            c = np.fromiter((self.vocab[t] for t in doc), dtype=np.int64, count=len(doc))
+            v = (1.0 + np.log(np.fromiter(doc.values(), dtype=np.float64, count=len(doc)))) * self.idf[c]
+            v /= np.linalg.norm(v) or 1.0
+            rows.append(np.full(len(doc), row, dtype=np.int64))
+            cols.append(c)
+            vals.append(v)
+        rows, cols, vals = (np.concatenate(a) if a else np.zeros(0) for a in (rows, cols, vals))
+        order = np.argsort(cols, kind="stable")
+        self.term_rows = rows[order].astype(np.int64)
+        self.term_vals = vals[order]
+        self.term_ptr = np.concatenate([[0], np.cumsum(np.bincount(cols.astype(np.int64), minlength=len(self.vocab)))])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def vectorize(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        doc = {t: tf for t, tf in _terms(text).items() if t in self.vocab}
+        if not doc:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        c = np.fromiter((self.vocab[t] for t in doc), dtype=np.int64, count=len(doc))
+        v = (1.0 + np.log(np.fromiter(doc.values(), dtype=np.float64, count=len(doc)))) * self.idf[c]
+        return c, v / np.linalg.norm(v)
+
+    def _score_block(self, queries: Sequence[str], crops: Sequence[Optional[str]]) -> np.ndarray:
+        n = len(self.entries)
+        flat_idx, flat_val = [], []
+        for qi, text in enumerate(queries):
+            cols, qv = self.vectorize(text)
+            for col, w in zip(cols, qv):
+                lo, hi = self.term_ptr[col], self.term_ptr[col + 1]
+                flat_idx.append(self.term_rows[lo:hi] + qi * n)
+                flat_val.append(self.term_vals[lo:hi] * w)
+        if not flat_idx:
+            return np.zeros((len(queries), n))
+        scores = np.bincount(
+            np.concatenate(flat_idx), weights=np.concatenate(flat_val), minlength=len(queries) * n
+        ).reshape(len(queries), n)
+
+        # Entries for another crop than the reported one are down-weighted;
+        # without a crop, "any crop" entries win over crop-specific ones
+        # that match about as well
+        for qi, crop in enumerate(crops):
+            code = self.crop_codes.get(normalize_crop(crop), -1) if crop else -1
+            if code != -1:
+                scores[qi, self.other_crop_masks[code]] *= OTHER_CROP_PENALTY
+            elif not crop:
+                scores[qi, self.crop_specific_mask] *= NO_CROP_PENALTY
+        return scores
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        crops: Optional[Sequence[Optional[str]]] = None,
+        top_k: int = 3,
+    ) -> List[List[Tuple[int, float]]]:
+        """Top-k (entry index, cosine score) per query, scored in blocks."""
+        crops = crops or [None] * len(queries)
+        k = max(1, min(top_k, len(self.entries)))
+        results = []
+        for start in range(0, len(queries), BATCH_BLOCK):
+            scores = self._score_block(queries[start:start + BATCH_BLOCK], crops[start:start + BATCH_BLOCK])
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            for idx, sc in zip(top.tolist(), top_scores.tolist()):
+                results.append([(i, s) for i, s in zip(idx, sc) if s >= MIN_SCORE])
+        return results
+
+    def diagnose_many(self, reports: Sequence[Tuple[str, Optional[str]]], top_k: int = 3) -> List[List[dict]]:
+        """Diagnoses (symptoms, crop) pairs; each result is a ranked match list."""
+        hits = self.search_batch([s for s, _ in reports], [c for _, c in reports], top_k)
+        return [
+            [
+                {
+                    "disease": self.entries[i]["disease"],
+                    "crop": self.entries[i].get("crop", "any"),
+                    "remedy": self.entries[i]["remedy"],
+                    "score": round(score, 3),
+                }
+                for i, score in row
+            ]
+            for row in hits
+        ]
+
+
+_kb: Optional[DiseaseKB] = None
+_kb_lock = threading.Lock()
+
+
+def get_disease_kb() -> DiseaseKB:
+    global _kb
+    if _kb is None:
+        with _kb_lock:
+            if _kb is None:
+                with open(DISEASE_KB_PATH, encoding="utf-8") as f:
+                    _kb = DiseaseKB(json.load(f))
+                print(f"🩺 Loaded {len(_kb)} crop disease entries")
+    return _kb
@@ -0,0 +1,177 @@
+import heapq
+from typing import Tuple
+
+import numpy as np
+
+# ===============================
+# Geohash quantisation
+# ===============================
+# Nearby coordinates share a geohash prefix, which makes the hash a handy
+# cache key: every point inside one cell maps to the same string.
+#   precision 5 ≈ 4.9 km x 4.9 km, precision 6 ≈ 1.2 km x 0.6 km
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat: float, lon: float, precision: int = 6) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # geohash interleaves bits starting with longitude
+
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits = bits << 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_center(geohash: str) -> Tuple[float, float]:
+    """Returns the (lat, lon) centre of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        index = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (index >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+# ===============================
+# Nearest-neighbour search
+# ===============================
+# Points on the globe are stored as 3-D unit vectors: straight-line (chord)
+# distance between them orders points exactly like great-circle distance,
+# so a plain Euclidean KD-tree answers "k nearest" without haversine math.
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vectors(lat, lon) -> np.ndarray:
+    """(n,) latitudes / longitudes in degrees -> (n, 3) unit vectors."""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(chord) -> np.ndarray:
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0.0, 1.0))
+
+
+class KDTree:
+    """
+    Static KD-tree over an (n, d) array. Nodes split the widest side of their
+    bounding box at the median; leaves hold up to LEAF_SIZE points stored
+    contiguously, so each visited leaf is one vectorised distance computation.
+    Queries walk the tree best-first and stop once no unvisited box can beat
+    the current k-th distance.
+    """
+    LEAF_SIZE = 32
+
+    def __init__(self, points: np.ndarray):
+        points = np.asarray(points, dtype=np.float64)
+        n = len(points)
+        order = np.arange(n)
+        lo, hi, left, right, box_min, box_max = [], [], [], [], [], []
+
+        def new_node(start, end):
+            lo.append(start)
+            hi.append(end)
+            left.append(-1)
+            right.append(-1)
+            chunk = points[order[start:end]]
+            box_min.append(chunk.min(axis=0) if end > start else np.zeros(points.shape[1]))
+            box_max.append(chunk.max(axis=0) if end > start else np.zeros(points.shape[1]))
+            return len(lo) - 1
+
+        stack = [new_node(0, n)]
+        while stack:
+            node = stack.pop()
+            start, end = lo[node], hi[node]
+            if end - start <= self.LEAF_SIZE:
+                continue
+            axis = int(np.argmax(box_max[node] - box_min[node]))
+            mid = (start + end) // 2
+            idx = order[start:end]
+            order[start:end] = idx[np.argpartition(points[idx, axis], mid - start)]
+            left[node] = new_node(start, mid)
+            right[node] = new_node(mid, end)
+            stack.extend((left[node], right[node]))
+
+        self.order = order
+        self.points = points[order]
+        self.lo = lo
+        self.hi = hi
+        self.left = left
+        self.right = right
+        # Plain tuples: per-node box checks on 3 floats are faster in Python
+        self.box_min = [tuple(b.tolist()) for b in box_min]
+        self.box_max = [tuple(b.tolist()) for b in box_max]
+
+    def __len__(self):
+        return len(self.points)
+
+    def _box_distance(self, node: int, x: Tuple[float, ...]) -> float:
+        d2 = 0.0
+        for v, low, high in zip(x, self.box_min[node], self.box_max[node]):
+            gap = low - v if v < low else v - high if v > high else 0.0
+            d2 += gap * gap
+        return d2
+
+    def query(self, x, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (distances, indices into the original points), nearest first."""
+        x = np.asarray(x, dtype=np.float64)
+        xs = tuple(x.tolist())
+        k = min(k, len(self.points))
+        if k <= 0:
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+
+        best_d2 = np.zeros(0)
+        best_pos = np.zeros(0, dtype=np.int64)
+        kth = np.inf
+        heap = [(self._box_distance(0, xs), 0)]
+        while heap:
+            box_d2, node = heapq.heappop(heap)
+            if box_d2 > kth:
+                break
+            if self.left[node] < 0:
+                start, end = self.lo[node], self.hi[node]
+                diff = self.points[start:end] - x
+                d2 = np.einsum("ij,ij->i", diff, diff)
+                best_d2 = np.concatenate([best_d2, d2])
+                best_pos = np.concatenate([best_pos, np.arange(start, end)])
+                if len(best_d2) > k:
+                    keep = np.argpartition(best_d2, k - 1)[:k]
+                    best_d2, best_pos = best_d2[keep], best_pos[keep]
+                if len(best_d2) == k:
+                    kth = best_d2.max()
+                continue
+            for child in (self.left[node], self.right[node]):
+                child_d2 = self._box_distance(child, xs)
+                if child_d2 <= kth:
+                    heapq.heappush(heap, (child_d2, child))
+
+        ranked = np.argsort(best_d2, kind="stable")
+        return np.sqrt(best_d2[ranked]), self.order[best_pos[ranked]]
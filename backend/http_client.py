@@ -0,0 +1,32 @@
+import os
+import httpx
+from typing import Optional
+
+# ===============================
+# Shared async HTTP client
+# ===============================
+# One pooled client for every outbound REST call (geocoding, weather, ...)
+# so requests never block the event loop and TLS connections to the same
+# upstream are kept alive and reused across chats.
+HTTP_TIMEOUT = httpx.Timeout(5.0, connect=3.0)
+HTTP_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=60.0,
+)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
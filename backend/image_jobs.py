@@ -0,0 +1,139 @@
+import os
+import re
+import uuid
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+from cache import TTLCache
+
+# ===============================
+# Image generation job queue
+# ===============================
+# Text-to-image takes far longer than a text reply, so it runs on a small
+# pool of background workers instead of on the request path. Identical
+# (normalised) prompts share one job while in flight, and finished images
+# are remembered so repeat requests are answered instantly.
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+IMAGE_QUEUE_SIZE = int(os.getenv("IMAGE_QUEUE_SIZE", "100"))
+
+
+class ImageJob(BaseModel):
+    job_id: str
+    prompt: str
+    key: str
+    status: str = "queued"  # queued | running | done | failed
+    image_url: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def normalize_prompt(prompt: str) -> str:
+    text = prompt.casefold()
+    text = re.sub(r"[^\w\s\u0900-\u097F]", " ", text)
+    return " ".join(text.split())
+
+
+class ImageJobQueue:
+    def __init__(
+        self,
+        generate: Callable[[str], Awaitable[Optional[str]]],
+        workers: int = IMAGE_WORKERS,
+        maxsize: int = IMAGE_QUEUE_SIZE,
+    ):
+        self._generate = generate
+        self._num_workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._maxsize = maxsize
+        self._workers: List[asyncio.Task] = []
+        self._inflight: Dict[str, ImageJob] = {}
+        self._on_complete: List[Callable[[ImageJob], Awaitable[None]]] = []
+        self.jobs = TTLCache("images.jobs", maxsize=10_000, ttl=24 * 3600)
+        self.results = TTLCache("images.results", maxsize=1_000, ttl=7 * 24 * 3600)
+
+    def on_complete(self, callback: Callable[[ImageJob], Awaitable[None]]):
+        self._on_complete.append(callback)
+        return callback
+
+    def _ensure_started(self):
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self._maxsize)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self._num_workers)
+        ]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, prompt: str) -> Tuple[Optional[ImageJob], Optional[str]]:
+        """
+        Returns (None, image_url) on a cache hit, otherwise (job, None) for a
+        new or already-running job producing the same normalised prompt.
+        """
+        key = normalize_prompt(prompt)
+        image_url = self.results.get(key)
+        if image_url:
+            return None, image_url
+
+        job = self._inflight.get(key)
+        if job is not None:
+            return job, None
+
+        self._ensure_started()
+        job = ImageJob(job_id=uuid.uuid4().hex, prompt=prompt, key=key)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError("Image generation queue is full")
+        self._inflight[key] = job
+        self.jobs.set(job.job_id, job)
+        return job, None
+
+    def get_job(self, job_id: str) -> Optional[ImageJob]:
+        return self.jobs.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: ImageJob):
+        job.status = "running"
+        try:
+            image_url = await self._generate(job.prompt)
+        except Exception as e:
+            print(f"❌ Image Job Error ({job.job_id}): {e}")
+            image_url = None
+        finally:
+            self._inflight.pop(job.key, None)
+
+        if image_url:
+            job.status = "done"
+            job.image_url = image_url
+            self.results.set(job.key, image_url)
+        else:
+            job.status = "failed"
+
+        for callback in self._on_complete:
+            try:
+                await callback(job)
+            except Exception as e:
+                print(f"Image Job Callback Error ({job.job_id}): {e}")
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "inflight": len(self._inflight),
+        }
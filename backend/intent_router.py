@@ -0,0 +1,125 @@
+from collections import deque
+from typing import Dict, Hashable, Iterable, Iterator, List, Set, Tuple
+
+# ===============================
+# Keyword automaton (Aho-Corasick)
+# ===============================
+# Matches every keyword of every set in a single left-to-right pass over
+# the text, instead of one substring scan per keyword. Latin text is
+# case-folded and only matches whole words ("rain" is not in "grain");
+# Devanagari has no case and is matched as-is, so stems like "कीड़" still
+# match their inflections.
+
+
+def _is_word_char(text: str, index: int) -> bool:
+    return 0 <= index < len(text) and (text[index].isalnum() or text[index] == "_")
+
+
+class KeywordAutomaton:
+    def __init__(self, keywords: Dict[Hashable, Iterable[str]] = None):
+        # Trie stored as parallel lists indexed by node id
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Hashable, bool]]] = [[]]
+        self._built = False
+        for label, words in (keywords or {}).items():
+            for word in words:
+                self.add(word, label)
+
+    def add(self, keyword: str, label: Hashable):
+        keyword = keyword.casefold()
+        node = 0
+        for char in keyword:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][char] = nxt
+            node = nxt
+        self._out[node].append((len(keyword), label, keyword.isascii()))
+        self._built = False
+
+    def build(self):
+        """Computes failure links (BFS) and merges outputs along them."""
+        queue = deque()
+        for node in self._goto[0].values():
+            self._fail[node] = 0
+            queue.append(node)
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+        return self
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, Hashable]]:
+        """Yields (start, end, label) for every keyword occurrence."""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        folded = text.casefold()
+        node = 0
+        for i, char in enumerate(folded):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, label, latin in out[node]:
+                start = i - length + 1
+                if latin and (_is_word_char(folded, start - 1) or _is_word_char(folded, i + 1)):
+                    continue
+                yield start, i + 1, label
+
+    def labels(self, text: str) -> Set[Hashable]:
+        return {label for _, _, label in self.finditer(text)}
+
+
+# ===============================
+# Chat intents
+# ===============================
+IMAGE_KEYWORDS_EN = [
+    "generate an image", "generate image", "create an image", "create image",
+    "draw a", "draw an", "show me a picture", "show me an image",
+    "make an image", "make a picture", "make a photo",
+    "produce an image", "produce a picture",
+]
+IMAGE_KEYWORDS_HI = [
+    "चित्र बनाओ", "चित्र जनरेट", "चित्र दिखाओ", "चित्र बना",
+    "तस्वीर बनाओ", "तस्वीर जनरेट", "तस्वीर दिखाओ",
+    "फोटो बनाओ", "फोटो जनरेट", "इमेज बनाओ", "इमेज जनरेट",
+    "नया चित्र", "नया फोटो", "एक चित्र", "एक तस्वीर",
+]
+
+INTENT_KEYWORDS = {
+    "image": IMAGE_KEYWORDS_EN + IMAGE_KEYWORDS_HI,
+    "weather": [
+        "weather", "forecast", "rain", "temperature", "monsoon", "mausam", "barish", "baarish",
+        "मौसम", "बारिश", "बरसात", "तापमान", "मानसून",
+    ],
+    "price": [
+        "price", "prices", "mandi", "market rate", "bhav", "bhaav", "daam", "keemat",
+        "भाव", "दाम", "मंडी", "कीमत", "रेट",
+    ],
+    "scheme": [
+        "scheme", "schemes", "yojana", "yojna", "subsidy", "pm-kisan", "pm kisan", "insurance", "loan",
+        "योजना", "सब्सिडी", "बीमा", "ऋण", "कर्ज", "किसान सम्मान",
+    ],
+    "disease": [
+        "disease", "diseases", "pest", "pests", "blight", "fungus", "insect", "insects", "rog", "keeda",
+        "रोग", "कीट", "बीमारी", "कीड़", "धब्बे", "फफूंद",
+    ],
+}
+
+_intent_automaton = KeywordAutomaton(INTENT_KEYWORDS).build()
+
+
+def detect_intents(text: str) -> Set[str]:
+    """All intents found in a message, in one pass (e.g. {"price", "weather"})."""
+    return _intent_automaton.labels(text)
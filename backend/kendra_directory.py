@@ -0,0 +1,160 @@
+import os
+import csv
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from geo import KDTree, to_unit_vectors, chord_to_km
+from tool_cache import normalize_location
+
+# ===============================
+# Kisan Seva Kendra directory
+# ===============================
+# data/kisan_kendras.csv is SAMPLE data: Krishi Vigyan Kendra names with
+# approximate district-centre coordinates and the generic KVK mandate as
+# services. Address and contact are left blank rather than guessed; load
+# the ICAR KVK directory (same columns) via KISAN_KENDRAS_CSV for real
+# contact details. Centres are held in a KD-tree over unit
+# vectors for k-nearest lookups by lat/lon, and their city / district names
+# in a trigram index so misspelt places ("bhagalpore", "muzafarpur") still
+# resolve.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+KISAN_KENDRAS_CSV = os.getenv(
+    "KISAN_KENDRAS_CSV", os.path.join(BASE_DIR, "data", "kisan_kendras.csv")
+)
+
+# One-word place names share many trigrams with their neighbours ("rampur"
+# vs "raipur" scores 0.40), so a fuzzy match must clear the threshold and
+# beat the runner-up by a margin; otherwise /find falls back
+MIN_NAME_SIMILARITY = 0.42  # trigram Jaccard below this is not a match
+MIN_NAME_MARGIN = 0.1       # over the second-best place name
+
+
+def trigrams(text: str) -> List[str]:
+    """pg_trgm-style trigrams: each word padded with two spaces in front, one behind."""
+    grams = set()
+    for word in normalize_location(text).replace(",", " ").split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return sorted(grams)
+
+
+class TrigramIndex:
+    """Fuzzy name lookup: trigram postings scored with one np.bincount."""
+
+    def __init__(self, names: List[str]):
+        self.names = names
+        postings: Dict[str, List[int]] = {}
+        sizes = []
+        for i, name in enumerate(names):
+            grams = trigrams(name)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        self.postings = {g: np.array(ids, dtype=np.int64) for g, ids in postings.items()}
+        self.sizes = np.array(sizes, dtype=np.float64)
+
+    def search(self, query: str, limit: int = 5, min_similarity: float = MIN_NAME_SIMILARITY) -> List[Tuple[int, float]]:
+        """(name index, similarity) pairs, best first."""
+        grams = trigrams(query)
+        hits = [self.postings[g] for g in grams if g in self.postings]
+        if not hits:
+            return []
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.names))
+        similarity = shared / (len(grams) + self.sizes - shared)
+        k = min(limit, len(self.names))
+        top = np.argpartition(-similarity, k - 1)[:k]
+        top = top[np.argsort(-similarity[top], kind="stable")]
+        return [(int(i), float(similarity[i])) for i in top if similarity[i] >= min_similarity]
+
+
+class KendraDirectory:
+    def __init__(self, rows: List[dict]):
+        self.kendras = [
+            {
+                "name": row["name"].strip(),
+                "city": row["city"].strip(),
+                "district": row["district"].strip(),
+                "state": row["state"].strip(),
+                "address": row["address"].strip(),
+                "contact": row["contact"].strip(),
+                "services": [s.strip() for s in row["services"].split(";") if s.strip()],
+                "latitude": float(row["latitude"]),
+                "longitude": float(row["longitude"]),
+            }
+            for row in rows
+        ]
+        self.tree = KDTree(to_unit_vectors(
+            [k["latitude"] for k in self.kendras], [k["longitude"] for k in self.kendras]
+        ))
+
+        # Place name -> centres there; a centre is listed under its city and district
+        places: Dict[str, List[int]] = {}
+        for i, kendra in enumerate(self.kendras):
+            for place in {normalize_location(kendra["city"]), normalize_location(kendra["district"])}:
+                places.setdefault(place, []).append(i)
+        self.place_names = list(places)
+        self.place_kendras = [places[p] for p in self.place_names]
+        self.place_ids = {p: i for i, p in enumerate(self.place_names)}
+        self.name_index = TrigramIndex(self.place_names)
+
+    def __len__(self):
+        return len(self.kendras)
+
+    def nearest(self, lat: float, lon: float, k: int = 5) -> List[dict]:
+        chords, ids = self.tree.query(to_unit_vectors(lat, lon), k)
+        return [
+            {**self.kendras[i], "distance_km": round(float(km), 1)}
+            for i, km in zip(ids.tolist(), chord_to_km(chords))
+        ]
+
+    def match_place(self, query: str) -> Optional[Tuple[str, float]]:
+        """
+        Best place name for `query`. Each comma-separated part ("Sabour,
+        Bhagalpur") is tried as an exact / alias match first, then fuzzily;
+        a fuzzy match too close to the runner-up is no match.
+        """
+        parts = [p for p in str(query).split(",") if p.strip()]
+        for part in parts:
+            exact = self.place_ids.get(normalize_location(part))
+            if exact is not None:
+                return self.place_names[exact], 1.0
+        best = None
+        for part in parts:
+            ranked = self.name_index.search(part, limit=2, min_similarity=0.0)
+            if not ranked:
+                continue
+            index, score = ranked[0]
+            runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+            if score < MIN_NAME_SIMILARITY or score - runner_up < MIN_NAME_MARGIN:
+                continue
+            if best is None or score > best[1]:
+                best = (self.place_names[index], score)
+        return best
+
+    def find(self, query: str, limit: int = 5) -> List[dict]:
+        """Centres in the place best matching `query`, e.g. a misspelt city."""
+        match = self.match_place(query)
+        if not match:
+            return []
+        place, score = match
+        return [
+            {**self.kendras[i], "match_score": round(score, 3)}
+            for i in self.place_kendras[self.place_ids[place]][:limit]
+        ]
+
+
+_directory: Optional[KendraDirectory] = None
+_directory_lock = threading.Lock()
+
+
+def get_kendra_directory() -> KendraDirectory:
+    global _directory
+    if _directory is None:
+        with _directory_lock:
+            if _directory is None:
+                with open(KISAN_KENDRAS_CSV, newline="", encoding="utf-8") as f:
+                    _directory = KendraDirectory(list(csv.DictReader(f)))
+                print(f"🏢 Indexed {len(_directory)} Kisan Seva Kendras")
+    return _directory
@@ -1,5 +1,7 @@
 import os
+import asyncio
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import google.generativeai as genai
 from dotenv import load_dotenv
@@ -7,20 +9,23 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from contextlib import asynccontextmanager
 
-# Import tools
-from tools import (
-    get_market_price, 
-    get_government_schemes, 
-    get_weather_forecast, 
-    recommend_crop, 
-    diagnose_crop_disease
-)
+# Import the agent (model config, tools and tool-calling loop)
+from agent import build_agent_model, run_agent, stream_agent, AGENT_NO_ANSWER_TEXT
 
 # Import Database
-from database import client
+from database import client, database, ensure_indexes
+from http_client import close_http_client
+from streaming import sse_event, SSE_HEADERS
+from cache import cache_stats
+from scheme_index import index_db_schemes
+from crop_recommender import get_recommender
+from kendra_directory import get_kendra_directory
+from answer_cache import answer_cache
+from quick_replies import quick_reply
+from pagination import NEXT_CURSOR_HEADER
 
 # Import Routers
-from routers import women_empowerment, chat_service, community, kisan_kendra
+from routers import women_empowerment, chat_service, community, kisan_kendra, scheme_search, advisory
 
 # ===============================
 # Load .env from backend folder
@@ -54,12 +59,36 @@ async def lifespan(app: FastAPI):
         print("✅ MongoDB Connected!")
     except Exception as e:
         print(f"❌ MongoDB Connection Failed: {e}")
+
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        print(f"❌ Index Bootstrap Failed: {e}")
+
+    try:
+        orphaned = await chat_service.fail_orphaned_placeholders()
+        if orphaned:
+            print(f"🧹 Marked image placeholders in {orphaned} chats as failed (queue was lost on restart)")
+    except Exception as e:
+        print(f"❌ Image Placeholder Cleanup Failed: {e}")
+
+    try:
+        count = await index_db_schemes(database)
+        print(f"🔎 Indexed {count} schemes from MongoDB")
+    except Exception as e:
+        print(f"❌ Scheme Indexing Failed: {e}")
+
+    # Compile the recommendation table and kendra indexes before the first request needs them
+    get_recommender()
+    get_kendra_directory()
     
     yield
     
     # Shutdown
     print("🛑 Closing MongoDB Connection...")
+    await chat_service.image_jobs.stop()
     client.close()
+    await close_http_client()
 
 # ===============================
 # FastAPI App
@@ -75,6 +104,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # pagination cursor of list endpoints
 )
 
 # ===============================
@@ -84,54 +114,51 @@ app.include_router(women_empowerment.router)
 app.include_router(chat_service.router)
 app.include_router(community.router)
 app.include_router(kisan_kendra.router)
+app.include_router(scheme_search.router)
+app.include_router(advisory.router)
 
 # ===============================
-# Gemini Model Config (Agentic)
+# Request / Response Models
 # ===============================
-MODEL_NAME = "gemini-2.5-flash-lite"
-
-# Define the list of tools
-tools_list = [
-    get_market_price, 
-    get_government_schemes, 
-    get_weather_forecast, 
-    recommend_crop, 
-    diagnose_crop_disease
-]
+class ChatRequest(BaseModel):
+    message: str
 
-# System Instruction for the Persona
-SYSTEM_INSTRUCTION = """
-You are 'Krishi Sathi', an expert AI agricultural advisor for Indian farmers.
-Your mission is to help farmers increase their yield and income.
+class ChatResponse(BaseModel):
+    response: str
 
-CORE BEHAVIORS:
-1. **Multilingual**: Always detect the language of the user's query and respond in the SAME language (English, Hindi, Marathi, etc.).
-2. **Empathetic**: Use respectful and encouraging language (e.g., "Namaste", "Kisan Bhai").
-3. **Data-Driven**: NEVER make up market prices or schemes. ALWAYS use your TOOLS to fetch real data.
-   - If asked about prices -> usage `get_market_price`
-   - If asked about rain/weather -> use `get_weather_forecast`
-   - If asked about schemes -> use `get_government_schemes`
-4. **Actionable**: Give clear, step-by-step advice.
+AGENT_ERROR_TEXT = "Maaf karein, abhi server mein kuch dikkat hai. Kripya thodi der baad prayas karein. (Sorry, server error, please try again later.)"
 
-If a tool fails or returns no data, apologize and provide general advice, but admit you don't have the live data.
-"""
+# Built once and shared; each request only starts its own lightweight chat
+agent_model = build_agent_model() if api_key else None
 
-generation_config = {
-    "temperature": 0.4, # Lower temperature for more factual agentic responses
-    "top_p": 0.95,
-    "top_k": 64,
-    "max_output_tokens": 8192,
-    "response_mime_type": "text/plain",
-}
+# Answer cache namespace for the agent (see answer_cache.py); the message is
+# the whole input here, so every question is a stand-alone one
+AGENT_CACHE_SCOPE = ("agent",)
 
 # ===============================
-# Request / Response Models
+# Agent Concurrency Limiter
 # ===============================
-class ChatRequest(BaseModel):
-    message: str
+# Caps in-flight Gemini conversations so a burst queues (FIFO) instead of
+# exhausting the API quota; callers waiting longer than the timeout get 503.
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "16"))
+AGENT_QUEUE_TIMEOUT = float(os.getenv("AGENT_QUEUE_TIMEOUT", "30"))
+AGENT_BUSY_TEXT = "Agent is busy, please retry shortly."
 
-class ChatResponse(BaseModel):
-    response: str
+agent_slots = asyncio.Semaphore(AGENT_MAX_CONCURRENCY)
+
+class AgentBusyError(Exception):
+    pass
+
+@asynccontextmanager
+async def agent_slot():
+    try:
+        await asyncio.wait_for(agent_slots.acquire(), timeout=AGENT_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise AgentBusyError(AGENT_BUSY_TEXT)
+    try:
+        yield
+    finally:
+        agent_slots.release()
 
 # ===============================
 # Health Check
@@ -143,38 +170,91 @@ async def health_check():
         "message": "🚀 Gemini Agentic Chatbot running"
     }
 
+# ===============================
+# Cache Stats (hit/miss counters for tuning)
+# ===============================
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return cache_stats()
+
 # ===============================
 # Chat Endpoint (Agentic)
 # ===============================
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     try:
+        # Short weather / price / scheme / disease questions skip the agent
+        quick = await asyncio.to_thread(quick_reply, request.message)
+        if quick:
+            return ChatResponse(response=quick)
+
         if not api_key:
             return ChatResponse(response="API Key missing. Please configure backend/.env.")
 
-        # Initialize model WITH tools and system instruction
-        model = genai.GenerativeModel(
-            model_name=MODEL_NAME,
-            generation_config=generation_config,
-            tools=tools_list,
-            system_instruction=SYSTEM_INSTRUCTION
-        )
-
-        # Start chat with automatic function calling enabled
-        chat_session = model.start_chat(
-            history=[],
-            enable_automatic_function_calling=True
-        )
-        
-        # Send message and get response (Gemini handles the tool loop internally)
-        response = chat_session.send_message(request.message)
-
-        return ChatResponse(response=response.text)
+        cached = answer_cache.get(AGENT_CACHE_SCOPE, request.message)
+        if cached:
+            return ChatResponse(response=cached)
+
+        async with agent_slot():
+            # Tool calls of each model turn run concurrently (see agent.py)
+            text = await run_agent(agent_model, request.message)
+
+        if text != AGENT_NO_ANSWER_TEXT:
+            answer_cache.set(AGENT_CACHE_SCOPE, request.message, text)
+        return ChatResponse(response=text)
 
+    except AgentBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         print("Agent Error:", e)
         # Fallback for errors
-        return ChatResponse(response="Maaf karein, abhi server mein kuch dikkat hai. Kripya thodi der baad prayas karein. (Sorry, server error, please try again later.)")
+        return ChatResponse(response=AGENT_ERROR_TEXT)
+
+# ===============================
+# Chat Endpoint (Agentic, SSE streaming)
+# ===============================
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Streams the agent's reply as Server-Sent-Events: `token` events with text
+    deltas, then `done` with the full response.
+    """
+    async def event_stream():
+        quick = await asyncio.to_thread(quick_reply, request.message)
+        if quick:
+            yield sse_event("token", {"delta": quick})
+            yield sse_event("done", {"response": quick})
+            return
+
+        if not api_key:
+            yield sse_event("done", {"response": "API Key missing. Please configure backend/.env."})
+            return
+
+        cached = answer_cache.get(AGENT_CACHE_SCOPE, request.message)
+        if cached:
+            yield sse_event("token", {"delta": cached})
+            yield sse_event("done", {"response": cached})
+            return
+
+        try:
+            chunks = []
+            async with agent_slot():
+                async for delta in stream_agent(agent_model, request.message):
+                    chunks.append(delta)
+                    yield sse_event("token", {"delta": delta})
+
+            text = "".join(chunks)
+            if text != AGENT_NO_ANSWER_TEXT:
+                answer_cache.set(AGENT_CACHE_SCOPE, request.message, text)
+            yield sse_event("done", {"response": text})
+
+        except AgentBusyError as e:
+            yield sse_event("error", {"response": str(e)})
+        except Exception as e:
+            print("Agent Stream Error:", e)
+            yield sse_event("error", {"response": AGENT_ERROR_TEXT})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 # ===============================
 # Run Server
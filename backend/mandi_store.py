@@ -0,0 +1,400 @@
+import os
+import csv
+import sys
+import json
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, run a single worker
+    fcntl = None
+
+from tool_cache import normalize_text, normalize_location
+
+# ===============================
+# Columnar mandi price store
+# ===============================
+# An Agmarknet-style dump (state, district, market, commodity, arrival_date,
+# min/max/modal price) is compiled once into NumPy columns sorted by
+# (commodity, market, date), with per-series analytics (moving averages,
+# week-over-week change, volatility) computed for every series in bulk.
+# The compiled .npy files are memory-mapped, so all uvicorn workers share
+# one copy through the OS page cache, and (crop, market) lookups are a
+# single dict access. Builds hold an exclusive flock on "<store dir>.lock"
+# (loads a shared one), so workers starting together compile it only once.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MANDI_PRICES_CSV = os.getenv(
+    "MANDI_PRICES_CSV", os.path.join(BASE_DIR, "data", "mandi_prices_sample.csv")
+)
+MANDI_STORE_DIR = os.getenv(
+    "MANDI_STORE_DIR", os.path.join(BASE_DIR, "data", "mandi_store")
+)
+
+# Week-over-week change (%) beyond which a trend counts as up / down
+TREND_THRESHOLD_PCT = 2.0
+
+# Colloquial / Hindi crop names -> commodity name used in the dump
+CROP_ALIASES = {
+    "gehu": "wheat", "gehun": "wheat", "गेहूं": "wheat", "गेहूँ": "wheat",
+    "chawal": "rice", "dhan": "rice", "paddy": "rice", "चावल": "rice", "धान": "rice",
+    "pyaz": "onion", "pyaaz": "onion", "kanda": "onion", "प्याज": "onion",
+    "tamatar": "tomato", "टमाटर": "tomato",
+    "aloo": "potato", "alu": "potato", "आलू": "potato",
+    "kapas": "cotton", "कपास": "cotton",
+    "soyabean": "soybean", "soya": "soybean", "सोयाबीन": "soybean",
+}
+
+_COLUMNS = ["commodity", "market", "date", "min_price", "max_price", "modal_price"]
+_SERIES = [
+    "start", "end", "latest_date", "latest_min", "latest_max", "latest_modal",
+    "ma7", "ma30", "wow_pct", "volatility_30d",
+]
+# Sort key series*_DATE_KEY + day (day = date ordinal). It orders by (series,
+# day) only while all arrival dates plus the 30-day look-back fit in fewer
+# than _DATE_KEY days; build_store rejects dumps that don't.
+_DATE_KEY = 100_000
+
+
+def normalize_crop(name: str) -> str:
+    text = normalize_text(name)
+    return CROP_ALIASES.get(text, text)
+
+
+def _parse_date(value: str) -> int:
+    value = value.strip()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(value, fmt).date().toordinal()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {value}")
+
+
+# ===============================
+# Build (CSV -> .npy columns)
+# ===============================
+def _window_mean(cs, lo, hi):
+    count = hi - lo
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, (cs[hi] - cs[lo]) / np.maximum(count, 1), np.nan)
+
+
+def compute_series_stats(series_id, day, modal, starts, ends):
+    """Per-series analytics for all series at once (no Python loop over series)."""
+    last = ends - 1
+    latest_day = day[last]
+    key = series_id.astype(np.int64) * _DATE_KEY + day
+    series = np.arange(len(starts), dtype=np.int64)
+
+    def window_start(days_back):
+        return np.searchsorted(key, series * _DATE_KEY + (latest_day - days_back), side="left")
+
+    cs = np.concatenate([[0.0], np.cumsum(modal, dtype=np.float64)])
+    week = window_start(6)        # last 7 days incl. latest
+    prev_week = window_start(13)  # the 7 days before that
+    month = window_start(29)
+
+    ma7 = _window_mean(cs, week, ends)
+    ma30 = _window_mean(cs, month, ends)
+    prev_ma7 = _window_mean(cs, prev_week, week)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        wow_pct = (ma7 - prev_ma7) / prev_ma7 * 100.0
+
+    # Std-dev of daily log returns over the last 30 days, in percent
+    returns = np.zeros_like(modal, dtype=np.float64)
+    returns[1:] = np.log(modal[1:] / modal[:-1])
+    rs = np.concatenate([[0.0], np.cumsum(returns)])
+    rs2 = np.concatenate([[0.0], np.cumsum(returns ** 2)])
+    lo = np.minimum(month + 1, ends)  # first return fully inside the window
+    mean_r = _window_mean(rs, lo, ends)
+    mean_r2 = _window_mean(rs2, lo, ends)
+    volatility = np.sqrt(np.maximum(mean_r2 - mean_r ** 2, 0.0)) * 100.0
+
+    return {
+        "latest_date": latest_day,
+        "ma7": ma7,
+        "ma30": ma30,
+        "wow_pct": wow_pct,
+        "volatility_30d": volatility,
+    }
+
+
+@contextmanager
+def store_lock(out_dir: str, exclusive: bool):
+    """flock on a file beside `out_dir`: exclusive to build, shared to load."""
+    if fcntl is None:
+        yield
+        return
+    path = f"{os.path.abspath(out_dir)}.lock"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def build_store(csv_path: str = MANDI_PRICES_CSV, out_dir: str = MANDI_STORE_DIR, only_if_stale: bool = False) -> bool:
+    """
+    Compiles `csv_path` into `out_dir` under the store lock. With
+    only_if_stale, a store that another worker finished while we waited for
+    the lock is kept; returns whether a build ran.
+    """
+    with store_lock(out_dir, exclusive=True):
+        if only_if_stale and _is_fresh(csv_path, out_dir):
+            return False
+        _compile_store(csv_path, out_dir)
+        return True
+
+
+def _compile_store(csv_path: str, out_dir: str):
+    commodities: Dict[str, int] = {}
+    markets: Dict[str, int] = {}
+    market_meta: List[dict] = []
+    cols = {name: [] for name in _COLUMNS}
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                day = _parse_date(row["arrival_date"])
+                prices = [float(row[c]) for c in ("min_price", "max_price", "modal_price")]
+            except (KeyError, ValueError):
+                continue  # skip malformed rows
+            if prices[2] <= 0:
+                continue
+
+            crop = normalize_crop(row["commodity"])
+            market = normalize_location(row["market"])
+            if crop not in commodities:
+                commodities[crop] = len(commodities)
+            if market not in markets:
+                markets[market] = len(markets)
+                market_meta.append({
+                    "name": row["market"].strip(),
+                    "district": normalize_location(row.get("district", "")),
+                    "state": normalize_text(row.get("state", "")),
+                })
+            cols["commodity"].append(commodities[crop])
+            cols["market"].append(markets[market])
+            cols["date"].append(day)
+            cols["min_price"].append(prices[0])
+            cols["max_price"].append(prices[1])
+            cols["modal_price"].append(prices[2])
+
+    commodity = np.asarray(cols["commodity"], dtype=np.int32)
+    market = np.asarray(cols["market"], dtype=np.int32)
+    day = np.asarray(cols["date"], dtype=np.int32)
+    if len(day) and int(day.max()) - int(day.min()) + 30 >= _DATE_KEY:
+        raise ValueError(f"Arrival dates in {csv_path} span more than {_DATE_KEY - 30} days")
+    order = np.lexsort((day, market, commodity))
+    arrays = {
+        "commodity": commodity[order],
+        "market": market[order],
+        "date": day[order],
+        "min_price": np.asarray(cols["min_price"], dtype=np.float32)[order],
+        "max_price": np.asarray(cols["max_price"], dtype=np.float32)[order],
+        "modal_price": np.asarray(cols["modal_price"], dtype=np.float32)[order],
+    }
+
+    c, m = arrays["commodity"], arrays["market"]
+    boundary = np.ones(len(c), dtype=bool)
+    boundary[1:] = (c[1:] != c[:-1]) | (m[1:] != m[:-1])
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], len(c))
+    series_id = np.cumsum(boundary) - 1
+    last = ends - 1
+
+    stats = compute_series_stats(
+        series_id, arrays["date"].astype(np.int64), arrays["modal_price"].astype(np.float64), starts, ends
+    )
+    arrays.update({
+        "series_commodity": c[starts],
+        "series_market": m[starts],
+        "start": starts,
+        "end": ends,
+        "latest_min": arrays["min_price"][last],
+        "latest_max": arrays["max_price"][last],
+        "latest_modal": arrays["modal_price"][last],
+        **stats,
+    })
+
+    source = os.stat(csv_path)
+    meta = {
+        "source": os.path.abspath(csv_path),
+        "source_mtime": source.st_mtime,
+        "source_size": source.st_size,
+        "commodities": sorted(commodities, key=commodities.get),
+        "markets": market_meta,
+    }
+
+    # Build next to the target and swap in, so readers never see a half store
+    # (the swap itself runs under the exclusive store lock)
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = os.path.join(parent, f".mandi_store-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(arr))
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    old_dir = f"{out_dir}.old-{os.getpid()}"
+    if os.path.exists(out_dir):
+        os.rename(out_dir, old_dir)
+    os.rename(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _is_fresh(csv_path: str, out_dir: str) -> bool:
+    try:
+        with open(os.path.join(out_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        source = os.stat(csv_path)
+    except (OSError, ValueError):
+        return False
+    return (
+        meta.get("source") == os.path.abspath(csv_path)
+        and meta.get("source_mtime") == source.st_mtime
+        and meta.get("source_size") == source.st_size
+    )
+
+
+# ===============================
+# Query side
+# ===============================
+class MandiStore:
+    def __init__(self, out_dir: str = MANDI_STORE_DIR):
+        with open(os.path.join(out_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        load = lambda name: np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode="r")
+        self.series = {name: load(name) for name in _SERIES}
+        self.date = load("date")
+        self.modal_price = load("modal_price")
+        self.series_market = load("series_market")
+
+        self.commodities = {name: i for i, name in enumerate(meta["commodities"])}
+        self.markets = meta["markets"]
+        self.market_codes = {normalize_location(m["name"]): i for i, m in enumerate(self.markets)}
+        self.by_district: Dict[str, List[int]] = {}
+        self.by_state: Dict[str, List[int]] = {}
+        for i, m in enumerate(self.markets):
+            self.by_district.setdefault(m["district"], []).append(i)
+            self.by_state.setdefault(m["state"], []).append(i)
+
+        # (commodity, market) -> series index, and commodity -> all its series
+        self.index: Dict[tuple, int] = {}
+        self.by_commodity: Dict[int, List[int]] = {}
+        for s, (c, m) in enumerate(zip(load("series_commodity"), self.series_market)):
+            self.index[(int(c), int(m))] = s
+            self.by_commodity.setdefault(int(c), []).append(s)
+
+    def _series_for(self, crop: int, location: str):
+        """Exact market first, then every market in the district, then the state."""
+        loc = normalize_location(location)
+        if loc in self.market_codes:
+            s = self.index.get((crop, self.market_codes[loc]))
+            if s is not None:
+                return [s], "market"
+        for scope, table in (("district", self.by_district), ("state", self.by_state)):
+            codes = table.get(loc)
+            if codes:
+                found = [self.index[(crop, m)] for m in codes if (crop, m) in self.index]
+                if found:
+                    return found, scope
+        return self.by_commodity.get(crop, []), "national"
+
+    def _summary(self, s: int) -> dict:
+        col = self.series
+        return {
+            "market": self.markets[int(self.series_market[s])]["name"],
+            "as_of": date.fromordinal(int(col["latest_date"][s])).isoformat(),
+            "modal_price": float(col["latest_modal"][s]),
+            "min_price": float(col["latest_min"][s]),
+            "max_price": float(col["latest_max"][s]),
+            "moving_avg_7d": _round(col["ma7"][s]),
+            "moving_avg_30d": _round(col["ma30"][s]),
+            "week_over_week_pct": _round(col["wow_pct"][s]),
+            "volatility_30d_pct": _round(col["volatility_30d"][s]),
+        }
+
+    def history(self, s: int):
+        """(dates, modal prices) of one series, as zero-copy memmap slices."""
+        start, end = int(self.series["start"][s]), int(self.series["end"][s])
+        return self.date[start:end], self.modal_price[start:end]
+
+    def lookup(self, crop_name: str, location: str) -> Optional[dict]:
+        crop = self.commodities.get(normalize_crop(crop_name))
+        if crop is None:
+            return None
+        series, scope = self._series_for(crop, location)
+        if not series:
+            return None
+
+        idx = np.asarray(series)
+        col = self.series
+        wow = np.asarray(col["wow_pct"])[idx]
+        result = {
+            "scope": scope,
+            "markets": [self._summary(int(s)) for s in idx[np.argsort(-np.asarray(col["latest_date"])[idx])][:5]],
+            "modal_price": float(np.median(np.asarray(col["latest_modal"])[idx])),
+            "min_price": float(np.min(np.asarray(col["latest_min"])[idx])),
+            "max_price": float(np.max(np.asarray(col["latest_max"])[idx])),
+            "moving_avg_7d": _round(np.nanmean(np.asarray(col["ma7"])[idx])),
+            "moving_avg_30d": _round(np.nanmean(np.asarray(col["ma30"])[idx])),
+            "week_over_week_pct": _round(np.nanmean(wow)) if np.isfinite(wow).any() else None,
+            "volatility_30d_pct": _round(np.nanmean(np.asarray(col["volatility_30d"])[idx])),
+            "as_of": date.fromordinal(int(np.max(np.asarray(col["latest_date"])[idx]))).isoformat(),
+        }
+        return result
+
+
+def _round(value, digits: int = 2):
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+
+def trend_of(wow_pct: Optional[float]) -> str:
+    if wow_pct is None:
+        return "stable"
+    if wow_pct > TREND_THRESHOLD_PCT:
+        return "up"
+    if wow_pct < -TREND_THRESHOLD_PCT:
+        return "down"
+    return "stable"
+
+
+_store: Optional[MandiStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[MandiStore]:
+    """Lazily compiles (if stale) and memory-maps the price store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if not os.path.exists(MANDI_PRICES_CSV):
+                    print(f"⚠️ Mandi price dataset not found: {MANDI_PRICES_CSV}")
+                    return None
+                if not _is_fresh(MANDI_PRICES_CSV, MANDI_STORE_DIR):
+                    # Workers that lose the race wait here, then load the winner's store
+                    if build_store(MANDI_PRICES_CSV, MANDI_STORE_DIR, only_if_stale=True):
+                        print("📦 Compiled mandi price store")
+                with store_lock(MANDI_STORE_DIR, exclusive=False):
+                    _store = MandiStore(MANDI_STORE_DIR)
+    return _store
+
+
+if __name__ == "__main__":
+    # python mandi_store.py [dump.csv] — precompile before starting workers
+    source = sys.argv[1] if len(sys.argv) > 1 else MANDI_PRICES_CSV
+    build_store(source, MANDI_STORE_DIR)
+    print(f"✅ Compiled {source} -> {MANDI_STORE_DIR}")
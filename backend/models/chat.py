@@ -5,7 +5,8 @@ from datetime import datetime
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
     content: str
-    image_url: Optional[str] = None  # Store base64 or URL if we had storage
+    image_url: Optional[str] = None  # Blob store path (/chat/blobs/<sha256>); legacy docs hold base64
+    image_job_id: Optional[str] = None  # Pending image generation (see image_jobs.py)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 class ChatSession(BaseModel):
@@ -13,5 +14,7 @@ class ChatSession(BaseModel):
     user_id: str = "default_user"
     title: str = "New Chat"
     messages: List[ChatMessage] = []
+    summary: str = ""  # Rolling summary of messages[:summary_upto] (see chat_context.py)
+    summary_upto: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     last_updated: datetime = Field(default_factory=datetime.utcnow)
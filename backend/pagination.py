@@ -0,0 +1,51 @@
+import base64
+from typing import Any, List, Sequence, Tuple
+
+from bson import json_util
+from fastapi import HTTPException
+
+# ===============================
+# Keyset pagination
+# ===============================
+# List endpoints sort on a unique key (ending in _id) and hand out an opaque
+# cursor holding the sort values of the last row; the next page is fetched
+# with a range filter on those values, so it is an index seek no matter how
+# deep the client pages (unlike skip(), which walks every earlier row).
+# Endpoints that return a bare JSON list put the cursor in this header.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+SortSpec = Sequence[Tuple[str, int]]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Extended JSON keeps datetimes and ObjectIds intact; base64 makes it URL-safe."""
+    raw = json_util.dumps(list(values)).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json_util.loads(raw.decode("utf-8"))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def after_filter(sort: SortSpec, values: Sequence[Any]) -> dict:
+    """
+    Matches the rows that come after `values` in `sort` order:
+    (a > x) or (a == x and b > y) or ..., with > flipped for descending keys.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {f: v for (f, _), v in zip(sort[:i], values[:i])}
+        clause[field] = {"$gt" if direction > 0 else "$lt": values[i]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def cursor_for(doc: dict, sort: SortSpec) -> str:
+    return encode_cursor([doc.get(field) for field, _ in sort])
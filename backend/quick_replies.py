@@ -0,0 +1,202 @@
+import threading
+from typing import Optional, Tuple
+
+from intent_router import KeywordAutomaton, detect_intents
+from answer_cache import detect_language
+from mandi_store import CROP_ALIASES, get_store
+from tool_cache import DISTRICT_ALIASES
+from kendra_directory import get_kendra_directory
+from disease_kb import UNKNOWN_DIAGNOSIS
+from tools import get_market_price, get_weather_forecast, get_government_schemes, diagnose_crop_disease
+
+# ===============================
+# Tool-backed quick replies
+# ===============================
+# Short weather / price / scheme / disease questions are answered straight
+# from tools.py, without an LLM call. A message qualifies when it carries
+# exactly one of those intents (and no other) and every argument the tool
+# needs can be read off the message or the user's location; anything else,
+# or a tool result that doesn't answer the question, falls through to the
+# model.
+QUICK_INTENTS = {"weather", "price", "scheme", "disease"}
+QUICK_REPLY_MAX_WORDS = 12      # longer messages usually ask more than the tool answers
+QUICK_REPLY_LANGUAGES = ("English", "Hindi")
+NATIONAL_LOCATION = "India"     # price questions without a place get the national average
+
+# Tool wording -> Hindi
+HINDI_DAYS = {"Today": "आज", "Tomorrow": "कल", "Day After": "परसों"}
+HINDI_CONDITIONS = {
+    "Sunny": "धूप",
+    "Cloudy": "बादल",
+    "Partly Cloudy": "आंशिक बादल",
+    "Light Rain": "हल्की बारिश",
+    "Heavy Rain": "भारी बारिश",
+}
+HINDI_RAIN_ALERT = "⚠️ भारी बारिश की चेतावनी! कटी हुई फसल सुरक्षित रखें।"
+
+
+# ===============================
+# Argument extraction
+# ===============================
+_crop_automaton = KeywordAutomaton(
+    {crop: [crop] + [alias for alias, name in CROP_ALIASES.items() if name == crop]
+     for crop in set(CROP_ALIASES.values())}
+).build()
+
+_place_automaton: Optional[KeywordAutomaton] = None
+_place_lock = threading.Lock()
+
+
+def get_place_automaton() -> KeywordAutomaton:
+    """Every market, district and state we hold data for, plus known aliases."""
+    global _place_automaton
+    if _place_automaton is None:
+        with _place_lock:
+            if _place_automaton is None:
+                places = set(DISTRICT_ALIASES) | set(DISTRICT_ALIASES.values())
+                places.update(get_kendra_directory().place_names)
+                store = get_store()
+                if store:
+                    for market in store.markets:
+                        places.update((market["name"], market["district"], market["state"]))
+                _place_automaton = KeywordAutomaton({"place": places}).build()
+    return _place_automaton
+
+
+def _longest_match(automaton: KeywordAutomaton, text: str) -> Optional[str]:
+    """The longest keyword in `text`, as the user wrote it."""
+    spans = [(end - start, start, end) for start, end, _ in automaton.finditer(text)]
+    if not spans:
+        return None
+    _, start, end = max(spans)
+    return text[start:end]
+
+
+def find_crop(text: str) -> Optional[str]:
+    return _longest_match(_crop_automaton, text)
+
+
+def find_place(text: str) -> Optional[str]:
+    return _longest_match(get_place_automaton(), text)
+
+
+def plan_quick_reply(text: str, location: Optional[str] = None) -> Optional[Tuple[str, dict]]:
+    """
+    (intent, tool arguments) when `text` can be answered by one tool call,
+    else None. `location` is the user's own place, used when the message
+    names none.
+    """
+    if len(text.split()) > QUICK_REPLY_MAX_WORDS:
+        return None
+    intents = detect_intents(text)
+    if len(intents) != 1 or not intents <= QUICK_INTENTS:
+        return None
+    intent = next(iter(intents))
+    crop = find_crop(text)
+    place = find_place(text) or location
+
+    if intent == "price":
+        if not crop:
+            return None
+        return intent, {"crop_name": crop, "location": place or NATIONAL_LOCATION}
+    if intent == "weather":
+        return (intent, {"location": place}) if place else None
+    if intent == "scheme":
+        return intent, {"topic": text}
+    return intent, {"symptoms": text, "crop": crop or ""}
+
+
+def reply_language(text: str, language: Optional[str] = None) -> Optional[str]:
+    """The language to answer in, or None when quick replies can't speak it."""
+    if language is None:
+        language = "English" if detect_language(text) == "en" else "Hindi"
+    return language if language in QUICK_REPLY_LANGUAGES else None
+
+
+# ===============================
+# Formatting
+# ===============================
+def format_price(result: dict, hindi: bool) -> Optional[str]:
+    if "as_of" not in result:
+        return None  # no mandi data, only the simulated fallback
+    if not hindi:
+        return result["message"]
+    where = result["location"]
+    if result["scope"] == "national":
+        where = f"{where} (राष्ट्रीय औसत)"
+    return (
+        f"{where} में {result['crop']} का मॉडल भाव ₹{result['price_per_quintal']}/क्विंटल है "
+        f"({result['as_of']} तक)। रुझान: {result['trend_symbol']}"
+    )
+
+
+def format_weather(result: dict, hindi: bool) -> str:
+    if hindi:
+        lines = [f"{result['location']} का 3 दिन का मौसम पूर्वानुमान:"]
+        lines += [
+            f"- {HINDI_DAYS.get(day['day'], day['day'])}: {day['temp']}, "
+            f"{HINDI_CONDITIONS.get(day['condition'], day['condition'])}"
+            for day in result["forecast"]
+        ]
+        if result["alert"] != "None":
+            lines.append(HINDI_RAIN_ALERT)
+    else:
+        lines = [f"3-day weather forecast for {result['location']}:"]
+        lines += [f"- {day['day']}: {day['temp']}, {day['condition']}" for day in result["forecast"]]
+        if result["alert"] != "None":
+            lines.append(result["alert"])
+    return "\n".join(lines)
+
+
+def format_schemes(result: dict, hindi: bool) -> Optional[str]:
+    schemes = result["found_schemes"]
+    if not schemes:
+        return None
+    lines = ["आपके सवाल से जुड़ी सरकारी योजनाएँ:" if hindi else "Government schemes that match your question:"]
+    for scheme in schemes:
+        line = f"- {scheme['name']}: {scheme.get('benefits') or scheme.get('description') or ''}".rstrip(": ")
+        if scheme.get("link"):
+            line += f" ({scheme['link']})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def format_diagnosis(result: dict, hindi: bool) -> Optional[str]:
+    if result["diagnosis"] == UNKNOWN_DIAGNOSIS:
+        return None
+    others = [m["disease"] for m in result["possible_diagnoses"][1:]]
+    if hindi:
+        lines = [f"संभावित समस्या: {result['diagnosis']}", f"उपाय: {result['remedy']}"]
+        if others:
+            lines.append(f"अन्य संभावनाएँ: {', '.join(others)}")
+    else:
+        lines = [f"Likely problem: {result['diagnosis']}", f"What to do: {result['remedy']}"]
+        if others:
+            lines.append(f"Other possibilities: {', '.join(others)}")
+    return "\n".join(lines)
+
+
+QUICK_TOOLS = {
+    "price": (get_market_price, format_price),
+    "weather": (get_weather_forecast, format_weather),
+    "scheme": (get_government_schemes, format_schemes),
+    "disease": (diagnose_crop_disease, format_diagnosis),
+}
+
+
+def quick_reply(text: str, language: Optional[str] = None, location: Optional[str] = None) -> Optional[str]:
+    """
+    Answers `text` from a single tool call, or returns None so the caller
+    asks the model. `language` defaults to the language of the message.
+    """
+    lang = reply_language(text, language)
+    plan = plan_quick_reply(text, location) if lang else None
+    if plan is None:
+        return None
+    intent, arguments = plan
+    tool, formatter = QUICK_TOOLS[intent]
+    try:
+        return formatter(tool(**arguments), hindi=lang == "Hindi")
+    except Exception as e:
+        print(f"⚠️ Quick reply ({intent}) failed, asking the model: {e}")
+        return None
@@ -0,0 +1,122 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import json
+import asyncio
+
+from disease_kb import get_disease_kb, UNKNOWN_DIAGNOSIS, DEFAULT_REMEDY
+from crop_recommender import get_recommender
+from bulk_advisory import stream_advisories, BULK_MAX_PROFILES
+
+router = APIRouter(
+    prefix="/advisory",
+    tags=["Advisory"]
+)
+
+# --- Batch disease diagnosis ---
+MAX_DIAGNOSIS_REPORTS = 5_000
+
+class SymptomReport(BaseModel):
+    id: Optional[str] = None  # caller's reference, echoed back
+    symptoms: str
+    crop: Optional[str] = None
+
+class DiagnoseBatchRequest(BaseModel):
+    reports: List[SymptomReport]
+    top_k: int = Field(3, ge=1, le=10)
+
+class DiagnosisMatch(BaseModel):
+    disease: str
+    crop: str
+    remedy: str
+    score: float
+
+class DiagnosisResult(BaseModel):
+    id: Optional[str] = None
+    symptoms: str
+    diagnosis: str
+    remedy: str
+    possible_diagnoses: List[DiagnosisMatch]
+
+@router.post("/diagnose", response_model=List[DiagnosisResult])
+async def diagnose_batch(request: DiagnoseBatchRequest):
+    """Diagnoses many symptom reports in one vectorised pass over the knowledge base."""
+    if len(request.reports) > MAX_DIAGNOSIS_REPORTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_DIAGNOSIS_REPORTS} reports per request")
+
+    kb = get_disease_kb()
+    matches = await asyncio.to_thread(
+        kb.diagnose_many, [(r.symptoms, r.crop) for r in request.reports], request.top_k
+    )
+    return [
+        DiagnosisResult(
+            id=report.id,
+            symptoms=report.symptoms,
+            diagnosis=found[0]["disease"] if found else UNKNOWN_DIAGNOSIS,
+            remedy=found[0]["remedy"] if found else DEFAULT_REMEDY,
+            possible_diagnoses=found,
+        )
+        for report, found in zip(request.reports, matches)
+    ]
+
+# --- Batch crop recommendation ---
+MAX_RECOMMENDATION_PLOTS = 50_000
+
+class FarmPlot(BaseModel):
+    id: Optional[str] = None  # caller's reference, echoed back
+    soil_type: str
+    season: str
+    location: str
+
+class RecommendBatchRequest(BaseModel):
+    plots: List[FarmPlot]
+
+class PlotRecommendation(BaseModel):
+    id: Optional[str] = None
+    soil: Optional[str] = None     # parsed soil class, None if not recognised
+    season: Optional[str] = None
+    zone: Optional[str] = None     # agro-climatic zone of the location
+    recommendations: List[str]
+    advice: str
+
+@router.post("/recommend", response_model=List[PlotRecommendation])
+async def recommend_batch(request: RecommendBatchRequest):
+    """Crop recommendations for many plots with one lookup-table gather."""
+    if len(request.plots) > MAX_RECOMMENDATION_PLOTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_RECOMMENDATION_PLOTS} plots per request")
+
+    recommender = get_recommender()
+    results = await asyncio.to_thread(recommender.recommend_many, [p.dict() for p in request.plots])
+    return [
+        PlotRecommendation(id=plot.id, **result)
+        for plot, result in zip(request.plots, results)
+    ]
+
+# --- Bulk advisories (NDJSON stream) ---
+class FarmerProfile(BaseModel):
+    id: Optional[str] = None  # member id, echoed back
+    crop: Optional[str] = None
+    district: str
+    soil: Optional[str] = None
+    season: Optional[str] = None
+    symptoms: Optional[str] = None
+
+class BulkAdvisoryRequest(BaseModel):
+    farmers: List[FarmerProfile]
+
+@router.post("/bulk")
+async def bulk_advisory(request: BulkAdvisoryRequest):
+    """
+    Streams one JSON line per farmer (weather, market_price and, when soil /
+    season / symptoms are given, crop_recommendation and diagnosis), in the
+    order the advisories complete. `index` points back into `farmers`.
+    """
+    if len(request.farmers) > BULK_MAX_PROFILES:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_PROFILES} farmers per request")
+
+    async def lines():
+        async for advisory in stream_advisories([f.dict() for f in request.farmers]):
+            yield json.dumps(advisory, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
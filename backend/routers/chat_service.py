@@ -1,16 +1,34 @@
 import os
 import uuid
 import base64
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body, Response
+import asyncio
+from typing import AsyncIterator, List, Optional
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body, Response, Query, Request
+from fastapi.responses import StreamingResponse, FileResponse
 from pydantic import BaseModel
 from datetime import datetime
 from dotenv import load_dotenv
-import requests
-from huggingface_hub import InferenceClient
-from sarvamai import SarvamAI
+from huggingface_hub import AsyncInferenceClient
 from database import get_database
 from models.chat import ChatSession, ChatMessage
+from http_client import get_http_client
+from streaming import sse_event, SSE_HEADERS
+import blob_store
+from cache import AsyncTTLCache
+from geo import geohash_encode, geohash_center
+from image_jobs import ImageJob, ImageJobQueue, QueueFullError
+from intent_router import detect_intents
+from quick_replies import quick_reply
+from answer_cache import answer_cache
+from pagination import NEXT_CURSOR_HEADER, after_filter, cursor_for, decode_cursor
+from chat_context import (
+    select_history,
+    summary_due,
+    summary_prompt,
+    SUMMARY_KEEP_RECENT,
+    SUMMARY_MAX_TOKENS,
+)
+import speech
 import google.generativeai as genai
 import io
 
@@ -33,17 +51,28 @@ if not HF_TOKEN:
 # Models
 LOGIC_MODEL = "Qwen/Qwen2.5-7B-Instruct"
 IMAGE_MODEL = "black-forest-labs/FLUX.1-schnell"   # Free HF Inference API model — no local loading
-STT_MODEL = "openai/whisper-large-v3-turbo"
-SARVAM_API_KEY = os.getenv("SARVAM_API_KEY", "sk_mqiis1cf_mJUKgNtiSX3EV2Oakvc4Dbbm")
 
-# Clients
-client = InferenceClient(api_key=HF_TOKEN)
-audio_client = InferenceClient(api_key=HF_TOKEN, headers={"Content-Type": "audio/webm"})
+# Clients (async so a slow upstream never stalls the event loop)
+client = AsyncInferenceClient(api_key=HF_TOKEN)
 
 # --- Database ---
 db = get_database()
 chat_collection = db["chat_sessions"]
 
+# Most unsummarised messages loaded per turn; chat_context.select_history
+# then keeps as many of them as fit the token budget
+HISTORY_FETCH = 40
+# Most messages folded into the rolling summary per refresh
+SUMMARY_BATCH = 40
+# Default / maximum page size for /history
+HISTORY_PAGE_SIZE = 50
+HISTORY_PAGE_MAX = 200
+# Default / maximum page size for /sessions (keyset on the user_recent index)
+SESSIONS_PAGE_SIZE = 50
+SESSIONS_PAGE_MAX = 200
+SESSIONS_SORT = [("last_updated", -1), ("_id", -1)]
+SESSION_LIST_FIELDS = {"session_id": 1, "title": 1, "last_updated": 1}
+
 # --- Schemas ---
 class CreateSessionRequest(BaseModel):
     user_id: str = "default_user"
@@ -64,42 +93,30 @@ class SessionSummary(BaseModel):
 class HistoryResponse(BaseModel):
     session_id: str
     messages: List[dict]
+    total: int = 0
+    next_cursor: Optional[int] = None  # pass as ?before= to load older turns
 
 
 # ---------------------------------------------------------------------------
 # Helper: detect image-generation intent (English + Hindi keywords)
 # ---------------------------------------------------------------------------
-IMAGE_KEYWORDS_EN = [
-    "generate an image", "generate image", "create an image", "create image",
-    "draw a", "draw an", "show me a picture", "show me an image",
-    "make an image", "make a picture", "make a photo",
-    "produce an image", "produce a picture",
-]
-IMAGE_KEYWORDS_HI = [
-    "चित्र बनाओ", "चित्र जनरेट", "चित्र दिखाओ", "चित्र बना",
-    "तस्वीर बनाओ", "तस्वीर जनरेट", "तस्वीर दिखाओ",
-    "फोटो बनाओ", "फोटो जनरेट", "इमेज बनाओ", "इमेज जनरेट",
-    "नया चित्र", "नया फोटो", "एक चित्र", "एक तस्वीर",
-]
-
 def is_image_request(text: str) -> bool:
-    lower = text.lower()
-    for kw in IMAGE_KEYWORDS_EN:
-        if kw in lower:
-            return True
-    for kw in IMAGE_KEYWORDS_HI:
-        if kw in text:   # Hindi: don't lower-case, it doesn't matter but keep consistent
-            return True
-    return False
+    return "image" in detect_intents(text)
 
 
 # ---------------------------------------------------------------------------
 # Image Generation — HuggingFace Inference API (no local model, no GPU needed)
 # ---------------------------------------------------------------------------
-def generate_image_hf(prompt: str) -> Optional[str]:
+def encode_jpeg(pil_image) -> bytes:
+    buffered = io.BytesIO()
+    pil_image.save(buffered, format="JPEG", quality=90)
+    return buffered.getvalue()
+
+
+async def generate_image_hf(prompt: str) -> Optional[str]:
     """
     Calls HuggingFace Inference API to generate an image.
-    Returns base64-encoded JPEG string, or None on failure.
+    Stores the JPEG in the blob store and returns its URL path, or None on failure.
     No local model loading — works on any server.
     """
     try:
@@ -111,16 +128,16 @@ def generate_image_hf(prompt: str) -> Optional[str]:
         )
 
         # text_to_image returns a PIL Image object
-        pil_image = client.text_to_image(
+        pil_image = await client.text_to_image(
             enhanced_prompt,
             model=IMAGE_MODEL,
         )
 
-        buffered = io.BytesIO()
-        pil_image.save(buffered, format="JPEG", quality=90)
-        b64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        # JPEG encoding is CPU work — keep it off the event loop
+        jpeg_bytes = await asyncio.to_thread(encode_jpeg, pil_image)
+        image_ref = await blob_store.put_blob(jpeg_bytes)
         print("✅ Image generated successfully.")
-        return b64
+        return image_ref
 
     except Exception as e:
         print(f"❌ Image Gen Error: {e}")
@@ -132,13 +149,23 @@ def generate_image_hf(prompt: str) -> Optional[str]:
 # ---------------------------------------------------------------------------
 # Location & Weather helpers
 # ---------------------------------------------------------------------------
-def get_location_name(lat: float, lon: float) -> str:
+# Coordinates are quantised to a geohash cell and the upstream is queried for
+# the cell centre, so every farmer in the same village shares one cache entry
+# (and one in-flight request).
+LOCALITY_CELL_PRECISION = 6   # ~1.2 km x 0.6 km
+WEATHER_CELL_PRECISION = 5    # ~4.9 km x 4.9 km
+
+locality_cache = AsyncTTLCache("geo.locality", maxsize=20_000, ttl=3 * 24 * 3600)
+weather_cache = AsyncTTLCache("geo.weather", maxsize=5_000, ttl=15 * 60)
+
+
+async def fetch_location_name(lat: float, lon: float) -> Optional[str]:
     try:
         url = (
             f"https://api.bigdatacloud.net/data/reverse-geocode-client"
             f"?latitude={lat}&longitude={lon}&localityLanguage=en"
         )
-        res = requests.get(url, timeout=5)
+        res = await get_http_client().get(url)
         if res.status_code == 200:
             data = res.json()
             city = data.get("city", "")
@@ -146,16 +173,16 @@ def get_location_name(lat: float, lon: float) -> str:
             return f"{locality}, {city}".strip(", ")
     except Exception as e:
         print(f"Location Error: {e}")
-    return "Unknown Location"
+    return None
 
 
-def get_real_weather(lat: float, lon: float) -> str:
+async def fetch_real_weather(lat: float, lon: float) -> Optional[str]:
     try:
         url = (
             f"https://api.open-meteo.com/v1/forecast"
             f"?latitude={lat}&longitude={lon}&current_weather=true"
         )
-        res = requests.get(url, timeout=5)
+        res = await get_http_client().get(url)
         if res.status_code == 200:
             current = res.json().get("current_weather", {})
             temp = current.get("temperature")
@@ -163,7 +190,26 @@ def get_real_weather(lat: float, lon: float) -> str:
             return f"Temperature: {temp}°C, Wind: {wind} km/h"
     except Exception as e:
         print(f"Weather Error: {e}")
-    return "Weather data unavailable"
+    return None
+
+
+UNKNOWN_LOCATION = "Unknown Location"
+
+
+async def get_location_name(lat: float, lon: float) -> str:
+    cell = geohash_encode(lat, lon, LOCALITY_CELL_PRECISION)
+    name = await locality_cache.get_or_load(
+        cell, lambda: fetch_location_name(*geohash_center(cell))
+    )
+    return name or UNKNOWN_LOCATION
+
+
+async def get_real_weather(lat: float, lon: float) -> str:
+    cell = geohash_encode(lat, lon, WEATHER_CELL_PRECISION)
+    weather = await weather_cache.get_or_load(
+        cell, lambda: fetch_real_weather(*geohash_center(cell))
+    )
+    return weather or "Weather data unavailable"
 
 
 # ---------------------------------------------------------------------------
@@ -181,11 +227,76 @@ async def create_new_session(user_id: str):
     return new_session
 
 
-async def get_session(session_id: str):
-    session_data = await chat_collection.find_one({"session_id": session_id})
-    if not session_data:
+async def get_session(session_id: str, tail: int = HISTORY_FETCH):
+    """
+    Loads a session with its rolling summary and the messages after it (at
+    most the last `tail`), trimmed to role/content/timestamp on the server
+    so stored images are never read.
+    """
+    pipeline = [
+        {"$match": {"session_id": session_id}},
+        {"$limit": 1},
+        {"$addFields": {
+            "messages": {"$ifNull": ["$messages", []]},
+            "summary_upto": {"$ifNull": ["$summary_upto", 0]},
+        }},
+        {"$addFields": {"total": {"$size": "$messages"}}},
+        {"$addFields": {"start": {"$max": ["$summary_upto", {"$subtract": ["$total", tail]}]}}},
+        {"$project": {
+            "_id": 0,
+            "session_id": 1,
+            "user_id": 1,
+            "title": 1,
+            "created_at": 1,
+            "last_updated": 1,
+            "summary": {"$ifNull": ["$summary", ""]},
+            "summary_upto": 1,
+            "messages": {"$map": {
+                "input": {"$slice": ["$messages", "$start", {"$max": [{"$subtract": ["$total", "$start"]}, 1]}]},
+                "as": "m",
+                "in": {"role": "$$m.role", "content": "$$m.content", "timestamp": "$$m.timestamp"},
+            }},
+        }},
+    ]
+    docs = await chat_collection.aggregate(pipeline).to_list(1)
+    if not docs:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return ChatSession(**docs[0])
+
+
+async def get_message_page(session_id: str, before: Optional[int], limit: int):
+    """
+    Returns (messages, total, start) for the `limit` messages ending just
+    before index `before` (or the newest ones when no cursor is given).
+    The slice is computed server-side so only one page is transferred.
+    """
+    end = "$total" if before is None else {"$min": [before, "$total"]}
+    pipeline = [
+        {"$match": {"session_id": session_id}},
+        {"$limit": 1},
+        {"$project": {
+            "messages": 1,
+            "total": {"$size": {"$ifNull": ["$messages", []]}},
+        }},
+        {"$addFields": {"end": end}},
+        {"$addFields": {"start": {"$max": [{"$subtract": ["$end", limit]}, 0]}}},
+        {"$project": {
+            "_id": 0,
+            "total": 1,
+            "start": 1,
+            "messages": {"$cond": [
+                {"$gt": ["$end", "$start"]},
+                {"$slice": ["$messages", "$start", {"$subtract": ["$end", "$start"]}]},
+                [],
+            ]},
+        }},
+    ]
+    docs = await chat_collection.aggregate(pipeline).to_list(1)
+    if not docs:
         raise HTTPException(status_code=404, detail="Session not found")
-    return ChatSession(**session_data)
+    doc = docs[0]
+    messages = [ChatMessage(**m) for m in doc["messages"]]
+    return messages, doc["total"], doc["start"]
 
 
 async def update_session_messages(
@@ -204,70 +315,168 @@ async def update_session_messages(
 
 
 # ---------------------------------------------------------------------------
-# Main AI response function
+# Rolling conversation summary
 # ---------------------------------------------------------------------------
-def get_ai_response(
-    history: List[ChatMessage],
-    current_prompt: str,
-    image_b64: Optional[str],
-    lang: str,
-    lat: Optional[float] = None,
-    lon: Optional[float] = None,
-):
-    # ------------------------------------------------------------------
-    # 1. Detect image-generation requests FIRST
-    # ------------------------------------------------------------------
-    if is_image_request(current_prompt):
-        img_b64 = generate_image_hf(current_prompt)
-        if img_b64:
-            return f"Here is the image you requested:\n\n[IMAGE_GENERATED:{img_b64}]"
-        else:
-            return (
-                "माफ़ करें, अभी इमेज जनरेट नहीं हो सकी। "
-                "कृपया थोड़ी देर बाद फिर कोशिश करें। "
-                "(Sorry, image generation failed. Please try again later.)"
-            )
+# Once the messages after the summary no longer fit the context budget, the
+# older ones (all but the last SUMMARY_KEEP_RECENT) are folded into the
+# stored summary by the LLM in the background. Each refresh only reads the
+# previous summary plus the new messages, so the cost per refresh is bounded
+# however long the conversation gets.
+_summary_refreshes = {}
 
-    # ------------------------------------------------------------------
-    # 2. Build location/weather context
-    # ------------------------------------------------------------------
-    context = ""
-    if lat is not None and lon is not None:
-        loc_name = get_location_name(lat, lon)
-        weather = get_real_weather(lat, lon)
-        context = (
-            f"\n\n[System Info - User Context]\n"
-            f"Location: {loc_name}\nWeather: {weather}\n"
-            f"Use this context to provide personalized agricultural advice."
-        )
 
-    # ------------------------------------------------------------------
-    # 3. Vision — use Gemini if image is attached
-    # ------------------------------------------------------------------
-    if image_b64 and GEMINI_API_KEY:
-        try:
-            import PIL.Image
+async def get_summary_window(session_id: str):
+    """Returns (summary, summary_upto, messages to fold in, end index)."""
+    pipeline = [
+        {"$match": {"session_id": session_id}},
+        {"$limit": 1},
+        {"$project": {
+            "_id": 0,
+            "summary": {"$ifNull": ["$summary", ""]},
+            "upto": {"$ifNull": ["$summary_upto", 0]},
+            "messages": {"$ifNull": ["$messages", []]},
+        }},
+        {"$addFields": {"end": {"$min": [
+            {"$subtract": [{"$size": "$messages"}, SUMMARY_KEEP_RECENT]},
+            {"$add": ["$upto", SUMMARY_BATCH]},
+        ]}}},
+        {"$project": {
+            "summary": 1,
+            "upto": 1,
+            "end": 1,
+            "messages": {"$cond": [
+                {"$gt": ["$end", "$upto"]},
+                {"$map": {
+                    "input": {"$slice": ["$messages", "$upto", {"$subtract": ["$end", "$upto"]}]},
+                    "as": "m",
+                    "in": {"role": "$$m.role", "content": "$$m.content"},
+                }},
+                [],
+            ]},
+        }},
+    ]
+    docs = await chat_collection.aggregate(pipeline).to_list(1)
+    if not docs:
+        return None
+    doc = docs[0]
+    return doc["summary"], doc["upto"], doc["messages"], doc["end"]
 
-            image_bytes = base64.b64decode(image_b64)
-            img = PIL.Image.open(io.BytesIO(image_bytes))
 
-            model = genai.GenerativeModel("gemini-2.5-flash-lite")
-            prompt = (
-                f"You are Krishi Sathi, an expert agricultural AI assistant. "
-                f"Respond strictly in {lang}. "
-                f"Analyze this image for crop diseases or issues. "
-                f"Use this context if needed: {context}\n"
-                f"User Question: {current_prompt}"
-            )
-            response = model.generate_content([prompt, img])
-            return response.text
+async def refresh_summary(session_id: str):
+    window = await get_summary_window(session_id)
+    if not window:
+        return
+    summary, upto, messages, end = window
+    if not messages:
+        return
+
+    response = await client.chat_completion(
+        model=LOGIC_MODEL,
+        messages=summary_prompt(summary, [(m["role"], m["content"]) for m in messages]),
+        max_tokens=SUMMARY_MAX_TOKENS,
+        temperature=0.2,
+    )
+    new_summary = (response.choices[0].message.content or "").strip()
+    if not new_summary:
+        return
+
+    # Only applies if no other worker moved the summary on meanwhile
+    # (sessions created before summaries existed have no summary_upto yet)
+    expected = {"$in": [0, None]} if upto == 0 else upto
+    result = await chat_collection.update_one(
+        {"session_id": session_id, "summary_upto": expected},
+        {"$set": {"summary": new_summary, "summary_upto": end}},
+    )
+    if result.modified_count:
+        print(f"📝 Summarised messages {upto}-{end} of session {session_id}")
+
+
+def schedule_summary_refresh(session_id: str):
+    """Starts a background refresh unless one is already running for the session."""
+    if session_id in _summary_refreshes:
+        return
+
+    async def run():
+        try:
+            await refresh_summary(session_id)
         except Exception as e:
-            print(f"Gemini Vision Error: {e}")
-            return "Sorry, I encountered an error analyzing your image with Gemini."
+            print(f"Summary Error: {e}")
 
-    # ------------------------------------------------------------------
-    # 4. Standard text response via HF Inference API
-    # ------------------------------------------------------------------
+    task = asyncio.ensure_future(run())
+    _summary_refreshes[session_id] = task
+    task.add_done_callback(lambda _: _summary_refreshes.pop(session_id, None))
+
+
+# ---------------------------------------------------------------------------
+# Main AI response function
+# ---------------------------------------------------------------------------
+# Max seconds spent gathering location/weather context before calling the LLM
+CONTEXT_DEADLINE = float(os.getenv("CONTEXT_DEADLINE_SECONDS", "2.5"))
+_background_lookups = set()
+
+IMAGE_GEN_FAILED_TEXT = (
+    "माफ़ करें, अभी इमेज जनरेट नहीं हो सकी। "
+    "कृपया थोड़ी देर बाद फिर कोशिश करें। "
+    "(Sorry, image generation failed. Please try again later.)"
+)
+
+
+async def build_user_context(lat: Optional[float], lon: Optional[float]) -> str:
+    """
+    Runs all context lookups concurrently and waits at most CONTEXT_DEADLINE
+    seconds; the prompt is built from whatever has arrived by then.
+    """
+    if lat is None or lon is None:
+        return ""
+
+    lookups = {
+        "Location": asyncio.ensure_future(get_location_name(lat, lon)),
+        "Weather": asyncio.ensure_future(get_real_weather(lat, lon)),
+    }
+    done, pending = await asyncio.wait(lookups.values(), timeout=CONTEXT_DEADLINE)
+
+    # Late lookups keep running so their result still lands in the geo caches
+    for task in pending:
+        _background_lookups.add(task)
+        task.add_done_callback(_background_lookups.discard)
+
+    lines = [
+        f"{label}: {task.result()}"
+        for label, task in lookups.items()
+        if task in done and task.exception() is None
+    ]
+    if not lines:
+        return ""
+    return (
+        "\n\n[System Info - User Context]\n"
+        + "\n".join(lines)
+        + "\nUse this context to provide personalized agricultural advice."
+    )
+
+
+def build_vision_request(current_prompt: str, image_b64: str, lang: str, context: str):
+    import PIL.Image
+
+    image_bytes = base64.b64decode(image_b64)
+    img = PIL.Image.open(io.BytesIO(image_bytes))
+    prompt = (
+        f"You are Krishi Sathi, an expert agricultural AI assistant. "
+        f"Respond strictly in {lang}. "
+        f"Analyze this image for crop diseases or issues. "
+        f"Use this context if needed: {context}\n"
+        f"User Question: {current_prompt}"
+    )
+    return [prompt, img]
+
+
+def build_chat_messages(
+    history: List[ChatMessage],
+    summary: str,
+    current_prompt: str,
+    image_b64: Optional[str],
+    lang: str,
+    context: str,
+) -> List[dict]:
     system_instruction = (
         f"You are Krishi Sathi, an expert agricultural AI assistant. "
         f"Respond strictly in {lang}. "
@@ -279,11 +488,16 @@ def get_ai_response(
 
     messages = [{"role": "system", "content": system_instruction}]
 
-    # Add recent history (last 10 messages to save tokens)
-    recent_msgs = history[-10:] if len(history) > 10 else history
-    for msg in recent_msgs:
-        role = "user" if msg.role == "user" else "assistant"
-        messages.append({"role": role, "content": msg.content})
+    # Older turns arrive as the rolling summary, recent ones verbatim within
+    # the token budget (see chat_context.py)
+    if summary:
+        messages.append({
+            "role": "system",
+            "content": f"Summary of the earlier conversation:\n{summary}",
+        })
+    turns = [("user" if msg.role == "user" else "assistant", msg.content) for msg in history]
+    for role, content in select_history(turns):
+        messages.append({"role": role, "content": content})
 
     # Current user message
     user_content = []
@@ -296,20 +510,219 @@ def get_ai_response(
         )
     user_content.append({"type": "text", "text": current_prompt})
     messages.append({"role": "user", "content": user_content})
+    return messages
+
+
+def answer_cache_scope(
+    history: List[ChatMessage],
+    image_b64: Optional[str],
+    lang: str,
+    lat: Optional[float],
+    lon: Optional[float],
+) -> Optional[tuple]:
+    """
+    Cache namespace for stand-alone text questions, or None when the answer
+    depends on more than the question (earlier turns, an image, location).
+    """
+    if history or image_b64 or lat is not None or lon is not None:
+        return None
+    return ("chat", LOGIC_MODEL, lang)
+
+
+async def get_ai_response(
+    history: List[ChatMessage],
+    current_prompt: str,
+    image_b64: Optional[str],
+    lang: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    summary: str = "",
+):
+    # Repeated stand-alone questions are answered from the answer cache
+    cache_scope = answer_cache_scope(history, image_b64, lang, lat, lon)
+    if cache_scope:
+        cached = answer_cache.get(cache_scope, current_prompt)
+        if cached:
+            return cached
+
+    # ------------------------------------------------------------------
+    # 1. Build location/weather context
+    #    (image-generation requests never get here, see start_image_reply)
+    # ------------------------------------------------------------------
+    context = await build_user_context(lat, lon)
+
+    # ------------------------------------------------------------------
+    # 2. Vision — use Gemini if image is attached
+    # ------------------------------------------------------------------
+    if image_b64 and GEMINI_API_KEY:
+        try:
+            model = genai.GenerativeModel("gemini-2.5-flash-lite")
+            response = await model.generate_content_async(
+                build_vision_request(current_prompt, image_b64, lang, context)
+            )
+            return response.text
+        except Exception as e:
+            print(f"Gemini Vision Error: {e}")
+            return "Sorry, I encountered an error analyzing your image with Gemini."
+
+    # ------------------------------------------------------------------
+    # 3. Standard text response via HF Inference API
+    # ------------------------------------------------------------------
+    messages = build_chat_messages(history, summary, current_prompt, image_b64, lang, context)
 
     try:
-        response = client.chat_completion(
+        response = await client.chat_completion(
             model=LOGIC_MODEL,
             messages=messages,
             max_tokens=1000,
             temperature=0.5,
         )
-        return response.choices[0].message.content
+        text = response.choices[0].message.content
+        if cache_scope:
+            answer_cache.set(cache_scope, current_prompt, text)
+        return text
     except Exception as e:
         print(f"AI Error: {e}")
         return f"Sorry, I encountered an error analyzing your request. ({e})"
 
 
+async def stream_ai_response(
+    history: List[ChatMessage],
+    current_prompt: str,
+    image_b64: Optional[str],
+    lang: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    summary: str = "",
+) -> AsyncIterator[str]:
+    """
+    Streaming twin of get_ai_response for text and vision replies.
+    Yields text deltas as the model produces them. Image-generation
+    requests are not streamable and must go through get_ai_response.
+    """
+    cache_scope = answer_cache_scope(history, image_b64, lang, lat, lon)
+    if cache_scope:
+        cached = answer_cache.get(cache_scope, current_prompt)
+        if cached:
+            yield cached
+            return
+
+    context = await build_user_context(lat, lon)
+
+    if image_b64 and GEMINI_API_KEY:
+        try:
+            model = genai.GenerativeModel("gemini-2.5-flash-lite")
+            response = await model.generate_content_async(
+                build_vision_request(current_prompt, image_b64, lang, context),
+                stream=True,
+            )
+            async for chunk in response:
+                if chunk.parts:
+                    yield chunk.text
+        except Exception as e:
+            print(f"Gemini Vision Error: {e}")
+            yield "Sorry, I encountered an error analyzing your image with Gemini."
+        return
+
+    messages = build_chat_messages(history, summary, current_prompt, image_b64, lang, context)
+
+    try:
+        stream = await client.chat_completion(
+            model=LOGIC_MODEL,
+            messages=messages,
+            max_tokens=1000,
+            temperature=0.5,
+            stream=True,
+        )
+        chunks = []
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                chunks.append(delta)
+                yield delta
+        if cache_scope:
+            answer_cache.set(cache_scope, current_prompt, "".join(chunks))
+    except Exception as e:
+        print(f"AI Error: {e}")
+        yield f"Sorry, I encountered an error analyzing your request. ({e})"
+
+
+# ---------------------------------------------------------------------------
+# Image requests — queued, deduplicated and cached (see image_jobs.py)
+# ---------------------------------------------------------------------------
+IMAGE_READY_TEXT = "Here is the image you requested:"
+IMAGE_PENDING_TEXT = (
+    "आपकी तस्वीर बन रही है, कुछ ही पलों में दिखेगी। "
+    "(Your image is being generated and will appear shortly.)"
+)
+
+image_jobs = ImageJobQueue(generate_image_hf)
+
+
+def start_image_reply(prompt: str):
+    """
+    Queues (or reuses) an image job for `prompt`.
+    Returns (ai_text, image_url, job_id); image_url is set on a cache hit,
+    job_id while the image is still being generated.
+    """
+    try:
+        job, image_url = image_jobs.submit(prompt)
+    except QueueFullError:
+        return IMAGE_GEN_FAILED_TEXT, None, None
+    if image_url:
+        return IMAGE_READY_TEXT, image_url, None
+    return IMAGE_PENDING_TEXT, None, job.job_id
+
+
+@image_jobs.on_complete
+async def attach_generated_image(job: ImageJob):
+    """Fills in every placeholder assistant message waiting on `job`."""
+    if job.status == "done":
+        update = {
+            "messages.$[m].content": IMAGE_READY_TEXT,
+            "messages.$[m].image_url": job.image_url,
+        }
+    else:
+        update = {"messages.$[m].content": IMAGE_GEN_FAILED_TEXT}
+    update["messages.$[m].image_job_id"] = None
+
+    await chat_collection.update_many(
+        {"messages.image_job_id": job.job_id},
+        {"$set": update},
+        array_filters=[{"m.image_job_id": job.job_id}],
+    )
+
+
+async def fail_orphaned_placeholders(job_id: Optional[str] = None) -> int:
+    """
+    Marks placeholders whose job this process no longer knows as failed, so
+    clients stop polling them. The job queue lives in memory: at startup
+    (job_id None) every pending placeholder is orphaned; later a job can
+    still expire from the job table. Returns the number of chats updated.
+    """
+    match = job_id if job_id else {"$type": "string"}
+    result = await chat_collection.update_many(
+        {"messages.image_job_id": match},
+        {"$set": {"messages.$[m].content": IMAGE_GEN_FAILED_TEXT, "messages.$[m].image_job_id": None}},
+        array_filters=[{"m.image_job_id": match}],
+    )
+    return result.modified_count
+
+
+def public_image_url(request: Request, image_url: Optional[str]) -> Optional[str]:
+    """Turns a stored image reference into something the browser can load."""
+    if not image_url:
+        return None
+    if blob_store.is_blob_ref(image_url):
+        return str(request.base_url).rstrip("/") + image_url
+    if not image_url.startswith("http") and not image_url.startswith("data:"):
+        # Legacy sessions stored raw base64 inline
+        return f"data:image/jpeg;base64,{image_url}"
+    return image_url
+
+
 def generate_title(first_message: str):
     return first_message[:30] + "..." if len(first_message) > 30 else first_message
 
@@ -329,124 +742,326 @@ async def create_session(req: CreateSessionRequest):
 
 
 @router.get("/sessions/{user_id}", response_model=List[SessionSummary])
-async def list_sessions(user_id: str):
+async def list_sessions(
+    user_id: str,
+    response: Response,
+    cursor: Optional[str] = Query(None, description=f"{NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(SESSIONS_PAGE_SIZE, ge=1, le=SESSIONS_PAGE_MAX),
+):
+    """
+    Newest sessions first, one page at a time. Only the fields the sidebar
+    shows are read, never the messages; the next page's cursor is returned
+    in the X-Next-Cursor header.
+    """
+    query = {"user_id": user_id}
+    if cursor:
+        after = after_filter(SESSIONS_SORT, decode_cursor(cursor, len(SESSIONS_SORT)))
+        if isinstance(after["$or"][0]["last_updated"]["$lt"], datetime):
+            # Legacy sessions with a string last_updated sort after all dates
+            after["$or"].append({"last_updated": {"$type": "string"}})
+        query.update(after)
+
     try:
-        cursor = chat_collection.find({"user_id": user_id}).sort("last_updated", -1)
-        sessions = []
-        async for doc in cursor:
-            lu = doc.get("last_updated")
-            if isinstance(lu, str):
-                lu_iso = lu
-            elif isinstance(lu, datetime):
-                lu_iso = lu.isoformat()
-            else:
-                lu_iso = datetime.utcnow().isoformat()
-
-            sess_id = doc.get("session_id") or str(doc["_id"])
-            sessions.append(
-                SessionSummary(
-                    session_id=sess_id,
-                    title=doc.get("title", "New Chat"),
-                    last_updated=lu_iso,
-                )
-            )
-        return sessions
+        docs = await (
+            chat_collection.find(query, SESSION_LIST_FIELDS)
+            .sort(SESSIONS_SORT)
+            .limit(limit + 1)
+            .to_list(limit + 1)
+        )
     except Exception as e:
         print(f"ERROR in list_sessions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = cursor_for(docs[-1], SESSIONS_SORT)
+
+    sessions = []
+    for doc in docs:
+        lu = doc.get("last_updated")
+        if isinstance(lu, str):
+            lu_iso = lu
+        elif isinstance(lu, datetime):
+            lu_iso = lu.isoformat()
+        else:
+            lu_iso = datetime.utcnow().isoformat()
+
+        sess_id = doc.get("session_id") or str(doc["_id"])
+        sessions.append(
+            SessionSummary(
+                session_id=sess_id,
+                title=doc.get("title", "New Chat"),
+                last_updated=lu_iso,
+            )
+        )
+    return sessions
+
 
 @router.get("/history/{session_id}", response_model=HistoryResponse)
-async def get_history(session_id: str):
-    session = await get_session(session_id)
+async def get_history(
+    request: Request,
+    session_id: str,
+    before: Optional[int] = Query(None, ge=0, description="Cursor from a previous page's next_cursor"),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_PAGE_MAX),
+):
+    messages, total, start = await get_message_page(session_id, before, limit)
     formatted_history = []
-    for msg in session.messages:
-        img_url = msg.image_url
-        if img_url and not img_url.startswith("http") and not img_url.startswith("data:"):
-            img_url = f"data:image/jpeg;base64,{img_url}"
+    for msg in messages:
         formatted_history.append(
             {
                 "role": msg.role,
                 "text": msg.content,
-                "image": img_url,
+                "image": public_image_url(request, msg.image_url),
+                "job_id": msg.image_job_id,
                 "timestamp": msg.timestamp.isoformat(),
             }
         )
-    return HistoryResponse(session_id=session.session_id, messages=formatted_history)
-
+    return HistoryResponse(
+        session_id=session_id,
+        messages=formatted_history,
+        total=total,
+        next_cursor=start if start > 0 else None,
+    )
 
-@router.post("/message")
-async def send_message(req: MessageRequest):
-    # 1. Retrieve session
-    session = await get_session(req.session_id)
 
-    # 2. Get AI response
-    ai_text = get_ai_response(
-        session.messages,
-        req.message,
-        req.image,
-        req.language,
-        req.latitude,
-        req.longitude,
-    )
+def decode_upload(req: MessageRequest) -> Optional[bytes]:
+    """Validates the attached image up front, so a bad upload is a 400 before any model call."""
+    if not req.image:
+        return None
+    try:
+        return blob_store.decode_b64_image(req.image)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image upload: {e}")
 
-    # 3. Extract generated image if present
-    bot_image_url = None
-    if "[IMAGE_GENERATED:" in ai_text:
-        parts = ai_text.split("[IMAGE_GENERATED:")
-        bot_image_url = "data:image/jpeg;base64," + parts[1].split("]")[0]
-        ai_text = parts[0].strip()
 
-    # 4. Persist messages
+async def persist_exchange(
+    session: ChatSession,
+    req: MessageRequest,
+    ai_text: str,
+    bot_image_url: Optional[str],
+    image_job_id: Optional[str] = None,
+    image_bytes: Optional[bytes] = None,
+):
+    user_image_url = await blob_store.put_blob(image_bytes) if image_bytes else None
     user_msg = ChatMessage(
         role="user",
         content=req.message,
-        image_url=req.image if req.image else None,
+        image_url=user_image_url,
+    )
+    bot_msg = ChatMessage(
+        role="assistant",
+        content=ai_text,
+        image_url=bot_image_url,
+        image_job_id=image_job_id,
     )
-    bot_msg = ChatMessage(role="assistant", content=ai_text, image_url=bot_image_url)
 
     new_title = None
-    if len(session.messages) == 0:
+    if len(session.messages) == 0 and session.summary_upto == 0:
         new_title = generate_title(req.message)
 
     await update_session_messages(req.session_id, [user_msg, bot_msg], update_title=new_title)
 
-    return {"role": "assistant", "content": ai_text, "image": bot_image_url}
+    unsummarised = [(m.role, m.content) for m in session.messages + [user_msg, bot_msg]]
+    if summary_due(unsummarised):
+        schedule_summary_refresh(req.session_id)
 
+    if image_job_id:
+        # The job may have finished before the placeholder was written
+        job = image_jobs.get_job(image_job_id)
+        if job and job.status in ("done", "failed"):
+            await attach_generated_image(job)
 
-@router.post("/transcribe")
-async def transcribe_voice(file: UploadFile = File(...)):
-    if not file:
+
+async def try_quick_reply(req: MessageRequest) -> Optional[str]:
+    """
+    Short weather / price / scheme / disease questions are answered straight
+    from tools.py (see quick_replies.py); None means ask the model.
+    """
+    if req.image or not detect_intents(req.message):
+        return None
+    location = None
+    if req.latitude is not None and req.longitude is not None:
+        location = await get_location_name(req.latitude, req.longitude)
+        if location == UNKNOWN_LOCATION:
+            location = None
+    return await asyncio.to_thread(quick_reply, req.message, req.language, location)
+
+
+def reply_payload(request: Request, ai_text: str, bot_image_url: Optional[str], job_id: Optional[str]):
+    return {
+        "role": "assistant",
+        "content": ai_text,
+        "image": public_image_url(request, bot_image_url),
+        "job_id": job_id,
+    }
+
+
+@router.post("/message")
+async def send_message(req: MessageRequest, request: Request):
+    image_bytes = decode_upload(req)
+
+    # 1. Retrieve session
+    session = await get_session(req.session_id)
+
+    # 2. Get AI response (image requests are queued and answered with a job id,
+    #    short weather/price/scheme/disease questions come straight from tools.py)
+    bot_image_url, job_id = None, None
+    if is_image_request(req.message):
+        ai_text, bot_image_url, job_id = start_image_reply(req.message)
+    else:
+        ai_text = await try_quick_reply(req) or await get_ai_response(
+            session.messages,
+            req.message,
+            req.image,
+            req.language,
+            req.latitude,
+            req.longitude,
+            session.summary,
+        )
+
+    # 3. Persist messages
+    await persist_exchange(session, req, ai_text, bot_image_url, job_id, image_bytes)
+
+    return reply_payload(request, ai_text, bot_image_url, job_id)
+
+
+@router.post("/message/stream")
+async def stream_message(req: MessageRequest, request: Request):
+    """
+    Server-Sent-Events variant of /message.
+    Emits `token` events with text deltas while the model generates, then a
+    final `done` event carrying the full reply once it has been persisted.
+    """
+    image_bytes = decode_upload(req)
+    session = await get_session(req.session_id)
+
+    async def event_stream():
+        bot_image_url, job_id = None, None
+        if is_image_request(req.message):
+            # Image generation has no token stream — reply with the job id
+            ai_text, bot_image_url, job_id = start_image_reply(req.message)
+        else:
+            # Tool-backed quick replies are complete at once
+            ai_text = await try_quick_reply(req)
+            if ai_text:
+                yield sse_event("token", {"delta": ai_text})
+            else:
+                chunks = []
+                async for delta in stream_ai_response(
+                    session.messages, req.message, req.image, req.language,
+                    req.latitude, req.longitude, session.summary,
+                ):
+                    chunks.append(delta)
+                    yield sse_event("token", {"delta": delta})
+                ai_text = "".join(chunks)
+
+        await persist_exchange(session, req, ai_text, bot_image_url, job_id, image_bytes)
+        yield sse_event("done", reply_payload(request, ai_text, bot_image_url, job_id))
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
+@router.get("/images/{job_id}")
+async def get_image_job(job_id: str, request: Request):
+    """Poll target for queued image generations."""
+    job = image_jobs.get_job(job_id)
+    if not job:
+        # Lost in a restart or expired: its placeholders will never be filled
+        if await fail_orphaned_placeholders(job_id):
+            return {"job_id": job_id, "status": "failed", "content": IMAGE_GEN_FAILED_TEXT, "image": None}
+        raise HTTPException(status_code=404, detail="Image job not found")
+    content = {"done": IMAGE_READY_TEXT, "failed": IMAGE_GEN_FAILED_TEXT}.get(job.status, IMAGE_PENDING_TEXT)
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "content": content,
+        "image": public_image_url(request, job.image_url),
+    }
+
+
+@router.get("/blobs/{digest}")
+async def get_blob(digest: str, request: Request):
+    """Serves a stored image. Blobs are immutable, so clients may cache them forever."""
+    path = blob_store.find_blob(digest)
+    if not path:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    etag = f'"{digest}"'
+    headers = {"Cache-Control": blob_store.BLOB_CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    head = await asyncio.to_thread(blob_store.read_blob_head, path)
+    return FileResponse(
+        path, media_type=blob_store.sniff_content_type(head), headers=headers
+    )
+
+
+async def transcribe_stream(chunks: AsyncIterator[bytes]):
+    try:
+        audio = await speech.spool_audio(chunks)
+    except speech.AudioTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if audio.size == 0:
+        audio.cleanup()
         raise HTTPException(status_code=400, detail="No audio file uploaded")
     try:
-        audio_bytes = await file.read()
-        output = audio_client.automatic_speech_recognition(audio_bytes, model=STT_MODEL)
-        return {"text": output.text}
+        return {"text": await speech.transcribe_audio(audio)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        audio.cleanup()
+
+
+@router.post("/transcribe")
+async def transcribe_voice(file: UploadFile = File(...)):
+    if not file:
+        raise HTTPException(status_code=400, detail="No audio file uploaded")
+    return await transcribe_stream(speech.iter_upload(file))
+
+
+@router.post("/transcribe/stream")
+async def transcribe_voice_stream(request: Request):
+    """
+    Same as /transcribe, but takes the raw audio as the request body so it is
+    spooled while it uploads and rejected as soon as it crosses the size cap.
+    """
+    return await transcribe_stream(request.stream())
 
 
 @router.post("/synthesize")
 async def synthesize_voice(
     text: str = Body(..., embed=True),
     target_language_code: str = Body("hi-IN", embed=True),
+    speaker: str = Body(speech.TTS_SPEAKER, embed=True),
 ):
     if not text:
         raise HTTPException(status_code=400, detail="No text provided")
     try:
-        sarvam_client = SarvamAI(api_subscription_key=SARVAM_API_KEY)
-        response = sarvam_client.text_to_speech.convert(
-            model="bulbul:v3",
-            text=text,
-            target_language_code=target_language_code,
-            speaker="shubh",
-        )
-        if response and response.audios and len(response.audios) > 0:
-            audio_base64 = response.audios[0]
-            audio_bytes = base64.b64decode(audio_base64)
-            return Response(content=audio_bytes, media_type="audio/wav")
-        else:
-            raise HTTPException(status_code=500, detail="Failed to synthesize voice")
+        audio_bytes = await speech.synthesize(text, target_language_code, speaker)
     except Exception as e:
         print(f"Synthesize Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    if not audio_bytes:
+        raise HTTPException(status_code=500, detail="Failed to synthesize voice")
+    return Response(content=audio_bytes, media_type="audio/wav")
+
+
+@router.post("/synthesize/stream")
+async def synthesize_voice_stream(
+    text: str = Body(..., embed=True),
+    target_language_code: str = Body("hi-IN", embed=True),
+    speaker: str = Body(speech.TTS_SPEAKER, embed=True),
+):
+    """
+    Splits the text into sentences, synthesises them concurrently and streams
+    a single WAV back as soon as the first sentence is ready.
+    """
+    if not text:
+        raise HTTPException(status_code=400, detail="No text provided")
+    return StreamingResponse(
+        speech.stream_synthesis(text, target_language_code, speaker),
+        media_type="audio/wav",
+    )
@@ -1,7 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from pydantic import BaseModel
 from typing import List, Optional
 
+from kendra_directory import get_kendra_directory
+
 router = APIRouter(
     prefix="/kisan-kendra",
     tags=["Kisan Seva Kendra"]
@@ -13,34 +15,36 @@ class KisanKendra(BaseModel):
     address: str
     contact: str
     services: List[str]
+    district: Optional[str] = None
+    state: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    distance_km: Optional[float] = None  # /nearest only
+    match_score: Optional[float] = None  # /find: trigram similarity of the city name
+
+def fallback_kendra(city: str) -> KisanKendra:
+    # Place not in the directory: point to the district office and the call centre
+    return KisanKendra(
+        name=f"District Kisan Seva Kendra ({city.title()})",
+        city=city.title(),
+        address=f"Near District Collectorate, {city.title()}",
+        contact="1800-180-1551 (Kisan Call Center)",
+        services=["General Advisory", "Scheme Enrollment", "Market Info"]
+    )
 
 @router.get("/find", response_model=KisanKendra)
 async def find_kendra(city: str):
-    # Dummy logic: Return a Kendra for the requested city (or nearest dummy)
-    city_lower = city.lower()
-    
-    if "bhagalpur" in city_lower:
-        return KisanKendra(
-            name="Krishi Vigyan Kendra, Bhagalpur",
-            city="Bhagalpur",
-            address="Sabour, Bhagalpur, Bihar 813210",
-            contact="+91-641-2451000",
-            services=["Soil Testing", "Seed Distribution", "Training", "Crop Advisory"]
-        )
-    elif "patna" in city_lower:
-        return KisanKendra(
-            name="ICAR Reseach Complex, Patna",
-            city="Patna",
-            address="P.O. Bihar Veterinary College, Patna 800014",
-            contact="+91-612-2222222",
-            services=["Research Support", "High Yield Seeds", "Technology Demo"]
-        )
-    else:
-        # Generic Fallback
-        return KisanKendra(
-            name=f"District Kisan Seva Kendra ({city.title()})",
-            city=city.title(),
-            address=f"Near District Collectorate, {city.title()}",
-            contact="1800-180-1551 (Kisan Call Center)",
-            services=["General Advisory", "Scheme Enrollment", "Market Info"]
-        )
+    """Kendra for a city or district name; tolerates typos ("bhagalpore")."""
+    matches = get_kendra_directory().find(city, limit=1)
+    if not matches:
+        return fallback_kendra(city)
+    return matches[0]
+
+@router.get("/nearest", response_model=List[KisanKendra])
+async def nearest_kendras(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=50),
+):
+    """The k closest kendras to a location, nearest first."""
+    return get_kendra_directory().nearest(lat, lon, k)
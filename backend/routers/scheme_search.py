@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+from typing import List, Optional
+
+from scheme_index import scheme_index
+import tools  # noqa: F401  (registers the bundled farmer schemes in the index)
+
+router = APIRouter(
+    prefix="/schemes",
+    tags=["Scheme Search"]
+)
+
+class SchemeHit(BaseModel):
+    id: str
+    source: str  # "farmer" (bundled) or "women" (MongoDB)
+    name: str
+    score: float
+    description: Optional[str] = None
+    eligibility: Optional[str] = None
+    benefits: Optional[str] = None
+    link: Optional[str] = None
+
+@router.get("/search", response_model=List[SchemeHit])
+async def search_schemes(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    source: Optional[str] = None,
+):
+    """Ranked search over all schemes; accepts English, Hindi and Hinglish."""
+    return scheme_index.search(q, limit=limit, source=source)
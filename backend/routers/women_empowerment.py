@@ -1,6 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from database import database
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from typing import List, Optional
+from pymongo.errors import DuplicateKeyError
+from database import database, CATALOG_KEYS
+from scheme_index import index_women_scheme
+from catalog import (
+    CatalogPage,
+    CatalogPageResult,
+    cached_catalog,
+    bump_catalog_version,
+    not_modified,
+    CATALOG_CACHE_CONTROL,
+)
+from catalog_import import import_catalog
+from pagination import NEXT_CURSOR_HEADER
 from models.women_empowerment import Scheme, TrainingProgram, FinancialAid, SHG, HealthSafetyTip
 
 router = APIRouter(
@@ -8,58 +23,115 @@ router = APIRouter(
     tags=["Women Empowerment"]
 )
 
+# Every list takes ?cursor=&limit=&fields= (see catalog.py) plus its own
+# filters; the next page's cursor comes back in the X-Next-Cursor header.
+# Pages are served from the catalog cache with an ETag (304 when unchanged).
+def catalog_response(request: Request, response: Response, result: CatalogPageResult, page: CatalogPage):
+    unchanged = not_modified(request, result)
+    if unchanged:
+        return unchanged
+    headers = {"ETag": result.etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if result.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = result.next_cursor
+    if page.fields:
+        # Projected documents are partial, so they skip the response model
+        return JSONResponse(jsonable_encoder(result.docs), headers=headers)
+    response.headers.update(headers)
+    return result.docs
+
+async def insert_catalog_entry(collection, doc: dict):
+    """insert_one that answers 409 when the natural key (import_key index) is taken."""
+    try:
+        result = await collection.insert_one(doc)
+    except DuplicateKeyError:
+        keys = ", ".join(CATALOG_KEYS[collection.name])
+        raise HTTPException(status_code=409, detail=f"An entry with the same ({keys}) already exists")
+    bump_catalog_version(collection.name)
+    return result
+
+def is_first_unfiltered_page(page: CatalogPage, *filters: Optional[str]) -> bool:
+    """Demo data stands in only for a completely empty collection."""
+    return not page.cursor and not any(filters)
+
 # --- Schemes ---
 @router.get("/schemes", response_model=List[Scheme])
-async def get_schemes():
-    schemes = await database.schemes.find().to_list(100)
+async def get_schemes(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    page: CatalogPage = Depends(),
+):
+    result = await cached_catalog(database.schemes, Scheme, {"category": category}, page)
     # If empty, return dummy data for demo
-    if not schemes:
+    if not result.docs and is_first_unfiltered_page(page, category):
         return [
             Scheme(title="Mahila Kisan Sashaktikaran Pariyojana (MKSP)", description="Empowering women in agriculture.", eligibility="Women farmers in SHGs", benefits="Sustainable agriculture training", application_link="https://mksp.gov.in"),
             Scheme(title="Pradhan Mantri Matru Vandana Yojana", description="Maternity benefit program.", eligibility="Pregnant women", benefits="Cash incentive of ₹5000", application_link="https://wcd.nic.in"),
         ]
-    return schemes
+    return catalog_response(request, response, result, page)
 
 @router.post("/schemes", response_model=Scheme)
 async def create_scheme(scheme: Scheme):
-    new_scheme = await database.schemes.insert_one(scheme.dict())
+    new_scheme = await insert_catalog_entry(database.schemes, scheme.dict())
+    # Searchable right away, without rebuilding the index
+    index_women_scheme(str(new_scheme.inserted_id), scheme.dict())
     return scheme
 
 # --- Training ---
 @router.get("/training", response_model=List[TrainingProgram])
-async def get_training():
-    programs = await database.training.find().to_list(100)
-    if not programs:
+async def get_training(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    page: CatalogPage = Depends(),
+):
+    result = await cached_catalog(database.training, TrainingProgram, {"category": category}, page)
+    if not result.docs and is_first_unfiltered_page(page, category):
         return [
             TrainingProgram(title="Organic Farming Workshop", organizer="Krishi Vigyan Kendra", description="Learn organic farming techniques.", duration="3 Days", location="Village Hall"),
         ]
-    return programs
+    return catalog_response(request, response, result, page)
 
 @router.post("/training", response_model=TrainingProgram)
 async def create_training(program: TrainingProgram):
-    await database.training.insert_one(program.dict())
+    await insert_catalog_entry(database.training, program.dict())
     return program
 
 # --- Financial Aid ---
 @router.get("/financial-aid", response_model=List[FinancialAid])
-async def get_financial_aid():
-    aid = await database.financial_aid.find().to_list(100)
-    if not aid:
+async def get_financial_aid(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    page: CatalogPage = Depends(),
+):
+    result = await cached_catalog(database.financial_aid, FinancialAid, {"category": category}, page)
+    if not result.docs and is_first_unfiltered_page(page, category):
         return [
              FinancialAid(title="Kisan Credit Card for Women", provider="SBI", amount_range="₹50,000 - ₹3,00,000", eligibility="Land-holding women farmers", application_process="Visit nearest SBI branch"),
         ]
-    return aid
+    return catalog_response(request, response, result, page)
 
 @router.post("/financial-aid", response_model=FinancialAid)
 async def create_financial_aid(aid: FinancialAid):
-    await database.financial_aid.insert_one(aid.dict())
+    await insert_catalog_entry(database.financial_aid, aid.dict())
     return aid
 
 # --- SHGs ---
 @router.get("/shgs", response_model=List[SHG])
-async def get_shgs():
-    shgs = await database.shgs.find().to_list(100)
-    if not shgs:
+async def get_shgs(
+    request: Request,
+    response: Response,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    city: Optional[str] = None,
+    focus_area: Optional[str] = None,
+    category: Optional[str] = None,
+    page: CatalogPage = Depends(),
+):
+    filters = {"state": state, "district": district, "city": city, "focus_area": focus_area, "category": category}
+    result = await cached_catalog(database.shgs, SHG, filters, page)
+    if not result.docs and is_first_unfiltered_page(page, *filters.values()):
         return [
             SHG(
                 name="Kudumbashree Unit 42", 
@@ -95,28 +167,93 @@ async def get_shgs():
                 contact_number="+91 9988776655"
             ),
         ]
-    return shgs
+    return catalog_response(request, response, result, page)
 
 @router.post("/shgs", response_model=SHG)
 async def create_shg(shg: SHG):
-    await database.shgs.insert_one(shg.dict())
+    await insert_catalog_entry(database.shgs, shg.dict())
     return shg
 
 # --- Health & Safety ---
 @router.get("/health-safety", response_model=List[HealthSafetyTip])
-async def get_health_safety():
-    tips = await database.health_safety.find().to_list(100)
-    if not tips:
+async def get_health_safety(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    page: CatalogPage = Depends(),
+):
+    result = await cached_catalog(database.health_safety, HealthSafetyTip, {"category": category}, page)
+    if not result.docs and is_first_unfiltered_page(page, category):
         return [
             HealthSafetyTip(title="Pesticide Safety", content="Always wear a mask and gloves while spraying pesticides."),
         ]
-    return tips
+    return catalog_response(request, response, result, page)
 
 @router.post("/health-safety", response_model=HealthSafetyTip)
 async def create_health_safety(tip: HealthSafetyTip):
-    await database.health_safety.insert_one(tip.dict())
+    await insert_catalog_entry(database.health_safety, tip.dict())
     return tip
 
+# --- Bulk Import ---
+# URL segment -> (collection, model), matching the list endpoints above
+IMPORTABLE = {
+    "schemes": (database.schemes, Scheme),
+    "training": (database.training, TrainingProgram),
+    "financial-aid": (database.financial_aid, FinancialAid),
+    "shgs": (database.shgs, SHG),
+    "health-safety": (database.health_safety, HealthSafetyTip),
+}
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportResult(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
+
+def index_imported_schemes(docs: List[dict]):
+    for doc in docs:
+        if doc.get("_id") is not None:
+            index_women_scheme(str(doc["_id"]), doc)
+
+@router.post("/{catalog}/import", response_model=ImportResult)
+async def import_catalog_rows(
+    catalog: str,
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$", description="Defaults from Content-Type"),
+    mode: str = Query("insert", pattern="^(insert|upsert)$", description="upsert matches on the natural key"),
+):
+    """
+    Bulk load for registries received as spreadsheets: send the rows as an
+    NDJSON or CSV request body (streamed, any size). Invalid rows are listed
+    by line number and skipped; the rest is written in batches.
+    """
+    if catalog not in IMPORTABLE:
+        raise HTTPException(status_code=404, detail=f"Unknown catalog '{catalog}'")
+    collection, model = IMPORTABLE[catalog]
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+
+    try:
+        report = await import_catalog(
+            collection,
+            model,
+            request.stream(),
+            fmt=format,
+            upsert=mode == "upsert",
+            on_written=index_imported_schemes if catalog == "schemes" else None,
+        )
+    finally:
+        # Even a load that failed half-way may have written rows
+        bump_catalog_version(collection.name)
+    return report
+
 # --- Training Chatbot Endpoint ---
 import google.generativeai as genai
 import os
@@ -0,0 +1,279 @@
+import re
+import math
+import threading
+import functools
+from collections import Counter
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+
+# ===============================
+# Scheme search index (BM25)
+# ===============================
+# One in-memory inverted index over every scheme we know about: the farmer
+# schemes bundled in tools.py and the women schemes stored in MongoDB. Each
+# token is indexed three ways so Hindi, English and Hinglish queries meet:
+#   w:<token>    the exact (case-folded) word
+#   p:<key>      a phonetic skeleton, shared by "yojana", "yojna" and "योजना"
+#   c:<concept>  a bilingual synonym group, e.g. loan / rin / ऋण / कर्ज
+# Documents can be added or replaced one at a time, so new schemes are
+# searchable as soon as they are inserted.
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_BOOST = 2           # title tokens count this many times
+TERM_WEIGHTS = {"w": 1.0, "c": 1.0, "p": 0.6}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[\u0900-\u097F]+")
+_DEVANAGARI_RE = re.compile(r"[\u0900-\u097F]")
+
+STOPWORDS = {
+    "a", "an", "the", "of", "for", "to", "in", "on", "and", "or", "is", "are",
+    "with", "by", "at", "from", "under", "per", "me", "my", "i", "what", "which",
+    "ka", "ki", "ke", "ko", "hai", "aur", "se", "mein", "kya",
+    "का", "की", "के", "को", "है", "और", "से", "में", "क्या", "लिए",
+}
+
+# Bilingual synonym groups (English, Hinglish and Devanagari spellings)
+CONCEPTS = {
+    "loan": ["loan", "loans", "credit", "money", "rin", "karj", "karza", "karz", "ऋण", "कर्ज", "कर्ज़", "लोन"],
+    "insurance": ["insurance", "bima", "loss", "damage", "nuksan", "बीमा", "नुकसान"],
+    "organic": ["organic", "jaivik", "fertilizer", "khad", "जैविक", "खाद"],
+    "women": ["women", "woman", "female", "mahila", "stree", "महिला", "स्त्री"],
+    "farmer": ["farmer", "farmers", "kisan", "krishak", "किसान", "कृषक"],
+    "maternity": ["maternity", "pregnant", "pregnancy", "matru", "garbhvati", "मातृ", "गर्भवती"],
+    "income": ["income", "support", "aay", "आय"],
+    "training": ["training", "skill", "prashikshan", "प्रशिक्षण"],
+    "pension": ["pension", "penshan", "पेंशन"],
+}
+
+# Devanagari -> Latin, just precise enough to build phonetic keys
+_VOWELS = {
+    "अ": "a", "आ": "a", "इ": "i", "ई": "i", "उ": "u", "ऊ": "u", "ऋ": "ri",
+    "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au",
+}
+_MATRAS = {
+    "ा": "a", "ि": "i", "ी": "i", "ु": "u", "ू": "u", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ं": "n", "ँ": "n", "ः": "h",
+}
+_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "ph", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "व": "v",
+    "श": "sh", "ष": "sh", "स": "s", "ह": "h",
+}
+# Latin spelling variants folded before vowels are dropped
+_PHONETIC_FOLDS = [
+    ("chh", "c"), ("ch", "c"), ("ph", "f"), ("sh", "s"), ("kh", "k"),
+    ("gh", "g"), ("th", "t"), ("dh", "d"), ("bh", "b"), ("jh", "j"),
+    ("w", "v"), ("z", "j"), ("q", "k"), ("x", "ks"),
+]
+_VOWEL_CHARS = set("aeiou")
+
+
+def romanize(token: str) -> str:
+    """Rough Devanagari -> Latin transliteration (inherent vowels omitted)."""
+    return "".join(
+        _VOWELS.get(ch) or _MATRAS.get(ch) or _CONSONANTS.get(ch) or ""
+        for ch in token
+    )
+
+
+@functools.lru_cache(maxsize=50_000)
+def phonetic_key(token: str) -> str:
+    """
+    First letter plus consonant skeleton, so spelling and script variants
+    collapse: "yojana", "yojna", "योजना" -> "yjn".
+    """
+    if _DEVANAGARI_RE.search(token):
+        token = romanize(token)
+    if len(token) > 3 and token.endswith("s"):
+        token = token[:-1]
+    for src, dst in _PHONETIC_FOLDS:
+        token = token.replace(src, dst)
+    if not token:
+        return ""
+    skeleton = token[0] + "".join(ch for ch in token[1:] if ch not in _VOWEL_CHARS)
+    # Collapse doubled letters ("kisaan" / "kissan")
+    return re.sub(r"(.)\1+", r"\1", skeleton)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(str(text).casefold()) if t not in STOPWORDS]
+
+
+_CONCEPT_BY_WORD = {word: concept for concept, words in CONCEPTS.items() for word in words}
+_CONCEPT_BY_KEY = {phonetic_key(word): concept for word, concept in _CONCEPT_BY_WORD.items()}
+
+
+def expand(token: str) -> List[str]:
+    terms = [f"w:{token}"]
+    key = phonetic_key(token)
+    if key:
+        terms.append(f"p:{key}")
+    concept = _CONCEPT_BY_WORD.get(token) or (_CONCEPT_BY_KEY.get(key) if len(key) > 2 else None)
+    if concept:
+        terms.append(f"c:{concept}")
+    return terms
+
+
+class SchemeIndex:
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._docs: Dict[int, dict] = {}
+        self._ids: Dict[Hashable, int] = {}
+        self._next_id = 0
+        self._total_len = 0
+        self._compiled = None
+        self._listeners: List[Callable[[], None]] = []
+        # Tools search from worker threads while routes add documents
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def on_change(self, fn: Callable[[], None]):
+        """Registers a callback run after every add/remove (e.g. cache resets)."""
+        self._listeners.append(fn)
+        return fn
+
+    def _notify(self):
+        for fn in self._listeners:
+            fn()
+
+    def _remove_locked(self, key: Hashable):
+        doc_id = self._ids.pop(key, None)
+        if doc_id is None:
+            return
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+        del self._docs[doc_id]
+
+    def add(self, key: Hashable, title: str, body: Iterable[str], payload: dict):
+        """Adds (or replaces) a document. `payload` is returned with hits."""
+        tokens = tokenize(title) * TITLE_BOOST
+        for text in body:
+            if text:
+                tokens.extend(tokenize(text))
+        terms = Counter(term for token in tokens for term in expand(token))
+
+        with self._lock:
+            self._remove_locked(key)
+            self._compiled = None
+            doc_id = self._next_id
+            self._next_id += 1
+            self._ids[key] = doc_id
+            self._docs[doc_id] = payload
+            self._doc_terms[doc_id] = terms
+            self._doc_len[doc_id] = len(tokens)
+            self._total_len += len(tokens)
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+        self._notify()
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            self._remove_locked(key)
+            self._compiled = None
+        self._notify()
+
+    def search(self, query: str, limit: int = 10, source: Optional[str] = None) -> List[dict]:
+        """Returns up to `limit` payloads (with a `score`) ranked by BM25."""
+        weights: Dict[str, float] = {}
+        for token in tokenize(query):
+            for term in expand(token):
+                weights[term] = max(weights.get(term, 0.0), TERM_WEIGHTS[term[0]])
+        if not weights:
+            return []
+
+        with self._lock:
+            if self._compiled is None:
+                self._compiled = self._compile_locked()
+            payloads, term_impacts, sources = self._compiled
+        if not payloads:
+            return []
+
+        scores = np.zeros(len(payloads), dtype=np.float32)
+        for term, weight in weights.items():
+            hit = term_impacts.get(term)
+            if hit is not None:
+                rows, impacts = hit
+                scores[rows] += weight * impacts  # rows are unique per term
+        if source:
+            scores[sources != source] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [
+            dict(payloads[i], score=round(float(scores[i]), 4))
+            for i in candidates
+        ]
+
+    def _compile_locked(self):
+        """
+        Precomputes idf * BM25 term-frequency weight for every posting as
+        NumPy arrays, so a query is a few vectorised adds. Rebuilt lazily on
+        the first search after the index changes.
+        """
+        doc_ids = list(self._docs)
+        row = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        n = len(doc_ids)
+        lengths = np.fromiter((self._doc_len[d] for d in doc_ids), dtype=np.float64, count=n)
+        avg_len = max(lengths.mean(), 1.0) if n else 1.0
+        norms = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_len)
+
+        term_impacts = {}
+        for term, postings in self._postings.items():
+            df = len(postings)
+            rows = np.fromiter((row[d] for d in postings), dtype=np.int64, count=df)
+            tf = np.fromiter(postings.values(), dtype=np.float64, count=df)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            impacts = idf * tf * (BM25_K1 + 1) / (tf + norms[rows])
+            term_impacts[term] = (rows, impacts.astype(np.float32))
+
+        payloads = [self._docs[d] for d in doc_ids]
+        sources = np.array([p.get("source") for p in payloads], dtype=object)
+        return payloads, term_impacts, sources
+
+
+scheme_index = SchemeIndex()
+
+
+# ===============================
+# Sources
+# ===============================
+def index_women_scheme(scheme_id: str, scheme: dict):
+    scheme_index.add(
+        ("women", scheme_id),
+        scheme.get("title", ""),
+        [scheme.get("description"), scheme.get("eligibility"), scheme.get("benefits"), scheme.get("category")],
+        {
+            "source": "women",
+            "id": scheme_id,
+            "name": scheme.get("title", ""),
+            "description": scheme.get("description"),
+            "eligibility": scheme.get("eligibility"),
+            "benefits": scheme.get("benefits"),
+            "link": scheme.get("application_link"),
+        },
+    )
+
+
+async def index_db_schemes(database):
+    """Loads every scheme from MongoDB into the index (called at startup)."""
+    count = 0
+    async for doc in database.schemes.find():
+        index_women_scheme(str(doc["_id"]), doc)
+        count += 1
+    return count
@@ -0,0 +1,292 @@
+import os
+import re
+import glob
+import json
+import base64
+import struct
+import shutil
+import asyncio
+import hashlib
+import tempfile
+from typing import AsyncIterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from huggingface_hub import AsyncInferenceClient
+from sarvamai import AsyncSarvamAI
+
+from cache import AsyncTTLCache
+from blob_store import write_atomic
+
+load_dotenv()
+
+# ===============================
+# Speech-to-text (Whisper)
+# ===============================
+# Uploads are spooled to disk in chunks (never fully in memory) with a hard
+# size cap. Long recordings are split with ffmpeg into fixed-length pieces
+# that are transcribed in parallel and stitched back in order. Transcripts
+# are cached by the SHA-256 of the audio, so re-sent recordings are free.
+STT_MODEL = "openai/whisper-large-v3-turbo"
+STT_MAX_BYTES = int(os.getenv("STT_MAX_UPLOAD_MB", "25")) * 1024 * 1024
+STT_READ_CHUNK = 256 * 1024
+STT_SPLIT_BYTES = int(os.getenv("STT_SPLIT_KB", "1024")) * 1024
+STT_SEGMENT_SECONDS = int(os.getenv("STT_SEGMENT_SECONDS", "30"))
+STT_MAX_PARALLEL = int(os.getenv("STT_MAX_PARALLEL", "4"))
+
+FFMPEG = shutil.which("ffmpeg")
+
+audio_client = AsyncInferenceClient(
+    api_key=os.getenv("HF_TOKEN"), headers={"Content-Type": "audio/webm"}
+)
+transcript_cache = AsyncTTLCache("stt.transcripts", maxsize=2_000, ttl=7 * 24 * 3600)
+_stt_slots = asyncio.Semaphore(STT_MAX_PARALLEL)
+
+
+class AudioTooLargeError(Exception):
+    pass
+
+
+class SpooledAudio:
+    """Audio spooled to a temp directory; remove with cleanup()."""
+
+    def __init__(self, workdir: str, path: str, size: int, digest: str):
+        self.workdir = workdir
+        self.path = path
+        self.size = size
+        self.digest = digest
+
+    def cleanup(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+async def spool_audio(chunks: AsyncIterator[bytes], max_bytes: int = STT_MAX_BYTES) -> SpooledAudio:
+    """Writes an async byte stream to disk, hashing it and enforcing max_bytes."""
+    workdir = tempfile.mkdtemp(prefix="stt-")
+    path = os.path.join(workdir, "input.webm")
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_bytes:
+                    raise AudioTooLargeError(
+                        f"Audio exceeds the {max_bytes // (1024 * 1024)} MB limit"
+                    )
+                hasher.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    return SpooledAudio(workdir, path, size, hasher.hexdigest())
+
+
+async def iter_upload(file, chunk_size: int = STT_READ_CHUNK) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def split_audio(audio: SpooledAudio) -> List[str]:
+    """Cuts the recording into STT_SEGMENT_SECONDS pieces without re-encoding."""
+    pattern = os.path.join(audio.workdir, "part_%04d.webm")
+    proc = await asyncio.create_subprocess_exec(
+        FFMPEG, "-hide_banner", "-loglevel", "error",
+        "-i", audio.path,
+        "-f", "segment", "-segment_time", str(STT_SEGMENT_SECONDS),
+        "-reset_timestamps", "1", "-c", "copy",
+        pattern,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    parts = sorted(glob.glob(os.path.join(audio.workdir, "part_*.webm")))
+    if proc.returncode != 0 or not parts:
+        print(f"Audio Split Error: {stderr.decode(errors='ignore').strip()}")
+        return [audio.path]
+    return parts
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def transcribe_segment(path: str) -> str:
+    data = await asyncio.to_thread(_read_file, path)
+    async with _stt_slots:
+        output = await audio_client.automatic_speech_recognition(data, model=STT_MODEL)
+    return (output.text or "").strip()
+
+
+async def transcribe_audio(audio: SpooledAudio) -> str:
+    async def load():
+        if audio.size > STT_SPLIT_BYTES and FFMPEG:
+            segments = await split_audio(audio)
+        else:
+            segments = [audio.path]
+        texts = await asyncio.gather(*(transcribe_segment(p) for p in segments))
+        return " ".join(t for t in texts if t)
+
+    return await transcript_cache.get_or_load(audio.digest, load)
+
+
+# ===============================
+# Text-to-speech (Sarvam)
+# ===============================
+# One long-lived async client, and a two-level cache (in-memory LRU in front
+# of an on-disk store) keyed by (text, language, speaker, model) so common
+# advisories are only ever synthesised once. Long text can be split into
+# sentences that are synthesised concurrently and streamed in order.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SARVAM_API_KEY = os.getenv("SARVAM_API_KEY", "sk_mqiis1cf_mJUKgNtiSX3EV2Oakvc4Dbbm")
+TTS_MODEL = "bulbul:v3"
+TTS_SPEAKER = "shubh"
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(BASE_DIR, "tts_cache"))
+TTS_MAX_PARALLEL = int(os.getenv("TTS_MAX_PARALLEL", "4"))
+TTS_SENTENCE_MIN_CHARS = 40
+TTS_SENTENCE_MAX_CHARS = 400
+
+tts_client = AsyncSarvamAI(api_subscription_key=SARVAM_API_KEY)
+tts_cache = AsyncTTLCache("tts.audio", maxsize=500, ttl=30 * 24 * 3600)
+_tts_slots = asyncio.Semaphore(TTS_MAX_PARALLEL)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?।॥])\s+")
+
+
+def tts_cache_key(text: str, language_code: str, speaker: str, model: str) -> str:
+    raw = json.dumps([text, language_code, speaker, model], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _tts_cache_path(key: str) -> str:
+    return os.path.join(TTS_CACHE_DIR, key[:2], f"{key}.wav")
+
+
+def _read_if_exists(path: str) -> Optional[bytes]:
+    try:
+        return _read_file(path)
+    except FileNotFoundError:
+        return None
+
+
+async def synthesize(
+    text: str,
+    language_code: str,
+    speaker: str = TTS_SPEAKER,
+    model: str = TTS_MODEL,
+) -> Optional[bytes]:
+    """Returns WAV bytes for `text`, or None if synthesis failed."""
+    key = tts_cache_key(text, language_code, speaker, model)
+    path = _tts_cache_path(key)
+
+    async def load():
+        cached = await asyncio.to_thread(_read_if_exists, path)
+        if cached:
+            return cached
+        async with _tts_slots:
+            response = await tts_client.text_to_speech.convert(
+                model=model,
+                text=text,
+                target_language_code=language_code,
+                speaker=speaker,
+            )
+        if not response or not response.audios:
+            return None
+        audio = base64.b64decode(response.audios[0])
+        await asyncio.to_thread(write_atomic, path, audio)
+        return audio
+
+    return await tts_cache.get_or_load(key, load)
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Splits on sentence punctuation (incl. the Devanagari danda). Very short
+    sentences are merged into the previous one and overlong ones are cut at
+    word boundaries, keeping each synthesis request a sensible size.
+    """
+    sentences = []
+    for piece in _SENTENCE_END.split(text.strip()):
+        piece = piece.strip()
+        if not piece:
+            continue
+        if sentences and len(sentences[-1]) < TTS_SENTENCE_MIN_CHARS:
+            sentences[-1] = f"{sentences[-1]} {piece}"
+        else:
+            sentences.append(piece)
+
+    pieces = []
+    for sentence in sentences:
+        while len(sentence) > TTS_SENTENCE_MAX_CHARS:
+            cut = sentence.rfind(" ", 0, TTS_SENTENCE_MAX_CHARS)
+            cut = cut if cut > 0 else TTS_SENTENCE_MAX_CHARS
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+def split_wav(wav: bytes) -> Tuple[bytes, bytes]:
+    """Returns (fmt chunk payload, PCM data) of a RIFF/WAVE file."""
+    if wav[:4] != b"RIFF" or wav[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+    fmt, offset = None, 12
+    while offset + 8 <= len(wav):
+        chunk_id, size = struct.unpack("<4sI", wav[offset:offset + 8])
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            fmt = wav[body:body + size]
+        elif chunk_id == b"data":
+            # Streamed WAVs may carry a bogus size; take what is there
+            return fmt, wav[body:min(body + size, len(wav))]
+        offset = body + size + (size & 1)
+    raise ValueError("WAV file has no data chunk")
+
+
+def streaming_wav_header(fmt: bytes) -> bytes:
+    """WAV header with 'unknown length' sizes, for audio streamed piecewise."""
+    unknown = 0xFFFFFFFF
+    return (
+        struct.pack("<4sI4s", b"RIFF", unknown, b"WAVE")
+        + struct.pack("<4sI", b"fmt ", len(fmt)) + fmt
+        + struct.pack("<4sI", b"data", unknown)
+    )
+
+
+async def stream_synthesis(
+    text: str,
+    language_code: str,
+    speaker: str = TTS_SPEAKER,
+    model: str = TTS_MODEL,
+) -> AsyncIterator[bytes]:
+    """
+    Synthesises every sentence concurrently and yields one continuous WAV
+    stream in sentence order, starting as soon as the first sentence is ready.
+    """
+    tasks = [
+        asyncio.ensure_future(synthesize(sentence, language_code, speaker, model))
+        for sentence in split_sentences(text)
+    ]
+    header_sent = False
+    try:
+        for task in tasks:
+            try:
+                audio = await task
+                fmt, pcm = split_wav(audio) if audio else (None, b"")
+            except Exception as e:
+                print(f"Synthesize Error: {e}")
+                continue
+            if not pcm:
+                continue
+            if not header_sent:
+                yield streaming_wav_header(fmt)
+                header_sent = True
+            yield pcm
+    finally:
+        for task in tasks:
+            task.cancel()
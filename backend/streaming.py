@@ -0,0 +1,16 @@
+import json
+
+# ===============================
+# Server-Sent-Events helpers
+# ===============================
+# Disable proxy buffering (nginx) and caching so each event is flushed to
+# the client as soon as it is produced.
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data) -> str:
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
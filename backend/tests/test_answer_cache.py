@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_cache import AnswerCache  # noqa: E402
+
+QUESTION = "why are my wheat leaves turning green after urea in pune"
+
+
+def make_cache():
+    return AnswerCache("test.answers")
+
+
+def test_negation_is_a_miss():
+    cache = make_cache()
+    cache.set("chat", QUESTION, "cached answer")
+    assert cache.get("chat", "why are my wheat leaves not turning green after urea in pune") is None
+    assert cache.get("chat", "gehu ke patte hare nahi ho rahe urea ke baad") is None
+
+
+def test_negation_is_a_miss_in_hindi():
+    cache = make_cache()
+    cache.set("chat", "गेहूं के पत्ते हरे हो रहे हैं यूरिया के बाद पुणे में", "cached answer")
+    assert cache.get("chat", "गेहूं के पत्ते हरे नहीं हो रहे हैं यूरिया के बाद पुणे में") is None
+
+
+def test_swapped_content_word_is_a_miss():
+    cache = make_cache()
+    cache.set("chat", QUESTION, "cached answer")
+    assert cache.get("chat", "why are my wheat leaves turning yellow after urea in pune") is None
+
+
+def test_extra_content_word_is_a_miss():
+    cache = make_cache()
+    cache.set("chat", QUESTION, "cached answer")
+    assert cache.get("chat", "why are my wheat leaves turning green after urea in pune early") is None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("plant rice after wheat", "plant wheat after rice"),
+    ("convert 5 acres to hectares", "convert 5 hectares to acres"),
+    ("urea dose for 20 acre", "urea dose for 200 acre"),
+    ("how to control pest in cotton", "how to control past in cotton"),
+    ("can I sow wheat now", "how do I sow wheat"),
+    ("how much to feed a cow", "how much to fed a cow"),
+])
+def test_different_questions_do_not_share_answers(cached, asked):
+    cache = make_cache()
+    cache.set("chat", cached, "cached answer")
+    assert cache.get("chat", asked) is None
+    assert cache.get("chat", cached) == "cached answer"
+
+
+def test_filler_word_difference_is_a_hit():
+    cache = make_cache()
+    cache.set("chat", "why are my wheat leaves turning green after urea in pune district", "cached answer")
+    assert cache.get("chat", "please tell why are my wheat leaves also turning green after urea in pune district") == "cached answer"
+
+
+def test_reworded_question_is_a_hit():
+    cache = make_cache()
+    cache.set("chat", "gehu ka bhav", "cached answer")
+    assert cache.get("chat", "gehun ka bhaav") == "cached answer"
+    assert cache.get("chat", "gehu ka daam") == "cached answer"
+    assert cache.hits == 2
@@ -0,0 +1,22 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from disease_kb import get_disease_kb  # noqa: E402
+
+QUERY = "yellow leaves with black spots"
+
+
+def top_entry(crop=None):
+    kb = get_disease_kb()
+    (index, _), *_ = kb.search_batch([QUERY], [crop], top_k=3)[0]
+    return kb.entries[index]
+
+
+def test_crop_agnostic_query_ranks_an_any_crop_entry_first():
+    assert top_entry()["crop"] == "any"
+
+
+def test_reported_crop_still_ranks_its_own_entries_first():
+    assert top_entry("banana")["disease"] == "Sigatoka Leaf Spot"
@@ -0,0 +1,73 @@
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routers import chat_service  # noqa: E402
+
+
+def matches(value, condition):
+    if isinstance(condition, dict):
+        return isinstance(value, str) if condition == {"$type": "string"} else False
+    return value == condition
+
+
+class FakeChats:
+    """Just enough of update_many for the placeholder updates."""
+
+    def __init__(self, sessions):
+        self.sessions = sessions
+
+    async def update_many(self, query, update, array_filters):
+        condition = query["messages.image_job_id"]
+        modified = 0
+        for session in self.sessions:
+            hits = [m for m in session["messages"] if matches(m.get("image_job_id"), condition)]
+            for message in hits:
+                for path, value in update["$set"].items():
+                    message[path.rsplit(".", 1)[1]] = value
+            modified += bool(hits)
+        return SimpleNamespace(modified_count=modified)
+
+
+def placeholder(job_id):
+    return {"role": "assistant", "content": chat_service.IMAGE_PENDING_TEXT, "image_job_id": job_id}
+
+
+@pytest.fixture
+def chats(monkeypatch):
+    fake = FakeChats([
+        {"session_id": "a", "messages": [{"role": "user", "content": "draw a cow"}, placeholder("job-1")]},
+        {"session_id": "b", "messages": [placeholder("job-2"), {"role": "assistant", "content": "hi", "image_job_id": None}]},
+    ])
+    monkeypatch.setattr(chat_service, "chat_collection", fake)
+    return fake
+
+
+def test_startup_fails_every_pending_placeholder(chats):
+    assert asyncio.run(chat_service.fail_orphaned_placeholders()) == 2
+    for session in chats.sessions:
+        for message in session["messages"]:
+            assert message.get("image_job_id") is None
+    assert chats.sessions[0]["messages"][1]["content"] == chat_service.IMAGE_GEN_FAILED_TEXT
+    assert chats.sessions[1]["messages"][1]["content"] == "hi"
+
+
+def test_polling_an_unknown_job_fails_its_placeholder(chats):
+    job = asyncio.run(chat_service.get_image_job("job-1", request=None))
+    assert job["status"] == "failed"
+    assert job["content"] == chat_service.IMAGE_GEN_FAILED_TEXT
+    assert chats.sessions[0]["messages"][1]["image_job_id"] is None
+    # Other jobs' placeholders are left alone
+    assert chats.sessions[1]["messages"][0]["image_job_id"] == "job-2"
+
+
+def test_polling_a_job_without_placeholder_is_404(chats):
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(chat_service.get_image_job("no-such-job", request=None))
+    assert e.value.status_code == 404
@@ -0,0 +1,73 @@
+import os
+import sys
+import asyncio
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import detect_intents  # noqa: E402
+from quick_replies import plan_quick_reply, quick_reply  # noqa: E402
+
+# (message, intent, tool arguments) in Latin and Devanagari script
+ROUTED = [
+    ("wheat price in Pune", "price", {"crop_name": "wheat", "location": "Pune"}),
+    ("पुणे में गेहूं का भाव", "price", {"crop_name": "गेहूं", "location": "पुणे"}),
+    ("weather in Patna", "weather", {"location": "Patna"}),
+    ("पटना का मौसम", "weather", {"location": "पटना"}),
+    ("loan scheme for farmers", "scheme", {"topic": "loan scheme for farmers"}),
+    ("किसानों के लिए बीमा योजना", "scheme", {"topic": "किसानों के लिए बीमा योजना"}),
+    ("late blight disease in potato", "disease", {"symptoms": "late blight disease in potato", "crop": "potato"}),
+    ("आलू में झुलसा रोग", "disease", {"symptoms": "आलू में झुलसा रोग", "crop": "आलू"}),
+]
+
+
+@pytest.mark.parametrize("message, intent, arguments", ROUTED)
+def test_intent_is_detected_and_routed_to_its_tool(message, intent, arguments):
+    assert detect_intents(message) == {intent}
+    assert plan_quick_reply(message) == (intent, arguments)
+
+
+@pytest.mark.parametrize("message, intent, arguments", ROUTED)
+def test_routed_message_is_answered_without_the_model(message, intent, arguments):
+    assert quick_reply(message)
+
+
+def test_reply_follows_the_requested_language():
+    assert "क्विंटल" in quick_reply("wheat price in Pune", "Hindi")
+    assert "quintal" in quick_reply("wheat price in Pune", "English")
+    assert quick_reply("wheat price in Pune", "Marathi") is None
+
+
+def test_user_location_fills_a_missing_place():
+    assert plan_quick_reply("weather forecast") is None
+    assert plan_quick_reply("weather forecast", location="Nashik") == ("weather", {"location": "Nashik"})
+
+
+@pytest.mark.parametrize("message", [
+    "wheat price and weather in Pune",                 # two intents
+    "please draw a picture of a wheat price chart",     # image request
+    "grain storage tips",                               # no intent ("rain" is not in "grain")
+    "what is the price",                                # no crop to look up
+    "mandi me gehu ka bhav itna kam kyu hai, abhi bechu ya store karke rakhu kuch mahine",
+])
+def test_other_messages_go_to_the_model(message):
+    assert quick_reply(message) is None
+
+
+def test_chat_endpoint_skips_the_agent_for_tool_questions(monkeypatch):
+    import main
+
+    async def no_agent(*args, **kwargs):
+        raise AssertionError("the agent must not be called")
+
+    monkeypatch.setattr(main, "run_agent", no_agent)
+
+    async def post(message):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            res = await client.post("/chat", json={"message": message})
+            return res.json()["response"]
+
+    assert "₹" in asyncio.run(post("गेहूं का भाव पुणे"))
@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool_cache import cached_tool, normalize_location  # noqa: E402
+
+
+def make_tool(calls):
+    @cached_tool(ttl=60, normalizers={"location": normalize_location})
+    def forecast(crop: str, location: str):
+        calls.append((crop, location))
+        return {
+            "crop": crop,
+            "location": location,
+            "message": f"Sow {crop} in {location} after the rains.",
+            "markets": [{"market": location}],
+        }
+    return forecast
+
+
+def test_tool_runs_on_the_arguments_as_passed():
+    calls = []
+    result = make_tool(calls)("Wheat", "Pune")
+    assert calls == [("Wheat", "Pune")]
+    assert result["message"] == "Sow Wheat in Pune after the rains."
+
+
+def test_hit_is_respelled_for_the_current_caller():
+    calls = []
+    forecast = make_tool(calls)
+    forecast("Wheat", "Pune")
+    result = forecast(" wheat ", "पुणे")
+    assert len(calls) == 1  # one cache entry for both spellings
+    assert result["location"] == "पुणे"
+    assert result["message"] == "Sow wheat in पुणे after the rains."
+    # Nested data is not echoed user input and stays as stored
+    assert result["markets"] == [{"market": "Pune"}]
+
+
+def test_alias_hit_keeps_the_callers_place_name():
+    calls = []
+    forecast = make_tool(calls)
+    forecast("wheat", "Poona")
+    assert forecast("wheat", "pune")["message"] == "Sow wheat in pune after the rains."
+    assert forecast("wheat", "Poona")["message"] == "Sow wheat in Poona after the rains."
+    assert len(calls) == 1
@@ -0,0 +1,118 @@
+import re
+import copy
+import inspect
+import functools
+from typing import Callable, Dict, Optional
+
+from cache import TTLCache
+
+# ===============================
+# Tool memoisation
+# ===============================
+# @cached_tool wraps a tools.py function with its own TTL cache (visible in
+# GET /cache/stats as "tools.<name>"). Arguments are normalised only to form
+# the key, so "Pune", " pune " and "Poona" share one entry; the tool runs on
+# the caller's own values, and a hit re-applies the current caller's
+# spelling to the values echoed in the result (see respell). functools.wraps
+# keeps the original signature and docstring, which Gemini reads to build the
+# function declaration, so decorated tools work unchanged for function calling.
+
+# Old / alternate names -> canonical district or city name
+DISTRICT_ALIASES = {
+    "bombay": "mumbai",
+    "calcutta": "kolkata",
+    "madras": "chennai",
+    "bangalore": "bengaluru",
+    "poona": "pune",
+    "gurgaon": "gurugram",
+    "baroda": "vadodara",
+    "allahabad": "prayagraj",
+    "trivandrum": "thiruvananthapuram",
+    "mysore": "mysuru",
+    "benares": "varanasi",
+    "banaras": "varanasi",
+    "cochin": "kochi",
+    "mangalore": "mangaluru",
+    "belgaum": "belagavi",
+    "पुणे": "pune",
+    "मुंबई": "mumbai",
+    "दिल्ली": "delhi",
+    "पटना": "patna",
+    "भागलपुर": "bhagalpur",
+    "नासिक": "nashik",
+    "इंदौर": "indore",
+    "लखनऊ": "lucknow",
+    "जयपुर": "jaipur",
+}
+
+
+def normalize_text(value) -> str:
+    return " ".join(str(value).casefold().split())
+
+
+def normalize_location(value) -> str:
+    text = normalize_text(value)
+    return DISTRICT_ALIASES.get(text, text)
+
+
+def respell(result: dict, filled_with: dict, asked_with: dict) -> dict:
+    """
+    Rewrites the top-level strings of a cached result from the arguments
+    that filled the entry to the current caller's, e.g. "pune" -> "पुणे".
+    Nested data (market names, diagnoses...) is left alone.
+    """
+    swaps = []
+    for name, value in asked_with.items():
+        old = filled_with.get(name)
+        if isinstance(old, str) and isinstance(value, str) and old.strip() and old.strip() != value.strip():
+            swaps.append((re.compile(rf"(?<!\w){re.escape(old.strip())}(?!\w)"), value.strip()))
+    if not swaps:
+        return result
+    for field, text in result.items():
+        if isinstance(text, str):
+            for pattern, value in swaps:
+                text = pattern.sub(lambda _: value, text)
+            result[field] = text
+    return result
+
+
+def cached_tool(
+    ttl: float,
+    maxsize: int = 1_000,
+    normalizers: Optional[Dict[str, Callable]] = None,
+):
+    """
+    Memoises a tool for `ttl` seconds. `normalizers` maps argument names to
+    normalising functions that build the cache key; other arguments use
+    normalize_text. The tool itself gets the arguments as passed.
+    """
+    normalizers = normalizers or {}
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        cache = TTLCache(f"tools.{fn.__name__}", maxsize=maxsize, ttl=ttl)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            key = tuple(
+                normalizers.get(name, normalize_text)(value)
+                for name, value in arguments.items()
+            )
+            entry = cache.get(key)
+            if entry is None:
+                entry = (arguments, fn(**arguments))
+                cache.set(key, entry)
+            filled_with, result = entry
+            # Callers get their own copy so they cannot corrupt the cache
+            result = copy.deepcopy(result)
+            if isinstance(result, dict) and filled_with != arguments:
+                result = respell(result, filled_with, arguments)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
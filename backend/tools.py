@@ -1,8 +1,20 @@
 import random
+from tool_cache import cached_tool, normalize_location
+from mandi_store import get_store, trend_of, normalize_crop
+from scheme_index import scheme_index
+from crop_recommender import get_recommender
+from disease_kb import get_disease_kb, UNKNOWN_DIAGNOSIS, DEFAULT_REMEDY
+
+# Cache lifetimes (seconds): schemes and agronomy change rarely, prices move fast
+PRICE_TTL = 10 * 60
+WEATHER_TTL = 60 * 60
+SCHEME_TTL = 24 * 60 * 60
+ADVISORY_TTL = 24 * 60 * 60
 
 # ==========================================
 # 1. Market Price Tool (Mandi Bhav)
 # ==========================================
+@cached_tool(ttl=PRICE_TTL, normalizers={"crop_name": normalize_crop, "location": normalize_location})
 def get_market_price(crop_name: str, location: str):
     """
     Retrieves current market prices (Mandi Bhav) for a specific crop in a given location.
@@ -11,9 +23,37 @@ def get_market_price(crop_name: str, location: str):
         crop_name: Name of the crop (e.g., Wheat, Tomato, Onion).
         location: Name of the district or state (e.g., Pune, Punjab).
     """
-    # In a real app, this would call an API like data.gov.in or Agmarknet
-    # For now, we simulate realistic data
-    
+    # Latest arrivals from the columnar mandi store (see mandi_store.py)
+    store = get_store()
+    data = store.lookup(crop_name, location) if store else None
+    if data is None:
+        return simulated_market_price(crop_name, location)
+
+    price = round(data["modal_price"])
+    trend = trend_of(data["week_over_week_pct"])
+    trend_symbol = "↑" if trend == "up" else "↓" if trend == "down" else "↔"
+    where = location if data["scope"] != "national" else f"{location} (national average)"
+
+    return {
+        "crop": crop_name,
+        "location": location,
+        "price_per_quintal": price,
+        "min_price": round(data["min_price"]),
+        "max_price": round(data["max_price"]),
+        "moving_avg_7d": data["moving_avg_7d"],
+        "moving_avg_30d": data["moving_avg_30d"],
+        "week_over_week_pct": data["week_over_week_pct"],
+        "volatility_30d_pct": data["volatility_30d_pct"],
+        "markets": data["markets"],
+        "scope": data["scope"],
+        "as_of": data["as_of"],
+        "trend": trend,
+        "trend_symbol": trend_symbol,
+        "message": f"The modal price of {crop_name} in {where} is ₹{price}/quintal (as of {data['as_of']}). Trend is {trend} {trend_symbol}."
+    }
+
+def simulated_market_price(crop_name: str, location: str):
+    """Fallback for crops missing from the mandi dataset."""
     base_prices = {
         "wheat": 2200,
         "rice": 3000,
@@ -46,6 +86,49 @@ def get_market_price(crop_name: str, location: str):
 # ==========================================
 # 2. Government Schemes Tool
 # ==========================================
+# Bundled central schemes; `tags` only feed the search index
+FARMER_SCHEMES = [
+    {
+        "id": "pkvy",
+        "name": "Paramparagat Krishi Vikas Yojana (PKVY)",
+        "benefits": "₹50,000 per hectare for organic farming.",
+        "link": "https://agricoop.nic.in/",
+        "tags": "organic farming fertilizer jaivik kheti khad",
+    },
+    {
+        "id": "kcc",
+        "name": "Kisan Credit Card (KCC)",
+        "benefits": "Short-term credit at 4% interest rate.",
+        "link": "https://pmkisan.gov.in/",
+        "tags": "loan credit money interest karj rin",
+    },
+    {
+        "id": "pmfby",
+        "name": "Pradhan Mantri Fasal Bima Yojana (PMFBY)",
+        "benefits": "Comprehensive crop insurance against non-preventable natural risks.",
+        "link": "https://pmfby.gov.in/",
+        "tags": "crop insurance loss damage drought flood nuksan",
+    },
+    {
+        "id": "pm-kisan",
+        "name": "PM-KISAN",
+        "benefits": "₹6,000 per year income support for all landholding farmers.",
+        "link": "https://pmkisan.gov.in/",
+        "tags": "income support direct benefit transfer landholding",
+    },
+]
+DEFAULT_SCHEME = FARMER_SCHEMES[-1]
+MAX_SCHEME_RESULTS = 3
+
+for _scheme in FARMER_SCHEMES:
+    scheme_index.add(
+        ("farmer", _scheme["id"]),
+        _scheme["name"],
+        [_scheme["benefits"], _scheme["tags"]],
+        {"source": "farmer", **{k: v for k, v in _scheme.items() if k != "tags"}},
+    )
+
+@cached_tool(ttl=SCHEME_TTL)
 def get_government_schemes(topic: str):
     """
     Returns government schemes related to a specific topic (e.g., 'organic', 'loans', 'insurance').
@@ -53,46 +136,23 @@ def get_government_schemes(topic: str):
     Args:
         topic: The topic to search schemes for.
     """
-    topic_lower = topic.lower()
-    
-    schemes = []
-    
-    if "organic" in topic_lower or "fertilizer" in topic_lower:
-        schemes.append({
-            "name": "Paramparagat Krishi Vikas Yojana (PKVY)",
-            "benefits": "₹50,000 per hectare for organic farming.",
-            "link": "https://agricoop.nic.in/"
-        })
-    
-    if "loan" in topic_lower or "credit" in topic_lower or "money" in topic_lower:
-        schemes.append({
-            "name": "Kisan Credit Card (KCC)",
-            "benefits": "Short-term credit at 4% interest rate.",
-            "link": "https://pmkisan.gov.in/"
-        })
-        
-    if "insurance" in topic_lower or "loss" in topic_lower or "damage" in topic_lower:
-        schemes.append({
-            "name": "Pradhan Mantri Fasal Bima Yojana (PMFBY)",
-            "benefits": "Comprehensive crop insurance against non-preventable natural risks.",
-            "link": "https://pmfby.gov.in/"
-        })
-        
+    schemes = scheme_index.search(topic, limit=MAX_SCHEME_RESULTS)
+
     if not schemes:
-        schemes.append({
-            "name": "PM-KISAN",
-            "benefits": "₹6,000 per year income support for all landholding farmers.",
-            "link": "https://pmkisan.gov.in/"
-        })
-        
+        schemes.append({"source": "farmer", **{k: v for k, v in DEFAULT_SCHEME.items() if k != "tags"}})
+
     return {
         "topic": topic,
         "found_schemes": schemes
     }
 
+# Newly inserted schemes must not be hidden behind cached answers
+scheme_index.on_change(get_government_schemes.cache.clear)
+
 # ==========================================
 # 3. Weather Forecast Tool
 # ==========================================
+@cached_tool(ttl=WEATHER_TTL, normalizers={"location": normalize_location})
 def get_weather_forecast(location: str):
     """
     Provides a 3-day weather forecast for a given location.
@@ -121,6 +181,7 @@ def get_weather_forecast(location: str):
 # ==========================================
 # 4. Crop Recommendation Tool
 # ==========================================
+@cached_tool(ttl=ADVISORY_TTL, normalizers={"location": normalize_location})
 def recommend_crop(soil_type: str, season: str, location: str):
     """
     Recommends the best crop to plant based on soil, season, and location.
@@ -130,58 +191,43 @@ def recommend_crop(soil_type: str, season: str, location: str):
         season: Current season (e.g., Kharif, Rabi, Summer).
         location: Region/State.
     """
-    recommendations = []
-    soil_lower = soil_type.lower()
-    season_lower = season.lower()
-    
-    if "black" in soil_lower:
-        if "kharif" in season_lower or "monsoon" in season_lower:
-            recommendations = ["Cotton", "Soybean", "Pigeon Pea (Tur)"]
-        elif "rabi" in season_lower or "winter" in season_lower:
-            recommendations = ["Wheat", "Gram (Chana)", "Sunflower"]
-            
-    elif "red" in soil_lower:
-        recommendations = ["Groundnut", "Millets (Bajra/Jowar)", "Pulses"]
-        
-    else:
-        recommendations = ["Vegetables (Tomato, Okra)", "Maize", "Flowers"]
+    result = get_recommender().recommend_many(
+        [{"soil_type": soil_type, "season": season, "location": location}]
+    )[0]
         
     return {
         "soil": soil_type,
         "season": season,
-        "recommendations": recommendations,
-        "advice": "Ensure proper soil testing before sowing for better yield."
+        "agro_climatic_zone": result["zone"],
+        "recommendations": result["recommendations"],
+        "advice": result["advice"]
     }
 
 # ==========================================
 # 5. Disease Diagnosis Tool
 # ==========================================
-def diagnose_crop_disease(symptoms: str):
+MAX_DIAGNOSES = 3
+
+@cached_tool(ttl=ADVISORY_TTL, maxsize=5_000)
+def diagnose_crop_disease(symptoms: str, crop: str = ""):
     """
     Identifies potential crop diseases based on described symptoms and suggests remedies.
     
     Args:
         symptoms: Description of the problem (e.g., 'yellow leaves with black spots').
+        crop: Affected crop if known (e.g., Wheat, Tomato). Optional.
     """
-    diagnosis = "Unknown Issue"
-    remedy = "Consult a local agricultural officer."
+    diagnosis = UNKNOWN_DIAGNOSIS
+    remedy = DEFAULT_REMEDY
     
-    symptoms_lower = symptoms.lower()
+    matches = get_disease_kb().diagnose_many([(symptoms, crop or None)], top_k=MAX_DIAGNOSES)[0]
     
-    if "yellow" in symptoms_lower and "leaf" in symptoms_lower:
-        diagnosis = "Nitrogen Deficiency or Yellow Mosaic Virus"
-        remedy = "Spray Imidacloprid (for virus) or apply Urea (for deficiency)."
-        
-    elif "black spot" in symptoms_lower or "brown spot" in symptoms_lower:
-        diagnosis = "Fungal Infection (Early Blight/Late Blight)"
-        remedy = "Spray Mancozeb or Carbendazim fungicide."
-        
-    elif "hole" in symptoms_lower or "eaten" in symptoms_lower:
-        diagnosis = "Pest Attack (Caterpillar/Borer)"
-        remedy = "Use Neem Oil spray or install Pheromone Traps."
+    if matches:
+        diagnosis, remedy = matches[0]["disease"], matches[0]["remedy"]
         
     return {
         "symptoms": symptoms,
         "diagnosis": diagnosis,
-        "remedy": remedy
+        "remedy": remedy,
+        "possible_diagnoses": matches
     }
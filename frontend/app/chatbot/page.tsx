@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useRef, useEffect, useCallback } from "react";
+import { useState, useRef, useEffect, useLayoutEffect, useCallback } from "react";
 import { Button } from "@/components/ui/button";
 import {
   Bot, Send, ArrowLeft, Loader2,
@@ -16,6 +16,7 @@ interface Message {
   role: "user" | "assistant";
   text: string;
   image?: string;
+  job_id?: string;
   timestamp?: string;
 }
 
@@ -28,6 +29,8 @@ interface Session {
 export default function ChatbotPage() {
   // State
   const [sessions, setSessions] = useState<Session[]>([]);
+  const [sessionsCursor, setSessionsCursor] = useState<string | null>(null); // X-Next-Cursor of the sidebar
+  const [isLoadingSessions, setIsLoadingSessions] = useState(false);
   const [currentSessionId, setCurrentSessionId] = useState<string | null>(null);
   const [messages, setMessages] = useState<Message[]>([]);
   const [inputText, setInputText] = useState("");
@@ -38,16 +41,26 @@ export default function ChatbotPage() {
   const [imagePreview, setImagePreview] = useState<string | null>(null);
   const [language, setLanguage] = useState("Hindi");
   const [location, setLocation] = useState<{lat: number, lon: number} | null>(null);
+  const [historyCursor, setHistoryCursor] = useState<number | null>(null); // ?before= for older turns
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
 
   // Refs
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const messagesContainerRef = useRef<HTMLDivElement>(null);
+  const activeSessionRef = useRef<string | null>(null);
+  const prependScrollRef = useRef<number | null>(null); // scrollHeight before older turns were prepended
+  const keepScrollRef = useRef(false); // skip the scroll-to-bottom after prepending
+  const lastScrollTopRef = useRef(0);
   const fileInputRef = useRef<HTMLInputElement>(null);
   const currentAudioRef = useRef<HTMLAudioElement | null>(null);
+  const pollingJobsRef = useRef<Set<string>>(new Set());
   
   const [playingMessageIndex, setPlayingMessageIndex] = useState<number | null>(null);
 
   const userId = "default_user";
   const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+  const IMAGE_POLL_INTERVAL_MS = 2000;
+  const LOAD_OLDER_THRESHOLD_PX = 80;
 
   // --- Effects ---
 
@@ -68,17 +81,32 @@ export default function ChatbotPage() {
   }, []);
 
   useEffect(() => {
+    if (keepScrollRef.current) {
+      keepScrollRef.current = false; // older turns were added above; stay put
+      return;
+    }
     setTimeout(scrollToBottom, 100);
   }, [messages, isLoading, scrollToBottom]);
 
+  // 3. Keep the visible turns in place when older ones are prepended
+  useLayoutEffect(() => {
+    const container = messagesContainerRef.current;
+    if (prependScrollRef.current === null || !container) return;
+    container.scrollTop += container.scrollHeight - prependScrollRef.current;
+    prependScrollRef.current = null;
+    keepScrollRef.current = true;
+  }, [messages]);
+
   // --- API Functions ---
 
+  // First page of the sidebar; "Load more" pages on with the X-Next-Cursor header
   const fetchSessions = async () => {
     try {
       const res = await fetch(`${API_BASE_URL}/chat/sessions/${userId}`);
       if (res.ok) {
         const data = await res.json();
         setSessions(data);
+        setSessionsCursor(res.headers.get("X-Next-Cursor"));
         // If no current session, load the most recent one or create new
         if (!currentSessionId && data.length > 0) {
           loadSession(data[0].session_id);
@@ -91,6 +119,27 @@ export default function ChatbotPage() {
     }
   };
 
+  const loadMoreSessions = async () => {
+    if (!sessionsCursor || isLoadingSessions) return;
+    setIsLoadingSessions(true);
+    try {
+      const res = await fetch(`${API_BASE_URL}/chat/sessions/${userId}?cursor=${encodeURIComponent(sessionsCursor)}`);
+      if (res.ok) {
+        const data: Session[] = await res.json();
+        // A chat updated meanwhile moved to the first page; don't list it twice
+        setSessions(prev => {
+          const seen = new Set(prev.map(s => s.session_id));
+          return [...prev, ...data.filter(s => !seen.has(s.session_id))];
+        });
+        setSessionsCursor(res.headers.get("X-Next-Cursor"));
+      }
+    } catch (err) {
+      console.error("Failed to load more sessions", err);
+    } finally {
+      setIsLoadingSessions(false);
+    }
+  };
+
   const createNewSession = async () => {
     try {
       const res = await fetch(`${API_BASE_URL}/chat/new`, {
@@ -102,7 +151,9 @@ export default function ChatbotPage() {
         const newSession = await res.json();
         setSessions(prev => [newSession, ...prev]);
         setCurrentSessionId(newSession.session_id);
+        activeSessionRef.current = newSession.session_id;
         setMessages([]); // Clear messages for new chat
+        setHistoryCursor(null);
         setIsSidebarOpen(false); // Close sidebar on mobile
       }
     } catch (err) {
@@ -112,13 +163,18 @@ export default function ChatbotPage() {
 
   const loadSession = async (sessionId: string) => {
     setCurrentSessionId(sessionId);
+    activeSessionRef.current = sessionId;
     setIsSidebarOpen(false);
     setIsLoading(true);
+    setHistoryCursor(null);
     try {
+      // Newest page only; older turns load on scroll-up (loadOlderMessages)
       const res = await fetch(`${API_BASE_URL}/chat/history/${sessionId}`);
-      if (res.ok) {
+      if (res.ok && activeSessionRef.current === sessionId) {
         const data = await res.json();
         setMessages(data.messages);
+        setHistoryCursor(data.next_cursor ?? null);
+        pollPendingImages(data.messages);
       }
     } catch (err) {
       console.error("Failed to load session", err);
@@ -127,6 +183,68 @@ export default function ChatbotPage() {
     }
   };
 
+  const loadOlderMessages = async () => {
+    const sessionId = activeSessionRef.current;
+    if (historyCursor === null || isLoadingOlder || !sessionId) return;
+    setIsLoadingOlder(true);
+    try {
+      const res = await fetch(`${API_BASE_URL}/chat/history/${sessionId}?before=${historyCursor}`);
+      if (res.ok && activeSessionRef.current === sessionId) {
+        const data = await res.json();
+        prependScrollRef.current = messagesContainerRef.current?.scrollHeight ?? null;
+        setMessages(prev => [...data.messages, ...prev]);
+        setHistoryCursor(data.next_cursor ?? null);
+        pollPendingImages(data.messages);
+      }
+    } catch (err) {
+      console.error("Failed to load older messages", err);
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
+  const handleMessagesScroll = (e: React.UIEvent<HTMLDivElement>) => {
+    const { scrollTop } = e.currentTarget;
+    // Only when the user scrolls up, not while scrollToBottom runs
+    const scrollingUp = scrollTop < lastScrollTopRef.current;
+    lastScrollTopRef.current = scrollTop;
+    if (scrollingUp && scrollTop < LOAD_OLDER_THRESHOLD_PX) {
+      loadOlderMessages();
+    }
+  };
+
+  const pollPendingImages = (history: Message[]) => {
+    history
+      .filter((msg: Message) => msg.job_id)
+      .forEach((msg: Message) => pollImageJob(msg.job_id as string));
+  };
+
+  // Image replies arrive as a placeholder with a job_id; poll until the job finishes
+  const pollImageJob = async (jobId: string) => {
+    if (pollingJobsRef.current.has(jobId)) return;
+    pollingJobsRef.current.add(jobId);
+    try {
+      while (true) {
+        await new Promise(resolve => setTimeout(resolve, IMAGE_POLL_INTERVAL_MS));
+        const res = await fetch(`${API_BASE_URL}/chat/images/${jobId}`);
+        if (!res.ok) break; // Job expired or server restarted; history has the final message
+        const job = await res.json();
+        if (job.status === "done" || job.status === "failed") {
+          setMessages(prev => prev.map(msg =>
+            msg.job_id === jobId
+              ? { ...msg, text: job.content, image: job.image || undefined, job_id: undefined }
+              : msg
+          ));
+          break;
+        }
+      }
+    } catch (err) {
+      console.error("Image Poll Error:", err);
+    } finally {
+      pollingJobsRef.current.delete(jobId);
+    }
+  };
+
   const handleImageSelect = (e: React.ChangeEvent<HTMLInputElement>) => {
     if (e.target.files && e.target.files[0]) {
       const file = e.target.files[0];
@@ -217,9 +335,13 @@ export default function ChatbotPage() {
         role: "assistant",
         text: data.content,
         image: data.image,
+        job_id: data.job_id || undefined,
         timestamp: new Date().toISOString()
       };
       setMessages(prev => [...prev, botMsg]);
+      if (data.job_id) {
+        pollImageJob(data.job_id);
+      }
 
       fetchSessions();
 
@@ -328,6 +450,16 @@ export default function ChatbotPage() {
               <span className="truncate">{session.title}</span>
             </button>
           ))}
+          {sessionsCursor && (
+            <button
+              onClick={loadMoreSessions}
+              disabled={isLoadingSessions}
+              className="w-full p-2 rounded-lg text-xs text-slate-500 hover:bg-white/5 hover:text-slate-300 transition-colors flex items-center justify-center gap-2"
+            >
+              {isLoadingSessions && <Loader2 className="w-3 h-3 animate-spin" />}
+              Load more
+            </button>
+          )}
         </div>
 
         <div className="p-4 border-t border-white/10">
@@ -381,7 +513,18 @@ export default function ChatbotPage() {
         </header>
 
         {/* CHAT MESSAGES */}
-        <div className="flex-1 overflow-y-auto p-4 space-y-6 custom-scrollbar relative">
+        <div
+          ref={messagesContainerRef}
+          onScroll={handleMessagesScroll}
+          className="flex-1 overflow-y-auto p-4 space-y-6 custom-scrollbar relative"
+        >
+
+          {/* Older turns are fetched when scrolled to the top (overlay, so it doesn't shift them) */}
+          {isLoadingOlder && (
+            <div className="absolute top-2 left-1/2 -translate-x-1/2">
+              <Loader2 className="w-4 h-4 animate-spin text-emerald-500" />
+            </div>
+          )}
 
           {/* Welcome Screen if Empty */}
           {messages.length === 0 && !isLoading && (
@@ -271,7 +271,7 @@ export default function GetStarted() {
                   <h3 className="font-bold text-lg text-white mb-1">{kendraResult.name}</h3>
                   <div className="flex items-start gap-2 text-slate-400 text-sm mb-3">
                     <MapPin className="w-4 h-4 mt-0.5 shrink-0" />
-                    {kendraResult.address}
+                    {kendraResult.address || [kendraResult.city, kendraResult.state].filter(Boolean).join(", ")}
                   </div>
 
                   <div className="space-y-2 mb-4">